@@ -11,6 +11,9 @@ import logging
 import requests
 from dataclasses import dataclass
 import time
+import copy
+import threading
+from collections import OrderedDict
 
 # Core ML/NLP imports with error handling
 try:
@@ -688,6 +691,9 @@ class AICareerAdvisor:
 # PRESERVED: Original Skill Gap Analyzer (UNCHANGED)
 # =============================================================================
 class AdvancedSkillGapAnalyzer:
+    # The analyzer is shared by every session, so the cache is bounded and locked
+    EVIDENCE_CACHE_SIZE = 256
+    
     def __init__(self):
         self.non_skill_terms = self._build_non_skill_terms()
         self.skill_categories = self._build_skill_categories()
@@ -695,12 +701,13 @@ class AdvancedSkillGapAnalyzer:
         self.skill_synonyms = self._build_skill_synonyms()
         self.job_roles = self._build_job_roles()
         self.courses_df = self._build_courses_database()
-        self.evidence_cache = {}
+        self.evidence_cache = OrderedDict()
+        self._evidence_lock = threading.Lock()
         self.level_hierarchy = {"Beginner": 1, "Intermediate": 2, "Advanced": 3, "Expert": 4}
         
         # Initialize NLP model
         self.nlp, self.model_type = self._initialize_nlp()
-        
+    
     def _initialize_nlp(self):
         """Initialize NLP model with fallback"""
         if not SPACY_AVAILABLE:
@@ -1096,8 +1103,13 @@ class AdvancedSkillGapAnalyzer:
         
         # Generate cache key
         text_hash = hashlib.md5(text.encode()).hexdigest()[:16]
-        if text_hash in self.evidence_cache:
-            return self.evidence_cache[text_hash]
+        with self._evidence_lock:
+            cached = self.evidence_cache.get(text_hash)
+            if cached is not None:
+                self.evidence_cache.move_to_end(text_hash)
+        if cached is not None:
+            # Callers may mutate the result, so never hand out the cached dict
+            return copy.deepcopy(cached)
         
         detected_skills = {}
         text_lower = text.lower()
@@ -1161,7 +1173,11 @@ class AdvancedSkillGapAnalyzer:
             }
         }
         
-        self.evidence_cache[text_hash] = result
+        with self._evidence_lock:
+            self.evidence_cache[text_hash] = copy.deepcopy(result)
+            self.evidence_cache.move_to_end(text_hash)
+            while len(self.evidence_cache) > self.EVIDENCE_CACHE_SIZE:
+                self.evidence_cache.popitem(last=False)
         return result
     
     def _analyze_skill_proficiency(self, skill: str, text: str, skill_data: Dict) -> Dict[str, Any]:
@@ -1461,15 +1477,23 @@ def create_skill_radar_chart(skills_data):
         st.error(f"Error creating chart: {e}")
         return None
 
+@st.cache_resource(show_spinner=False)
+def get_shared_analyzer():
+    """Analyzer with skill, role and course databases, built once per process"""
+    return AdvancedSkillGapAnalyzer()
+
 def main():
     """Main Streamlit application - Enhanced with New Features"""
     st.title("🧠 AI Skill Gap Analyzer Pro")
     st.markdown("### Complete Career Analysis Platform with Advanced AI Features")
     
-    # Initialize analyzer and new modules
-    if 'analyzer' not in st.session_state:
+    # Initialize analyzer and new modules; a session built on an analyzer that
+    # was since reloaded (by any session) rebuilds them on its next run
+    with st.spinner("🚀 Initializing AI analyzer with advanced features..."):
+        shared_analyzer = get_shared_analyzer()
+    if st.session_state.get('analyzer') is not shared_analyzer:
         with st.spinner("🚀 Initializing AI analyzer with advanced features..."):
-            st.session_state.analyzer = AdvancedSkillGapAnalyzer()
+            st.session_state.analyzer = shared_analyzer
             # Initialize new modules
             st.session_state.analytics_engine = AnalyticsEngine(st.session_state.analyzer)
             st.session_state.report_generator = ReportGenerator(
@@ -1510,6 +1534,15 @@ def main():
         if st.button("Generate Comprehensive Report"):
             if 'skills_result' in st.session_state:
                 st.session_state.generate_report = True
+        
+        if st.button("Reload Catalogs"):
+            # Drop the shared analyzer; every session switches to the rebuilt
+            # one on its next run
+            get_shared_analyzer.clear()
+            for key in ['analyzer', 'analytics_engine', 'report_generator',
+                        'learning_optimizer', 'career_advisor']:
+                st.session_state.pop(key, None)
+            st.rerun()
     
     # Enhanced tabs with new features
     tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
@@ -1,26 +1,58 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Query
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional, List
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from pydantic import BaseModel, Field, ValidationError
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
+import hashlib
 import tempfile
+import shutil
 from pathlib import Path
 import time
 import logging
+import asyncio
+from contextlib import asynccontextmanager
 
 from config import Config
 from resume_parser import ResumeParser
-from gap_analyzer import JobRoleManager
+from catalog import get_catalog_watcher
+from candidate_index import get_candidate_index
+from what_if import WhatIfSessionStore
+from pipeline import AnalysisPipeline
+from worker_pool import AnalysisWorkerPool, PoolSaturatedError, AnalysisTimeoutError
+from job_store import BatchJobStore, BatchJobRunner, summarize_item
+from batch_output import dumps_line
+from response_views import ResponseView
+from http_cache import make_etag, etag_matches, not_modified, cached_json, ETagRegistry
+from metrics import get_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from singleflight import SingleFlight
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background services and warm up models without blocking liveness"""
+    catalog.start()
+    analysis_pool.start()
+    if config.JOB_RUNNER_ENABLED:
+        job_runner.start()
+    warmup_task = asyncio.create_task(warm_up())
+    try:
+        yield
+    finally:
+        warmup_task.cancel()
+        await job_runner.stop()
+        analysis_pool.shutdown()
+        catalog.stop()
+
 # Initialize
 config = Config()
 app = FastAPI(
     title=config.API_TITLE,
     description=config.API_DESCRIPTION,
-    version=config.API_VERSION
+    version=config.API_VERSION,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -33,8 +65,124 @@ app.add_middleware(
 )
 
 # Initialize components
-parser = ResumeParser(config)
-job_manager = JobRoleManager(config)
+catalog = get_catalog_watcher(config)
+parser = ResumeParser(config, catalog=catalog)
+analysis_pool = AnalysisWorkerPool(config, parser=parser)
+job_store = BatchJobStore(config)
+job_runner = BatchJobRunner(job_store, analysis_pool, config)
+what_if_sessions = WhatIfSessionStore(config, matcher=catalog.snapshot.skill_matcher)
+catalog_cache_control = f"public, max-age={config.CATALOG_CACHE_MAX_AGE}"
+analysis_flights = SingleFlight()
+served_analysis_etags = ETagRegistry(config.ANALYSIS_ETAG_CACHE_SIZE)
+metrics = get_metrics()
+metrics.add_collector(analysis_pool.metric_samples)
+metrics.add_collector(analysis_flights.metric_samples)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests and observe latency per route template"""
+    start_time = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        endpoint = route.path if route is not None else "unmatched"
+        metrics.inc("http_requests_total", endpoint=endpoint, method=request.method, status=status)
+        metrics.observe("http_request_duration_seconds", time.perf_counter() - start_time, endpoint=endpoint)
+
+# Readiness: traffic should only be routed here once every worker is warm
+readiness: Dict[str, Any] = {
+    "ready": not config.API_WARMUP,
+    "status": "warming_up" if config.API_WARMUP else "ready",
+    "warmupSeconds": None,
+    "error": None
+}
+
+async def warm_up() -> None:
+    """Load models and catalogs and run a synthetic analysis on every worker"""
+    if not config.API_WARMUP:
+        return
+    start_time = time.time()
+    try:
+        durations = await asyncio.wait_for(analysis_pool.warm_up(), config.API_WARMUP_TIMEOUT)
+    except asyncio.TimeoutError:
+        readiness.update(status="failed", error=f"Warm-up did not finish within {config.API_WARMUP_TIMEOUT}s")
+    except Exception as e:
+        readiness.update(status="failed", error=str(e))
+    else:
+        readiness.update(
+            ready=True,
+            status="ready",
+            warmupSeconds=round(time.time() - start_time, 2),
+            workerWarmupSeconds=[round(duration, 2) for duration in durations]
+        )
+        logger.info(f"API ready after {readiness['warmupSeconds']}s warm-up")
+        return
+    logger.error(f"Warm-up failed, staying not ready: {readiness['error']}")
+
+async def run_analysis(method: str, *args, affinity: Optional[str] = None,
+                       priority: str = "interactive", **kwargs) -> Any:
+    """Run a ResumeParser call on the analysis workers
+    
+    A full admission queue becomes 503 with Retry-After and a call that
+    exceeds the request timeout becomes 504, so the event loop stays free.
+    """
+    try:
+        return await analysis_pool.run(method, *args, affinity=affinity, priority=priority, **kwargs)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except AnalysisTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+def response_view(fields: Optional[str], view: Optional[str]) -> Optional[ResponseView]:
+    """Parse the `fields` / `view` query parameters"""
+    try:
+        return ResponseView.from_params(fields, view)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def analysis_etag(endpoint: str, request_echo: Dict[str, Any], content: Optional[str],
+                  fields: Optional[str], view: Optional[str]) -> str:
+    """ETag of an analysis: its inputs and the catalog version it runs against
+    
+    Identical requests get equivalent analyses, but `meta` timings and stage
+    cache flags differ between runs, so the ETag is weak. The ETag also keys
+    request coalescing.
+    """
+    return make_etag(endpoint, catalog.version, request_echo, content, fields, view, weak=True)
+
+def analysis_not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether to answer 304 without running the analysis
+    
+    Only for ETags this process served a successful analysis for; a client
+    cannot revalidate a response that failed or was never produced.
+    """
+    return etag in served_analysis_etags and etag_matches(if_none_match, etag)
+
+def analysis_failed(result: Dict[str, Any]) -> bool:
+    """Whether an analysis result, or any role in it, reports an error
+    
+    Errors are reported in `meta`/`summary` (see the parser's error response)
+    and per role in `matchScore`, as for the pipeline's uncacheable stages.
+    """
+    sections = [result.get("meta"), result.get("summary"), result.get("matchScore")]
+    sections.extend(role.get("matchScore") for role in result.get("roles") or [])
+    return any(isinstance(section, dict) and "error" in section for section in sections)
+
+def analysis_response(response: Dict[str, Any], etag: str) -> JSONResponse:
+    """Analysis response with caching headers; failed analyses are not cacheable"""
+    if analysis_failed(response["response"]):
+        served_analysis_etags.discard(etag)
+        return cached_json(response, None, "no-store")
+    served_analysis_etags.add(etag)
+    return cached_json(response, etag, config.ANALYSIS_CACHE_CONTROL)
+
+def session_affinity(resume_text: Optional[str], session_id: Optional[str]) -> Optional[str]:
+    """Worker affinity key: the analysis session id of a resume"""
+    return AnalysisPipeline.session_id_for(resume_text) if resume_text else session_id
 
 # Pydantic models for request/response validation
 class JobContext(BaseModel):
@@ -47,13 +195,43 @@ class UserPreferences(BaseModel):
     budgetLimit: Optional[float] = Field(1000, description="Budget limit for courses")
     timeLimit: Optional[int] = Field(100, description="Time limit per month (hours)")
     hoursPerWeek: Optional[int] = Field(10, description="Available hours per week")
+    selectionMode: Optional[str] = Field("greedy", description="Course selection mode (greedy or optimal)")
 
 class ResumeAnalysisRequest(BaseModel):
-    resumeText: str = Field(..., description="Resume text content")
+    resumeText: Optional[str] = Field(None, description="Resume text content")
+    sessionId: Optional[str] = Field(None, description="Session id from an earlier analysis (instead of resumeText)")
     jobContext: Optional[JobContext] = Field(None, description="Job context for analysis")
     userPrefs: Optional[UserPreferences] = Field(None, description="User preferences")
     phase: Optional[int] = Field(1, description="Analysis phase (1-3)", ge=1, le=3)
 
+class MultiRoleAnalysisRequest(BaseModel):
+    resumeText: Optional[str] = Field(None, description="Resume text content")
+    sessionId: Optional[str] = Field(None, description="Session id from an earlier analysis (instead of resumeText)")
+    jobContexts: List[JobContext] = Field(..., description="Roles to analyze the resume against")
+    userPrefs: Optional[UserPreferences] = Field(None, description="User preferences (phase 3)")
+    phase: Optional[int] = Field(2, description="Analysis phase (2-3)", ge=2, le=3)
+
+class BestFitRolesRequest(BaseModel):
+    resumeText: str = Field(..., description="Resume text content")
+    topK: Optional[int] = Field(5, description="Number of best-fit roles to return", ge=1, le=100)
+
+class WhatIfSkill(BaseModel):
+    name: str = Field(..., min_length=1, description="Skill name")
+    level: Optional[str] = Field("Beginner", description="Current skill level")
+
+class WhatIfSessionRequest(BaseModel):
+    roleId: str = Field(..., description="Target job role ID")
+    skills: Optional[List[Dict[str, Any]]] = Field(None, description="Phase 1 skills (name, level)")
+    resumeText: Optional[str] = Field(None, description="Resume text, used when skills are not given")
+
+class WhatIfChange(BaseModel):
+    skill: str = Field(..., description="Skill name")
+    level: Optional[str] = Field("Beginner", description="New skill level")
+    remove: Optional[bool] = Field(False, description="Remove the skill instead")
+
+class WhatIfUpdateRequest(BaseModel):
+    changes: List[WhatIfChange] = Field(..., description="Skill additions, level changes or removals")
+
 class SkillItem(BaseModel):
     id: str
     name: str
@@ -115,8 +293,13 @@ async def root():
         "endpoints": {
             "analyze_text": "/api/v1/analyze-resume",
             "analyze_file": "/api/v1/analyze-resume-file", 
+            "analyze_multi_role": "/api/v1/analyze-resume/multi-role",
             "job_roles": "/api/v1/job-roles",
-            "health": "/api/v1/health"
+            "best_fit_roles": "/api/v1/best-fit-roles",
+            "batch_jobs": "/api/v1/jobs/batch-analyze",
+            "health": "/api/v1/health",
+            "ready": "/api/v1/ready",
+            "metrics": "/metrics"
         }
     }
 
@@ -126,26 +309,71 @@ async def health_check():
     return {
         "status": "healthy",
         "version": config.API_VERSION,
-        "timestamp": int(time.time())
+        "timestamp": int(time.time()),
+        "ready": readiness["ready"],
+        "catalog": catalog.status(),
+        "workers": analysis_pool.status(),
+        "coalescing": analysis_flights.status()
     }
 
+@app.get("/api/v1/ready", summary="Readiness probe")
+async def readiness_check():
+    """200 once every worker is warm, 503 while warming up or after a failed warm-up
+    
+    Unlike the health check (liveness), this tells load balancers whether to
+    route traffic here.
+    """
+    if readiness["ready"]:
+        return {**readiness, "catalogVersion": catalog.version}
+    return JSONResponse(readiness, status_code=503, headers={"Retry-After": "5"})
+
+@app.get("/metrics", summary="Prometheus metrics", include_in_schema=False)
+async def get_metrics_text():
+    """Request, worker, cache and stage metrics in the Prometheus text format"""
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/api/v1/job-roles", summary="Get available job roles")
-async def get_job_roles():
+async def get_job_roles(if_none_match: Optional[str] = Header(None)):
     """Get list of available job roles for analysis"""
     try:
-        roles = job_manager.list_available_roles()
-        return {
+        snapshot = catalog.snapshot
+        etag = make_etag("job-roles", snapshot.version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, catalog_cache_control)
+        
+        roles = snapshot.job_manager.list_available_roles()
+        return cached_json({
             "roles": roles,
-            "total": len(roles)
-        }
+            "total": len(roles),
+            "catalogVersion": snapshot.version
+        }, etag, catalog_cache_control)
     except Exception as e:
         logger.error(f"Error getting job roles: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/v1/catalog/reload", summary="Reload role and course catalogs")
+async def reload_catalog():
+    """Rebuild the shared role and course catalogs from disk"""
+    try:
+        snapshot = await asyncio.to_thread(catalog.reload)
+        return {
+            "catalogVersion": snapshot.version,
+            "roles": len(snapshot.job_manager.job_roles),
+            "courses": len(snapshot.course_db.course_rows)
+        }
+    except Exception as e:
+        logger.error(f"Error reloading catalog: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/v1/analyze-resume", 
           response_model=Dict[str, Any],
           summary="Analyze resume from text")
-async def analyze_resume_text(request: ResumeAnalysisRequest):
+async def analyze_resume_text(
+    request: ResumeAnalysisRequest,
+    fields: Optional[str] = Query(None, description="Comma-separated response sections to return"),
+    view: Optional[str] = Query(None, description="Response detail: full or compact"),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Analyze resume from text input
     
@@ -154,8 +382,6 @@ async def analyze_resume_text(request: ResumeAnalysisRequest):
     - **Phase 3**: Complete analysis with recommendations (requires jobContext)
     """
     try:
-        start_time = time.time()
-        
         # Validate phase requirements
         if request.phase >= 2 and not request.jobContext:
             raise HTTPException(
@@ -163,31 +389,46 @@ async def analyze_resume_text(request: ResumeAnalysisRequest):
                 detail="jobContext required for Phase 2+ analysis"
             )
         
+        if not request.resumeText and not request.sessionId:
+            raise HTTPException(status_code=400, detail="resumeText or sessionId required")
+        
         # Convert Pydantic models to dicts
         job_context = request.jobContext.dict() if request.jobContext else None
         user_prefs = request.userPrefs.dict() if request.userPrefs else None
+        request_echo = {
+            "phase": request.phase,
+            "jobContext": job_context,
+            "userPrefs": user_prefs,
+            "textLength": len(request.resumeText or ""),
+            "sessionId": request.sessionId
+        }
+        
+        etag = analysis_etag("analyze-resume", request_echo, request.resumeText, fields, view)
+        if analysis_not_modified(if_none_match, etag):
+            return not_modified(etag, config.ANALYSIS_CACHE_CONTROL)
         
         # Parse resume
-        result = parser.parse_resume_text(
+        # Concurrent identical requests share one analysis
+        analysis_view = response_view(fields, view)
+        result = await analysis_flights.do(etag, lambda: run_analysis(
+            "parse_resume_text",
             request.resumeText,
             phase=request.phase,
             job_context=job_context,
-            user_prefs=user_prefs
-        )
+            user_prefs=user_prefs,
+            session_id=request.sessionId,
+            view=analysis_view,
+            affinity=session_affinity(request.resumeText, request.sessionId)
+        ))
         
         # Wrap in request/response structure
         response = {
-            "request": {
-                "phase": request.phase,
-                "jobContext": job_context,
-                "userPrefs": user_prefs,
-                "textLength": len(request.resumeText)
-            },
+            "request": request_echo,
             "response": result
         }
         
         logger.info(f"Successfully analyzed resume (Phase {request.phase})")
-        return response
+        return analysis_response(response, etag)
     
     except HTTPException:
         raise
@@ -195,6 +436,65 @@ async def analyze_resume_text(request: ResumeAnalysisRequest):
         logger.error(f"Error in analyze_resume_text: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/v1/analyze-resume/multi-role", summary="Analyze resume against several roles")
+async def analyze_resume_multi_role(
+    request: MultiRoleAnalysisRequest,
+    fields: Optional[str] = Query(None, description="Comma-separated response sections to return"),
+    view: Optional[str] = Query(None, description="Response detail: full or compact"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Extract skills once and analyze them against each requested role
+    
+    Roles in the response are ranked by match score
+    """
+    try:
+        if not request.resumeText and not request.sessionId:
+            raise HTTPException(status_code=400, detail="resumeText or sessionId required")
+        
+        if not request.jobContexts or len(request.jobContexts) > config.MAX_ROLES_PER_REQUEST:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Between 1 and {config.MAX_ROLES_PER_REQUEST} jobContexts required"
+            )
+        
+        job_contexts = [job_context.dict() for job_context in request.jobContexts]
+        user_prefs = request.userPrefs.dict() if request.userPrefs else None
+        request_echo = {
+            "phase": request.phase,
+            "jobContexts": job_contexts,
+            "userPrefs": user_prefs,
+            "textLength": len(request.resumeText or ""),
+            "sessionId": request.sessionId
+        }
+        
+        etag = analysis_etag("analyze-resume/multi-role", request_echo, request.resumeText, fields, view)
+        if analysis_not_modified(if_none_match, etag):
+            return not_modified(etag, config.ANALYSIS_CACHE_CONTROL)
+        
+        analysis_view = response_view(fields, view)
+        result = await analysis_flights.do(etag, lambda: run_analysis(
+            "parse_resume_multi_role",
+            request.resumeText,
+            job_contexts,
+            phase=request.phase,
+            user_prefs=user_prefs,
+            session_id=request.sessionId,
+            view=analysis_view,
+            affinity=session_affinity(request.resumeText, request.sessionId)
+        ))
+        
+        return analysis_response({
+            "request": request_echo,
+            "response": result
+        }, etag)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in analyze_resume_multi_role: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/v1/analyze-resume-file", summary="Analyze resume from file")
 async def analyze_resume_file(
     file: UploadFile = File(..., description="Resume file (PDF, DOCX, TXT)"),
@@ -203,7 +503,11 @@ async def analyze_resume_file(
     job_title: Optional[str] = Query(None, description="Job title"),
     learning_style: Optional[str] = Query("mixed", description="Learning style"),
     budget_limit: Optional[float] = Query(1000, description="Budget limit"),
-    hours_per_week: Optional[int] = Query(10, description="Hours per week")
+    hours_per_week: Optional[int] = Query(10, description="Hours per week"),
+    selection_mode: Optional[str] = Query("greedy", description="Course selection mode (greedy or optimal)"),
+    fields: Optional[str] = Query(None, description="Comma-separated response sections to return"),
+    view: Optional[str] = Query(None, description="Response detail: full or compact"),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Analyze resume from uploaded file
@@ -214,7 +518,7 @@ async def analyze_resume_file(
         # Validate file
         if not file.filename:
             raise HTTPException(status_code=400, detail="No file uploaded")
-            
+        
         if file.size and file.size > config.MAX_FILE_SIZE:
             raise HTTPException(status_code=413, detail=f"File too large. Max size: {config.MAX_FILE_SIZE/1024/1024}MB")
         
@@ -232,32 +536,44 @@ async def analyze_resume_file(
                 detail="job_role_id required for Phase 2+ analysis"
             )
         
-        start_time = time.time()
+        content = await file.read()
+        
+        # Prepare context and preferences
+        job_context = None
+        if job_role_id:
+            job_context = {"roleId": job_role_id, "title": job_title}
+        
+        user_prefs = {
+            "learningStyle": learning_style,
+            "budgetLimit": budget_limit,
+            "hoursPerWeek": hours_per_week,
+            "selectionMode": selection_mode
+        }
+        request_echo = {
+            "filename": file.filename,
+            "phase": phase,
+            "jobContext": job_context,
+            "userPrefs": user_prefs
+        }
+        
+        etag = analysis_etag("analyze-resume-file", request_echo, hashlib.sha256(content).hexdigest(), fields, view)
+        if analysis_not_modified(if_none_match, etag):
+            return not_modified(etag, config.ANALYSIS_CACHE_CONTROL)
         
         # Save temporary file
         with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp_file:
-            content = await file.read()
             tmp_file.write(content)
             tmp_file_path = Path(tmp_file.name)
         
         try:
-            # Prepare context and preferences
-            job_context = None
-            if job_role_id:
-                job_context = {"roleId": job_role_id, "title": job_title}
-            
-            user_prefs = {
-                "learningStyle": learning_style,
-                "budgetLimit": budget_limit,
-                "hoursPerWeek": hours_per_week
-            }
-            
             # Parse resume
-            result = parser.parse_resume_file(
+            result = await run_analysis(
+                "parse_resume_file",
                 tmp_file_path,
                 phase=phase,
                 job_context=job_context,
-                user_prefs=user_prefs
+                user_prefs=user_prefs,
+                view=response_view(fields, view)
             )
             
             # Add file metadata
@@ -266,17 +582,12 @@ async def analyze_resume_file(
             result["meta"]["fileType"] = file_ext
             
             response = {
-                "request": {
-                    "filename": file.filename,
-                    "phase": phase,
-                    "jobContext": job_context,
-                    "userPrefs": user_prefs
-                },
+                "request": request_echo,
                 "response": result
             }
             
             logger.info(f"Successfully analyzed file: {file.filename} (Phase {phase})")
-            return response
+            return analysis_response(response, etag)
         
         finally:
             # Clean up temp file
@@ -289,38 +600,283 @@ async def analyze_resume_file(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/v1/job-roles/{role_id}", summary="Get job role details")
-async def get_job_role_details(role_id: str):
+async def get_job_role_details(role_id: str, if_none_match: Optional[str] = Header(None)):
     """Get detailed requirements for a specific job role"""
     try:
-        role_details = job_manager.get_role_requirements(role_id)
+        snapshot = catalog.snapshot
+        etag = make_etag("job-role", role_id, snapshot.version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, catalog_cache_control)
+        
+        role_details = snapshot.job_manager.get_role_requirements(role_id)
         if not role_details:
             raise HTTPException(status_code=404, detail=f"Job role '{role_id}' not found")
         
+        return cached_json({
+            "roleId": role_id,
+            "details": role_details,
+            "catalogVersion": snapshot.version
+        }, etag, catalog_cache_control)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting job role details: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/v1/best-fit-roles", summary="Rank job roles that best fit a resume")
+async def best_fit_roles(request: BestFitRolesRequest):
+    """
+    Score a resume against every available job role at once
+    
+    Returns the top-k roles by match score with their gap counts
+    """
+    try:
+        start_time = time.time()
+        
+        snapshot = catalog.snapshot
+        phase1_result = await run_analysis(
+            "parse_resume_text", request.resumeText, phase=1,
+            affinity=session_affinity(request.resumeText, None)
+        )
+        ranked_roles = snapshot.skill_matcher.rank_roles(phase1_result.get('skills', []), request.topK)
+        
+        return {
+            "roles": ranked_roles,
+            "total": len(ranked_roles),
+            "skillsCount": len(phase1_result.get('skills', [])),
+            "meta": {
+                "rolesScored": len(snapshot.job_manager.job_roles),
+                "catalogVersion": snapshot.version,
+                "latencyMs": int((time.time() - start_time) * 1000)
+            }
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in best_fit_roles: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/v1/job-roles/{role_id}/candidates", summary="Rank stored candidates for a job role")
+async def rank_role_candidates(
+    role_id: str,
+    top_k: int = Query(50, description="Number of candidates to return", ge=1, le=1000)
+):
+    """Rank previously analyzed resumes against a role using the skill index"""
+    try:
+        snapshot = catalog.snapshot
+        if not snapshot.job_manager.get_role_requirements(role_id):
+            raise HTTPException(status_code=404, detail=f"Job role '{role_id}' not found")
+        
+        start_time = time.time()
+        # The index the analyses add to
+        index = parser.pipeline.candidate_index or get_candidate_index(config)
+        candidates = await asyncio.to_thread(
+            index.rank_candidates, role_id, top_k, job_manager=snapshot.job_manager
+        )
+        indexed = await asyncio.to_thread(index.count_candidates)
+        
         return {
             "roleId": role_id,
-            "details": role_details
+            "candidates": candidates,
+            "total": len(candidates),
+            "meta": {
+                "indexedCandidates": indexed,
+                "catalogVersion": snapshot.version,
+                "latencyMs": int((time.time() - start_time) * 1000)
+            }
         }
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting job role details: {e}")
+        logger.error(f"Error ranking candidates: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/v1/what-if", summary="Start a what-if scoring session")
+async def create_what_if_session(request: WhatIfSessionRequest):
+    """
+    Start a what-if session for a resume against a role
+    
+    Later skill changes are applied as incremental deltas to the session
+    """
+    try:
+        if request.skills is None and not request.resumeText:
+            raise HTTPException(status_code=400, detail="skills or resumeText required")
+        snapshot = catalog.snapshot
+        if not snapshot.job_manager.get_role_requirements(request.roleId):
+            raise HTTPException(status_code=404, detail=f"Job role '{request.roleId}' not found")
+        
+        if request.skills is not None:
+            try:
+                skills = [WhatIfSkill(**skill).dict() for skill in request.skills]
+            except ValidationError as e:
+                error = e.errors()[0]
+                raise HTTPException(status_code=400, detail=f"Invalid skill: {error['loc'][0]} {error['msg'].lower()}")
+        else:
+            phase1_result = await run_analysis(
+                "parse_resume_text", request.resumeText, phase=1,
+                affinity=session_affinity(request.resumeText, None)
+            )
+            skills = phase1_result.get('skills', [])
+        
+        session_id = what_if_sessions.create(skills, request.roleId, snapshot.skill_matcher)
+        session = what_if_sessions.get(session_id)
+        
+        return {
+            "sessionId": session_id,
+            "roleId": request.roleId,
+            "catalogVersion": snapshot.version,
+            **session.result()
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating what-if session: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/v1/what-if/{session_id}", summary="Apply what-if skill changes")
+async def update_what_if_session(session_id: str, request: WhatIfUpdateRequest):
+    """Apply skill additions or level changes and return the updated match score and gaps"""
+    try:
+        update = what_if_sessions.apply_changes(
+            session_id, [change.dict() for change in request.changes], catalog.snapshot.skill_matcher
+        )
+        if update is None:
+            raise HTTPException(status_code=404, detail=f"What-if session '{session_id}' not found")
+        
+        return {"sessionId": session_id, **update}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating what-if session: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+def encode_stream_event(stream_format: str, event: str, record: Dict[str, Any]) -> bytes:
+    """One NDJSON line, or one server-sent event"""
+    if stream_format == "sse":
+        return b"event: " + event.encode('utf-8') + b"\ndata: " + dumps_line(record) + b"\n"
+    return dumps_line({"event": event, **record})
+
+async def stream_batch_results(items: List[Tuple[int, str, Optional[Path], Optional[str]]],
+                               upload_dir: Path, phase: int,
+                               job_context: Optional[Dict[str, Any]],
+                               stream_format: str,
+                               view: Optional[ResponseView] = None) -> AsyncIterator[bytes]:
+    """Yield each file's result as soon as it finishes, then a summary
+    
+    Results arrive in completion order with their upload `index`. Nothing is
+    kept after it is sent, so memory does not grow with the batch size.
+    """
+    finished: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+    semaphore = asyncio.Semaphore(max(1, analysis_pool.workers))
+    
+    async def analyze(index: int, filename: str, path: Optional[Path], error: Optional[str]) -> None:
+        record = {"index": index, "filename": filename}
+        if error is None:
+            async with semaphore:
+                try:
+                    result = await analysis_pool.run_queued(
+                        "parse_resume_file", path, phase=phase, job_context=job_context, view=view,
+                        priority="batch"
+                    )
+                    record.update(status="success", **summarize_item(result, phase))
+                except Exception as e:
+                    error = str(e)
+                finally:
+                    path.unlink(missing_ok=True)
+        if error is not None:
+            record.update(status="error", error=error)
+        await finished.put(record)
+    
+    tasks = [asyncio.create_task(analyze(*item)) for item in items]
+    counts = {"success": 0, "error": 0}
+    try:
+        for _ in range(len(items)):
+            record = await finished.get()
+            counts[record["status"]] += 1
+            yield encode_stream_event(stream_format, "result", record)
+        
+        yield encode_stream_event(stream_format, "summary", {
+            "totalFiles": len(items),
+            "successful": counts["success"],
+            "failed": counts["error"]
+        })
+    finally:
+        # Also runs when the client disconnects mid-stream
+        for task in tasks:
+            task.cancel()
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
 @app.post("/api/v1/batch-analyze", summary="Batch analyze multiple resumes")
 async def batch_analyze_resumes(
+    request: Request,
     files: List[UploadFile] = File(..., description="Multiple resume files"),
     phase: int = Query(1, description="Analysis phase (1-3)", ge=1, le=3),
-    job_role_id: Optional[str] = Query(None, description="Target job role ID")
+    job_role_id: Optional[str] = Query(None, description="Target job role ID"),
+    stream: Optional[str] = Query(None, description="Stream results as they finish (ndjson or sse)"),
+    fields: Optional[str] = Query(None, description="Comma-separated response sections to return"),
+    view: Optional[str] = Query(None, description="Response detail: full or compact")
 ):
     """
     Analyze multiple resume files in batch
     
-    Limited to 10 files per request for performance
+    Up to 10 files are analyzed inline. Larger batches are accepted as a
+    background job (202) to poll at `/api/v1/jobs/{jobId}`.
+    
+    With `stream=ndjson` or `stream=sse` (or an `Accept` header of
+    `application/x-ndjson` / `text/event-stream`), each file's result is sent
+    as soon as it finishes, followed by a summary event.
     """
     try:
-        if len(files) > 10:
-            raise HTTPException(status_code=400, detail="Maximum 10 files per batch")
+        batch_view = response_view(fields, view)
+        accept = request.headers.get("accept", "")
+        stream = stream or next(
+            (name for name, media_type in STREAM_MEDIA_TYPES.items() if media_type in accept), None
+        )
+        if stream is not None:
+            if stream not in STREAM_MEDIA_TYPES:
+                raise HTTPException(status_code=400, detail=f"stream must be one of {list(STREAM_MEDIA_TYPES)}")
+            if len(files) > config.JOB_MAX_FILES:
+                raise HTTPException(status_code=400, detail=f"Maximum {config.JOB_MAX_FILES} files per batch")
+            if phase >= 2 and not job_role_id:
+                raise HTTPException(status_code=400, detail="job_role_id required for Phase 2+ analysis")
+            
+            # Uploads are spooled to disk before streaming starts
+            upload_dir = Path(tempfile.mkdtemp(prefix="batch-stream-"))
+            items = []
+            try:
+                for index, file in enumerate(files):
+                    file_ext = Path(file.filename or "").suffix.lower()
+                    if file_ext not in config.ALLOWED_EXTENSIONS:
+                        items.append((index, file.filename, None, f"Unsupported file format: {file_ext}"))
+                        continue
+                    content = await file.read()
+                    if len(content) > config.MAX_FILE_SIZE:
+                        items.append((index, file.filename, None,
+                                      f"File too large. Max size: {config.MAX_FILE_SIZE/1024/1024}MB"))
+                        continue
+                    stored_path = upload_dir / f"{index:05d}{file_ext}"
+                    stored_path.write_bytes(content)
+                    items.append((index, file.filename, stored_path, None))
+            except BaseException:
+                shutil.rmtree(upload_dir, ignore_errors=True)
+                raise
+            
+            job_context = {"roleId": job_role_id} if job_role_id else None
+            return StreamingResponse(
+                stream_batch_results(items, upload_dir, phase, job_context, stream, batch_view),
+                media_type=STREAM_MEDIA_TYPES[stream],
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        
+        if len(files) > config.BATCH_INLINE_MAX_FILES:
+            return JSONResponse(status_code=202, content=await submit_batch_job(files, phase, job_role_id))
         
         results = []
         
@@ -344,7 +900,11 @@ async def batch_analyze_resumes(
                 
                 try:
                     job_context = {"roleId": job_role_id} if job_role_id else None
-                    result = parser.parse_resume_file(tmp_file_path, phase=phase, job_context=job_context)
+                    # Waits out saturation; a timeout fails only this file
+                    result = await analysis_pool.run_queued(
+                        "parse_resume_file", tmp_file_path, phase=phase, job_context=job_context,
+                        view=batch_view, priority="batch"
+                    )
                     
                     results.append({
                         "filename": file.filename,
@@ -356,7 +916,9 @@ async def batch_analyze_resumes(
                 
                 finally:
                     tmp_file_path.unlink(missing_ok=True)
-                    
+            
+            except HTTPException:
+                raise
             except Exception as e:
                 results.append({
                     "filename": file.filename,
@@ -377,6 +939,101 @@ async def batch_analyze_resumes(
         logger.error(f"Error in batch analyze: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def job_links(job_id: str) -> Dict[str, str]:
+    return {
+        "status": f"/api/v1/jobs/{job_id}",
+        "results": f"/api/v1/jobs/{job_id}/results"
+    }
+
+async def submit_batch_job(files: List[UploadFile], phase: int,
+                           job_role_id: Optional[str]) -> Dict[str, Any]:
+    """Store uploaded files and queue them as a background batch job"""
+    if len(files) > config.JOB_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Maximum {config.JOB_MAX_FILES} files per job")
+    if phase >= 2 and not job_role_id:
+        raise HTTPException(status_code=400, detail="job_role_id required for Phase 2+ analysis")
+    
+    job_id = job_store.new_job_id()
+    job_dir = job_store.job_dir(job_id)
+    job_dir.mkdir(parents=True, exist_ok=True)
+    
+    items = []
+    try:
+        for item_num, file in enumerate(files):
+            file_ext = Path(file.filename or "").suffix.lower()
+            if file_ext not in config.ALLOWED_EXTENSIONS:
+                items.append((file.filename, None, f"Unsupported file format: {file_ext}"))
+                continue
+            
+            content = await file.read()
+            if len(content) > config.MAX_FILE_SIZE:
+                items.append((file.filename, None, f"File too large. Max size: {config.MAX_FILE_SIZE/1024/1024}MB"))
+                continue
+            
+            stored_path = job_dir / f"{item_num:05d}{file_ext}"
+            stored_path.write_bytes(content)
+            items.append((file.filename, stored_path, None))
+    except BaseException:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise
+    
+    job_context = {"roleId": job_role_id} if job_role_id else None
+    job_store.create_job(job_id, phase, job_context, items)
+    job_runner.notify()
+    logger.info(f"Queued batch job {job_id} ({len(items)} files)")
+    
+    return {**job_store.get_job(job_id), "links": job_links(job_id)}
+
+@app.post("/api/v1/jobs/batch-analyze", status_code=202, summary="Submit a batch analysis job")
+async def submit_batch_analyze_job(
+    files: List[UploadFile] = File(..., description="Resume files"),
+    phase: int = Query(1, description="Analysis phase (1-3)", ge=1, le=3),
+    job_role_id: Optional[str] = Query(None, description="Target job role ID")
+):
+    """
+    Queue resume files for background analysis
+    
+    Returns immediately with a job id; poll the status link for progress and
+    page through per-file results once they are available
+    """
+    try:
+        return await submit_batch_job(files, phase, job_role_id)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error submitting batch job: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/v1/jobs/{job_id}", summary="Get batch job status")
+async def get_batch_job(job_id: str):
+    """Status and progress of a batch job"""
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return {**job, "links": job_links(job_id)}
+
+@app.get("/api/v1/jobs/{job_id}/results", summary="Get batch job results")
+async def get_batch_job_results(
+    job_id: str,
+    offset: int = Query(0, description="First result to return", ge=0),
+    limit: int = Query(100, description="Number of results to return", ge=1, le=500)
+):
+    """Per-file results of a batch job in upload order (pending files included)"""
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    
+    results = job_store.get_results(job_id, offset, limit)
+    return {
+        "jobId": job_id,
+        "status": job["status"],
+        "offset": offset,
+        "limit": limit,
+        "totalFiles": job["totalFiles"],
+        "results": results
+    }
+
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
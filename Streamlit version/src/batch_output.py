@@ -0,0 +1,135 @@
+import gzip
+import json
+import logging
+from typing import List, Dict, Any, Optional, IO
+from pathlib import Path
+
+from config import Config
+
+# Fast serializer when available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def dumps_line(record: Dict[str, Any]) -> bytes:
+    """Serialize a record as one compact JSON line"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(record, default=str,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, separators=(',', ':'), ensure_ascii=False, default=str) + "\n").encode('utf-8')
+
+class JsonlBatchWriter:
+    """Stream batch results as JSON lines into rotating, optionally gzipped files
+    
+    Records are written as they arrive and never kept in memory. A new part
+    file is started once the current one reaches `max_bytes` of uncompressed
+    data, so every part can be loaded on its own by downstream tools.
+    """
+    
+    def __init__(self, output_folder: Path, prefix: str = "analysis",
+                 max_bytes: Optional[int] = None, compress: Optional[bool] = None,
+                 config: Optional[Config] = None):
+        self.config = config or Config()
+        self.output_folder = Path(output_folder)
+        self.prefix = prefix
+        self.max_bytes = max_bytes or self.config.BATCH_OUTPUT_MAX_BYTES
+        self.compress = self.config.BATCH_OUTPUT_COMPRESS if compress is None else compress
+        
+        self.output_folder.mkdir(parents=True, exist_ok=True)
+        self.files: List[Path] = []
+        self.records = 0
+        self._file: Optional[IO[bytes]] = None
+        self._file_bytes = 0
+    
+    def _next_path(self) -> Path:
+        part = len(self.files)
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        path = self.output_folder / f"{self.prefix}-{part:05d}{suffix}"
+        # Never overwrite parts from an earlier run in the same folder
+        while path.exists():
+            part += 1
+            path = self.output_folder / f"{self.prefix}-{part:05d}{suffix}"
+        return path
+    
+    def _rotate(self) -> None:
+        self._close_file()
+        path = self._next_path()
+        self._file = gzip.open(path, 'wb') if self.compress else open(path, 'wb')
+        self._file_bytes = 0
+        self.files.append(path)
+    
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def write(self, record: Dict[str, Any]) -> None:
+        """Append one record"""
+        line = dumps_line(record)
+        if self._file is None or (self._file_bytes and self._file_bytes + len(line) > self.max_bytes):
+            self._rotate()
+        self._file.write(line)
+        self._file_bytes += len(line)
+        self.records += 1
+    
+    def flush(self) -> None:
+        """Flush buffered lines of the current part"""
+        if self._file is not None:
+            self._file.flush()
+    
+    def close(self) -> None:
+        """Close the current part"""
+        self._close_file()
+    
+    def __enter__(self) -> "JsonlBatchWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+def read_jsonl(path: Path):
+    """Iterate over the records of a (possibly gzipped) JSONL part"""
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+if __name__ == "__main__":
+    # Test the JSONL writer
+    Config.create_directories()
+    
+    import tempfile
+    import time
+    
+    record = {
+        "resumeId": "resume_0",
+        "status": "success",
+        "skills": [{"name": f"Skill {i}", "level": "Intermediate", "score": 80} for i in range(20)]
+    }
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for compress in (False, True):
+            start = time.time()
+            with JsonlBatchWriter(Path(tmp_dir) / str(compress), max_bytes=1024 * 1024,
+                                  compress=compress) as writer:
+                for i in range(20000):
+                    writer.write(dict(record, resumeId=f"resume_{i}"))
+            print(f"compress={compress}: {writer.records} records in {len(writer.files)} parts, "
+                  f"{time.time() - start:.2f}s (orjson: {ORJSON_AVAILABLE})")
+        
+        start = time.time()
+        for i in range(2000):
+            with open(Path(tmp_dir) / f"resume_{i}_analysis.json", 'w', encoding='utf-8') as f:
+                json.dump(record, f, indent=2)
+        print(f"Per-file json.dump(indent=2) x2000: {time.time() - start:.2f}s")
+        
+        count = sum(1 for path in writer.files for _ in read_jsonl(path))
+        print(f"Read back {count} records")
@@ -0,0 +1,293 @@
+import json
+import heapq
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+from collections import defaultdict
+
+from config import Config
+from gap_analyzer import (
+    JobRoleManager, LEVEL_HIERARCHY, REQUIRED_SKILLS_WEIGHT, PREFERRED_SKILLS_WEIGHT
+)
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class CandidateSkillIndex:
+    """Persistent inverted index from canonical skill to candidate postings
+    
+    Postings are (resume id, level, score) rows clustered by skill in SQLite, so
+    ranking candidates for a role only reads the postings of the role's skills
+    and never touches resume text or the NLP pipeline. The analysis pipeline
+    adds every new phase-1 result under its session id (the resume's content
+    hash), so a resume analyzed through any path is one candidate.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS candidates (
+            resume_id TEXT PRIMARY KEY,
+            name TEXT,
+            skills_count INTEGER NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS postings (
+            skill TEXT NOT NULL,
+            resume_id TEXT NOT NULL,
+            level INTEGER NOT NULL,
+            score INTEGER NOT NULL,
+            PRIMARY KEY (skill, resume_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_postings_resume ON postings (resume_id);
+    """
+    
+    def __init__(self, config: Optional[Config] = None,
+                 index_path: Optional[Path] = None,
+                 job_manager: Optional[JobRoleManager] = None):
+        self.config = config or Config()
+        self.index_path = Path(index_path or self.config.get_candidate_index_path())
+        self._job_manager = job_manager
+        
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+    
+    @property
+    def job_manager(self) -> JobRoleManager:
+        """Roles to rank against, loaded on first use (indexing does not need them)"""
+        if self._job_manager is None:
+            self._job_manager = JobRoleManager(self.config)
+        return self._job_manager
+    
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+    
+    def add_resume(self, resume_id: str, skills: List[Dict[str, Any]],
+                   name: Optional[str] = None) -> int:
+        """Index (or re-index) one resume from its phase-1 skills"""
+        return self.add_resumes([(resume_id, skills, name)])
+    
+    def add_resumes(self, entries: List[Tuple[str, List[Dict[str, Any]], Optional[str]]]) -> int:
+        """Index a batch of resumes in a single transaction, replacing old postings
+        
+        A resume re-indexed without a name keeps the name it was stored with.
+        """
+        postings_written = 0
+        now = time.time()
+        
+        with self._lock, self._conn:
+            for resume_id, skills, name in entries:
+                # Later duplicates win, as in the phase-2 skill lookup
+                postings = {}
+                for skill in skills:
+                    postings[skill['name'].lower()] = (
+                        LEVEL_HIERARCHY.get(skill.get('level', 'Beginner'), 1),
+                        int(skill.get('score', 0))
+                    )
+                
+                self._conn.execute("DELETE FROM postings WHERE resume_id = ?", (resume_id,))
+                self._conn.executemany(
+                    "INSERT INTO postings (skill, resume_id, level, score) VALUES (?, ?, ?, ?)",
+                    [(skill, resume_id, level, score) for skill, (level, score) in postings.items()]
+                )
+                self._conn.execute(
+                    "INSERT INTO candidates (resume_id, name, skills_count, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (resume_id) DO UPDATE SET name = COALESCE(excluded.name, candidates.name), "
+                    "skills_count = excluded.skills_count, updated_at = excluded.updated_at",
+                    (resume_id, name, len(postings), now)
+                )
+                postings_written += len(postings)
+        
+        return postings_written
+    
+    def remove_resume(self, resume_id: str) -> bool:
+        """Remove a resume and its postings from the index"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM postings WHERE resume_id = ?", (resume_id,))
+            cursor = self._conn.execute("DELETE FROM candidates WHERE resume_id = ?", (resume_id,))
+            return cursor.rowcount > 0
+    
+    def index_analysis_folder(self, analysis_folder: Path) -> Dict[str, Any]:
+        """Index saved `*_analysis.json` outputs from batch processing
+        
+        Results carrying an analysis session id are indexed under it, like
+        live analyses; older outputs fall back to the file name.
+        """
+        analysis_folder = Path(analysis_folder)
+        entries = []
+        failed = 0
+        
+        for analysis_file in sorted(analysis_folder.glob("*_analysis.json")):
+            try:
+                with open(analysis_file, 'r', encoding='utf-8') as f:
+                    result = json.load(f)
+                name = analysis_file.stem[:-len("_analysis")]
+                session_id = ((result.get('meta') or {}).get('pipeline') or {}).get('sessionId')
+                entries.append((session_id or name, result.get('skills', []), name))
+            except Exception as e:
+                failed += 1
+                logger.error(f"Could not index {analysis_file.name}: {e}")
+        
+        postings = self.add_resumes(entries)
+        return {"indexed": len(entries), "failed": failed, "postings": postings}
+    
+    def count_candidates(self) -> int:
+        """Number of resumes in the index"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+    
+    def rank_candidates(self, role_id: str, top_k: int = 50,
+                        job_manager: Optional[JobRoleManager] = None) -> List[Dict[str, Any]]:
+        """Rank indexed candidates against a role's weighted requirements"""
+        role_requirements = (job_manager or self.job_manager).get_role_requirements(role_id)
+        if not role_requirements:
+            raise ValueError(f"Role {role_id} not found")
+        
+        # skill -> [(group, required level, weight, priority)]
+        requirements = defaultdict(list)
+        group_weights = [0.0, 0.0]
+        group_sizes = [0, 0]
+        for group, key in enumerate(('required_skills', 'preferred_skills')):
+            for req_skill in role_requirements.get(key, []):
+                weight = 6 - req_skill['priority']
+                requirements[req_skill['skill'].lower()].append(
+                    (group, LEVEL_HIERARCHY.get(req_skill['level'], 3), weight, req_skill['priority'])
+                )
+                group_weights[group] += weight
+                group_sizes[group] += 1
+        total_requirements = sum(group_sizes)
+        total_critical = sum(
+            1 for reqs in requirements.values() for req in reqs if req[3] <= 2
+        )
+        
+        if not requirements:
+            return []
+        
+        # Accumulate weighted group scores from the postings of the role's skills
+        accumulators: Dict[str, List[float]] = {}
+        placeholders = ",".join("?" * len(requirements))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT skill, resume_id, level FROM postings WHERE skill IN ({placeholders})",
+                list(requirements.keys())
+            ).fetchall()
+        
+        for skill, resume_id, level in rows:
+            # [required score, preferred score, met requirements, met critical, matched skills]
+            acc = accumulators.get(resume_id)
+            if acc is None:
+                acc = accumulators[resume_id] = [0.0, 0.0, 0, 0, 0]
+            acc[4] += 1
+            for group, required_level, weight, priority in requirements[skill]:
+                if level >= required_level:
+                    acc[group] += 100 * weight
+                    acc[2] += 1
+                    if priority <= 2:
+                        acc[3] += 1
+                else:
+                    acc[group] += (level / required_level) * 100 * weight
+        
+        def group_score(total: float, group: int) -> float:
+            if group_sizes[group] == 0:
+                return 100.0
+            return total / group_weights[group] if group_weights[group] > 0 else 0
+        
+        def overall(item: Tuple[str, List[float]]) -> float:
+            acc = item[1]
+            return (group_score(acc[0], 0) * REQUIRED_SKILLS_WEIGHT) + \
+                (group_score(acc[1], 1) * PREFERRED_SKILLS_WEIGHT)
+        
+        # Bounded heap keeps only top_k candidates regardless of index size
+        top = heapq.nlargest(top_k, accumulators.items(), key=overall)
+        
+        ranked = []
+        for rank, (resume_id, acc) in enumerate(top, start=1):
+            ranked.append({
+                "rank": rank,
+                "resumeId": resume_id,
+                "overall_score": int(overall((resume_id, acc))),
+                "required_skills_score": int(group_score(acc[0], 0)),
+                "preferred_skills_score": int(group_score(acc[1], 1)),
+                "matched_skills": acc[4],
+                "total_gaps": total_requirements - acc[2],
+                "critical_gaps": total_critical - acc[3]
+            })
+        
+        return ranked
+
+_shared_index: Optional[CandidateSkillIndex] = None
+_shared_index_pid: Optional[int] = None
+_shared_index_lock = threading.Lock()
+
+def get_candidate_index(config: Optional[Config] = None) -> CandidateSkillIndex:
+    """Get the shared candidate index of this process (opened on first use)
+    
+    A forked child (e.g. a server worker) opens its own connection instead of
+    using the one inherited from its parent.
+    """
+    global _shared_index, _shared_index_pid
+    with _shared_index_lock:
+        if _shared_index is None or _shared_index_pid != os.getpid():
+            _shared_index = CandidateSkillIndex(config)
+            _shared_index_pid = os.getpid()
+        return _shared_index
+
+def rank_candidates_for_role(role_id: str, top_k: int = 50,
+                             index_path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Rank stored candidates for a role from the persistent skill index"""
+    try:
+        index = CandidateSkillIndex(index_path=index_path)
+        try:
+            return index.rank_candidates(role_id, top_k)
+        finally:
+            index.close()
+    
+    except Exception as e:
+        logger.error(f"Error in rank_candidates_for_role: {e}")
+        return []
+
+if __name__ == "__main__":
+    # Test the candidate index
+    Config.create_directories()
+    
+    import random
+    import tempfile
+    
+    levels = list(LEVEL_HIERARCHY.keys())
+    skill_pool = ["Python", "JavaScript", "System Design", "Leadership", "Mentoring",
+                  "Architecture", "Microservices", "Kubernetes", "Team Management",
+                  "SQL", "React", "Docker", "AWS", "Git", "Java", "Go"]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index = CandidateSkillIndex(index_path=Path(tmp_dir) / "candidates.db")
+        
+        # Build a synthetic index of stored resumes
+        start = time.time()
+        entries = []
+        for i in range(20000):
+            skills = [
+                {"name": name, "level": random.choice(levels), "score": random.randint(60, 100)}
+                for name in random.sample(skill_pool, random.randint(3, 10))
+            ]
+            entries.append((f"resume_{i}", skills, None))
+        index.add_resumes(entries)
+        print(f"Indexed {index.count_candidates()} resumes in {time.time() - start:.2f}s")
+        
+        # Rank candidates
+        start = time.time()
+        top_candidates = index.rank_candidates("senior_software_engineer", top_k=5)
+        print("=== CANDIDATE RANKING TEST ===")
+        print(json.dumps(top_candidates, indent=2))
+        print(f"Ranking latency: {(time.time() - start) * 1000:.1f}ms")
+        
+        index.close()
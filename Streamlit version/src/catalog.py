@@ -0,0 +1,222 @@
+import hashlib
+import logging
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+
+from config import Config
+from gap_analyzer import JobRoleManager, SkillMatcher
+from recommendation_engine import CourseDatabase, RecommendationEngine, reload_recommendation_engine
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class CatalogSnapshot:
+    """Consistent, read-only view of the role and course catalogs
+    
+    A request grabs one snapshot up front and uses it throughout, so a reload
+    in the middle of the request never mixes old and new catalog data.
+    """
+    
+    def __init__(self, version: str, job_manager: JobRoleManager,
+                 recommendation_engine: RecommendationEngine, config: Optional[Config] = None):
+        self.version = version
+        self.loaded_at = time.time()
+        self.job_manager = job_manager
+        self.recommendation_engine = recommendation_engine
+        self.course_db = recommendation_engine.course_db
+        self.skill_matcher = SkillMatcher(config, job_manager=job_manager)
+
+class CatalogWatcher:
+    """Watch catalog files and rebuild the precompiled indexes on change
+    
+    Files are polled by modification time and size. When they change, a new
+    snapshot (roles, role requirement matrix, courses, skill-course mapping) is
+    built in the background and swapped in with a single reference assignment.
+    """
+    
+    def __init__(self, config: Optional[Config] = None,
+                 poll_interval: Optional[float] = None):
+        self.config = config or Config()
+        self.poll_interval = poll_interval or self.config.CATALOG_POLL_INTERVAL
+        
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._fingerprint: Optional[Tuple] = None
+        self._build_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reload_count = 0
+    
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        """Current catalog snapshot (built on first access)"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.reload(force=False)
+        return snapshot
+    
+    @property
+    def version(self) -> str:
+        """Version of the current catalog snapshot"""
+        return self.snapshot.version
+    
+    def catalog_files(self) -> List[Path]:
+        """Files that make up the role and course catalogs"""
+        files = [self.config.get_job_roles_path()]
+        files.extend(self.config.COURSES_DIR / name for name in CourseDatabase.COURSE_FILES)
+        return files
+    
+    def _compute_fingerprint(self) -> Tuple:
+        fingerprint = []
+        for path in self.catalog_files():
+            try:
+                stat = path.stat()
+                fingerprint.append((str(path), stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                fingerprint.append((str(path), None, None))
+        return tuple(fingerprint)
+    
+    @staticmethod
+    def _version_from_fingerprint(fingerprint: Tuple) -> str:
+        return hashlib.sha1(repr(fingerprint).encode('utf-8')).hexdigest()[:12]
+    
+    def _build_snapshot(self, fingerprint: Tuple) -> CatalogSnapshot:
+        """Load catalogs and precompile their indexes"""
+        start_time = time.time()
+        
+        job_manager = JobRoleManager(self.config)
+        job_manager.get_requirement_matrix()
+        # Also becomes the process-wide engine used outside of snapshots
+        recommendation_engine = reload_recommendation_engine(self.config)
+        
+        snapshot = CatalogSnapshot(
+            self._version_from_fingerprint(fingerprint), job_manager, recommendation_engine, self.config
+        )
+        logger.info(f"Built catalog snapshot {snapshot.version} "
+                    f"({len(job_manager.job_roles)} roles) in {time.time() - start_time:.2f}s")
+        return snapshot
+    
+    def reload(self, force: bool = True) -> CatalogSnapshot:
+        """Rebuild the snapshot if the catalog files changed (or always, if forced)"""
+        with self._build_lock:
+            fingerprint = self._compute_fingerprint()
+            if not force and self._snapshot is not None and fingerprint == self._fingerprint:
+                return self._snapshot
+            
+            snapshot = self._build_snapshot(fingerprint)
+            # Default catalogs may have been written during the build
+            self._fingerprint = self._compute_fingerprint()
+            if self._fingerprint != fingerprint:
+                snapshot.version = self._version_from_fingerprint(self._fingerprint)
+            
+            # Atomic swap: readers see either the old or the new snapshot
+            self._snapshot = snapshot
+            self.reload_count += 1
+            return snapshot
+    
+    def check_for_changes(self) -> bool:
+        """Reload if any catalog file changed since the last build"""
+        if self._snapshot is not None and self._compute_fingerprint() == self._fingerprint:
+            return False
+        
+        previous_version = self._snapshot.version if self._snapshot else None
+        snapshot = self.reload(force=False)
+        if snapshot.version != previous_version:
+            logger.info(f"Catalog reloaded: {previous_version} -> {snapshot.version}")
+            return True
+        return False
+    
+    def _watch_loop(self) -> None:
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.check_for_changes()
+            except Exception as e:
+                # Keep serving the last good snapshot
+                logger.error(f"Catalog reload failed: {e}")
+    
+    def start(self) -> None:
+        """Build the initial snapshot and start watching in the background"""
+        self.snapshot
+        if self._thread is not None and self._thread.is_alive():
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch_loop, name="catalog-watcher", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop the background watcher"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+    
+    def status(self) -> Dict[str, Any]:
+        """Catalog status for diagnostics"""
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "loadedAt": int(snapshot.loaded_at) if snapshot else None,
+            "reloads": self.reload_count,
+            "watching": self._thread is not None and self._thread.is_alive()
+        }
+
+# Process-wide catalog watcher shared by the API and ResumeParser
+_shared_watcher: Optional[CatalogWatcher] = None
+_shared_watcher_lock = threading.Lock()
+
+def get_catalog_watcher(config: Optional[Config] = None) -> CatalogWatcher:
+    """Get the shared catalog watcher (snapshot is built on first access)"""
+    global _shared_watcher
+    with _shared_watcher_lock:
+        if _shared_watcher is None:
+            _shared_watcher = CatalogWatcher(config)
+        return _shared_watcher
+
+if __name__ == "__main__":
+    # Test catalog hot reload on a copy of the catalogs (data/ is never modified)
+    Config.create_directories()
+    
+    import json
+    import shutil
+    import tempfile
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        class TempCatalogConfig(Config):
+            JOB_ROLES_DIR = Path(tmp_dir) / "job_roles"
+            COURSES_DIR = Path(tmp_dir) / "courses"
+            INDEX_DIR = Path(tmp_dir) / "index"
+        
+        TempCatalogConfig.JOB_ROLES_DIR.mkdir()
+        TempCatalogConfig.COURSES_DIR.mkdir()
+        if Config.get_job_roles_path().exists():
+            shutil.copy2(Config.get_job_roles_path(), TempCatalogConfig.get_job_roles_path())
+        for name in CourseDatabase.COURSE_FILES:
+            if (Config.COURSES_DIR / name).exists():
+                shutil.copy2(Config.COURSES_DIR / name, TempCatalogConfig.COURSES_DIR / name)
+        
+        watcher = CatalogWatcher(TempCatalogConfig(), poll_interval=0.5)
+        watcher.start()
+        print("=== CATALOG WATCHER TEST ===")
+        print(f"Initial version: {watcher.version}")
+        
+        # Edit the copied roles file with an extra role
+        roles_path = TempCatalogConfig.get_job_roles_path()
+        with open(roles_path, 'r', encoding='utf-8') as f:
+            roles = json.load(f)
+        roles["qa_engineer"] = {
+            "title": "QA Engineer",
+            "level": "mid",
+            "required_skills": [{"skill": "Testing", "level": "Intermediate", "priority": 1}],
+            "preferred_skills": []
+        }
+        with open(roles_path, 'w', encoding='utf-8') as f:
+            json.dump(roles, f, indent=2)
+        
+        time.sleep(1.5)
+        print(f"Version after edit: {watcher.version}")
+        print(f"QA Engineer available: {watcher.snapshot.job_manager.get_role_requirements('qa_engineer') is not None}")
+        
+        watcher.stop()
@@ -16,6 +16,9 @@ class Config:
     COURSES_DIR = DATA_DIR / "courses"
     SKILLS_DIR = DATA_DIR / "skills"
     JOB_ROLES_DIR = DATA_DIR / "job_roles"
+    INDEX_DIR = DATA_DIR / "index"
+    JOBS_DIR = DATA_DIR / "jobs"
+    SESSIONS_DIR = DATA_DIR / "sessions"
     
     # Model paths
     NER_MODEL_PATH = MODELS_DIR / "ner_model"
@@ -28,12 +31,88 @@ class Config:
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
     ALLOWED_EXTENSIONS = ['.pdf', '.docx', '.txt']
     
+    # API analysis workers (0 runs analyses on threads in the API process)
+    API_WORKERS = int(os.getenv("API_WORKERS", "2"))
+    API_MAX_QUEUE = int(os.getenv("API_MAX_QUEUE", "16"))  # queued calls across workers
+    API_REQUEST_TIMEOUT = float(os.getenv("API_REQUEST_TIMEOUT", "30"))  # seconds
+    API_WARMUP = os.getenv("API_WARMUP", "1") == "1"  # not ready until models are warm
+    API_WARMUP_TIMEOUT = float(os.getenv("API_WARMUP_TIMEOUT", "300"))  # seconds
+    API_PRIORITY_WEIGHTS = {"interactive": 8, "batch": 2, "background": 1}  # worker share when all are waiting
+    MAX_ROLES_PER_REQUEST = 20
+    
+    # Preload-and-fork server (server.py): HTTP workers share preloaded models copy-on-write
+    SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "2"))
+    SERVER_MEMORY_REPORT_INTERVAL = float(os.getenv("SERVER_MEMORY_REPORT_INTERVAL", "300"))  # seconds
+    SERVER_RESTART_DELAY = 1.0  # seconds before re-forking a crashed worker, doubled per consecutive crash
+    SERVER_RESTART_MAX_DELAY = 60.0  # seconds
+    SERVER_MAX_CRASHES = 10  # consecutive crashes before a worker slot is given up
+    SERVER_STABLE_SECONDS = 60  # a worker that ran this long starts its crash count over
+    
+    # HTTP caching (ETag revalidation; max-age for catalog responses)
+    CATALOG_CACHE_MAX_AGE = int(os.getenv("CATALOG_CACHE_MAX_AGE", "60"))  # seconds
+    ANALYSIS_CACHE_CONTROL = "private, no-cache"
+    ANALYSIS_ETAG_CACHE_SIZE = int(os.getenv("ANALYSIS_ETAG_CACHE_SIZE", "10000"))  # ETags of successful analyses
+    
     # Skill extraction settings
     MIN_SKILL_CONFIDENCE = 0.6
     MAX_SKILLS_PER_RESUME = 50
     MIN_SKILL_LENGTH = 2
     MAX_SKILL_LENGTH = 50
     
+    # Catalog hot-reload settings
+    CATALOG_POLL_INTERVAL = float(os.getenv("CATALOG_POLL_INTERVAL", "5"))
+    
+    # Columnar course store settings (catalogs at least this large are memory-mapped)
+    COURSE_STORE_MIN_COURSES = int(os.getenv("COURSE_STORE_MIN_COURSES", "10000"))
+    
+    # Metrics settings (Prometheus text format at /metrics)
+    METRICS_PREFIX = "resume_analyzer"
+    METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # seconds
+    
+    # Analysis pipeline settings (memoized stage outputs kept in memory)
+    PIPELINE_CACHE_SIZE = int(os.getenv("PIPELINE_CACHE_SIZE", "512"))
+    
+    # Batch processing settings (workers > 1 parses resumes in a process pool)
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "1"))
+    BATCH_QUEUE_FACTOR = 2
+    BATCH_OUTPUT_FORMAT = os.getenv("BATCH_OUTPUT_FORMAT", "json")  # json (file per resume) or jsonl
+    BATCH_OUTPUT_MAX_BYTES = 256 * 1024 * 1024
+    BATCH_OUTPUT_COMPRESS = os.getenv("BATCH_OUTPUT_COMPRESS", "0") == "1"
+    BATCH_CHECKPOINT = os.getenv("BATCH_CHECKPOINT", "1") == "1"  # resume interrupted runs
+    BATCH_MANIFEST_NAME = "run_manifest.db"
+    BATCH_MAX_ATTEMPTS = 3
+    BATCH_CHECKPOINT_EVERY = 50  # items per manifest commit
+    BATCH_PROGRESS_INTERVAL = 30  # seconds between progress log lines
+    BATCH_METRICS_NAME = "metrics.prom"  # metrics dump written next to the outputs
+    
+    # Batch job API settings (larger uploads become background jobs)
+    BATCH_INLINE_MAX_FILES = 10
+    JOB_MAX_FILES = int(os.getenv("JOB_MAX_FILES", "1000"))
+    JOB_RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", "24"))
+    JOB_POLL_INTERVAL = 5  # seconds
+    JOB_LEASE_SECONDS = 60  # a running job is requeued if its runner stops renewing for this long
+    JOB_RUNNER_ENABLED = os.getenv("JOB_RUNNER_ENABLED", "1") == "1"  # one process per job store runs jobs
+    
+    # Candidate index settings (phase-1 results are indexed for candidate ranking)
+    CANDIDATE_INDEX_ENABLED = os.getenv("CANDIDATE_INDEX_ENABLED", "1") == "1"
+    
+    # Shared session store (analysis and what-if sessions usable from every worker process)
+    SESSION_STORE_ENABLED = os.getenv("SESSION_STORE_ENABLED", "1") == "1"
+    SESSION_STORE_MAX_ANALYSES = int(os.getenv("SESSION_STORE_MAX_ANALYSES", "10000"))
+    
+    # What-if scoring settings
+    WHAT_IF_MAX_SESSIONS = 1000
+    
+    # Course selection settings (top-rated courses scored per skill gap)
+    COURSE_CANDIDATE_LIMIT = int(os.getenv("COURSE_CANDIDATE_LIMIT", "5"))
+    
+    # Course selection optimizer settings
+    OPTIMIZER_TIME_BUDGET_MS = 50
+    OPTIMIZER_MAX_CANDIDATES = 200
+    OPTIMIZER_CANDIDATES_PER_GAP = 5
+    
     # Model settings
     SPACY_MODEL = "en_core_web_sm"
     
@@ -73,6 +152,9 @@ class Config:
             cls.COURSES_DIR,
             cls.SKILLS_DIR,
             cls.JOB_ROLES_DIR,
+            cls.INDEX_DIR,
+            cls.JOBS_DIR,
+            cls.SESSIONS_DIR,
             cls.MODELS_DIR / "ner_model",
             cls.MODELS_DIR / "skill_classifier",
             cls.LOGS_DIR
@@ -96,6 +178,26 @@ class Config:
     def get_job_roles_path(cls) -> Path:
         """Get path to job roles file"""
         return cls.JOB_ROLES_DIR / "role_requirements.json"
+    
+    @classmethod
+    def get_candidate_index_path(cls) -> Path:
+        """Get path to the candidate skill index database"""
+        return cls.INDEX_DIR / "candidate_index.db"
+    
+    @classmethod
+    def get_course_store_dir(cls) -> Path:
+        """Get path to the columnar course catalog store"""
+        return cls.INDEX_DIR / "course_store"
+    
+    @classmethod
+    def get_job_store_path(cls) -> Path:
+        """Get path to the batch job database"""
+        return cls.JOBS_DIR / "jobs.db"
+    
+    @classmethod
+    def get_session_store_path(cls) -> Path:
+        """Get path to the shared session database"""
+        return cls.SESSIONS_DIR / "sessions.db"
 
 # Environment-specific configurations
 class DevelopmentConfig(Config):
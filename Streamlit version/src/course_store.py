@@ -0,0 +1,367 @@
+import json
+import logging
+import os
+import shutil
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple, Iterator
+from pathlib import Path
+from collections.abc import Mapping, Sequence
+import numpy as np
+
+from config import Config
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class CoursePostings(NamedTuple):
+    """Pre-sorted course rows for one (skill, difficulty) key"""
+    by_rating: np.ndarray      # Rows by rating (desc), then price (asc)
+    rating_prices: np.ndarray  # Prices aligned with by_rating
+    by_price: np.ndarray       # Rows by price (asc)
+    prices: np.ndarray         # Sorted prices aligned with by_price
+
+class CourseFeatures(NamedTuple):
+    """Per-course scoring features aligned with course rows"""
+    base_scores: np.ndarray               # Rating, price and duration part of the score
+    prices: np.ndarray
+    hours: np.ndarray
+    style_bonuses: Dict[str, np.ndarray]  # Learning-style bonus per style
+
+class CourseRowsView(Sequence):
+    """Read-only list of course dicts materialized from the columns on access"""
+    
+    def __init__(self, store: "ColumnarCourseStore"):
+        self._store = store
+    
+    def __len__(self) -> int:
+        return self._store.count
+    
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self._store.get_course(i) for i in range(*row.indices(len(self)))]
+        row = int(row)
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("course row out of range")
+        return self._store.get_course(row)
+
+class StoredPostings(Mapping):
+    """(skill, difficulty) -> CoursePostings backed by memory-mapped arrays"""
+    
+    def __init__(self, keys: List[Tuple[str, Optional[str]]], arrays: Dict[str, np.ndarray]):
+        self._key_index = {key: i for i, key in enumerate(keys)}
+        self._indptr = arrays["postings_indptr"]
+        self._by_rating = arrays["postings_by_rating"]
+        self._rating_prices = arrays["postings_rating_prices"]
+        self._by_price = arrays["postings_by_price"]
+        self._prices = arrays["postings_prices"]
+    
+    def __getitem__(self, key: Tuple[str, Optional[str]]) -> CoursePostings:
+        i = self._key_index[key]
+        start, end = self._indptr[i], self._indptr[i + 1]
+        return CoursePostings(
+            by_rating=self._by_rating[start:end],
+            rating_prices=self._rating_prices[start:end],
+            by_price=self._by_price[start:end],
+            prices=self._prices[start:end]
+        )
+    
+    def __iter__(self) -> Iterator[Tuple[str, Optional[str]]]:
+        return iter(self._key_index)
+    
+    def __len__(self) -> int:
+        return len(self._key_index)
+
+class ColumnarCourseStore:
+    """Columnar, memory-mapped course catalog
+    
+    Numeric fields are NumPy columns, string fields live in one UTF-8 blob
+    addressed by per-field offsets, and course skills are a CSR matrix over a
+    skill vocabulary. Postings and scoring features are stored alongside, so
+    opening the store reads no course data until a row is accessed, and all
+    worker processes share the same pages through the OS page cache.
+    """
+    
+    FORMAT_VERSION = 2  # 2: skill keys are lower-cased only (not stripped)
+    MANIFEST_FILE = "manifest.json"
+    
+    NUMERIC_FIELDS = ["rating", "price", "duration_hours"]
+    STRING_FIELDS = ["id", "title", "provider", "instructor", "difficulty",
+                     "url", "description", "type"]
+    
+    # Numeric value kinds: missing, int or float (keeps JSON output unchanged)
+    KIND_MISSING, KIND_INT, KIND_FLOAT = 0, 1, 2
+    
+    def __init__(self, store_dir: Path):
+        self.store_dir = Path(store_dir)
+        with open(self.store_dir / self.MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != self.FORMAT_VERSION:
+            raise ValueError(f"Unsupported course store format: {self.manifest.get('format')}")
+        
+        self.count = self.manifest["count"]
+        self.sources = self.manifest["sources"]
+        self.skill_vocab = self.manifest["skill_vocab"]
+        self.styles = self.manifest["styles"]
+        
+        self._arrays = {
+            path.stem: np.load(path, mmap_mode='r')
+            for path in self.store_dir.glob("*.npy")
+        }
+        
+        self.rows = CourseRowsView(self)
+        self.postings = StoredPostings(
+            [(skill, difficulty) for skill, difficulty in self.manifest["posting_keys"]], self._arrays
+        )
+        self.features = CourseFeatures(
+            base_scores=self._arrays["feature_base_scores"],
+            prices=self._arrays["feature_prices"],
+            hours=self._arrays["feature_hours"],
+            style_bonuses={
+                style: self._arrays[f"feature_style_{i}"] for i, style in enumerate(self.styles)
+            }
+        )
+    
+    @property
+    def fingerprint(self) -> List:
+        """Fingerprint of the source files the store was built from"""
+        return self.manifest["fingerprint"]
+    
+    def _get_string(self, field: str, row: int) -> Optional[str]:
+        if self._arrays[f"null_{field}"][row]:
+            return None
+        offsets = self._arrays[f"offsets_{field}"]
+        return bytes(self._arrays["strings"][offsets[row]:offsets[row + 1]]).decode('utf-8')
+    
+    def get_course(self, row: int) -> Dict[str, Any]:
+        """Materialize one course dict from the columns"""
+        course = {}
+        for field in self.STRING_FIELDS:
+            value = self._get_string(field, row)
+            if value is not None:
+                course[field] = value
+        
+        for field in self.NUMERIC_FIELDS:
+            kind = self._arrays[f"kind_{field}"][row]
+            if kind == self.KIND_INT:
+                course[field] = int(self._arrays[f"num_{field}"][row])
+            elif kind == self.KIND_FLOAT:
+                course[field] = float(self._arrays[f"num_{field}"][row])
+        
+        if not self._arrays["skills_absent"][row]:
+            start, end = self._arrays["skills_indptr"][row], self._arrays["skills_indptr"][row + 1]
+            course["skills"] = [self.skill_vocab[i] for i in self._arrays["skills_indices"][start:end]]
+        
+        extra = self._get_string("_extra", row)
+        if extra:
+            course.update(json.loads(extra))
+        
+        return course
+    
+    def source_of(self, row: int) -> str:
+        """Catalog file a course row was loaded from"""
+        return self.sources[int(self._arrays["source"][row])]
+    
+    @classmethod
+    def write(cls, store_dir: Path, courses: Dict[str, List[Dict[str, Any]]],
+              features: CourseFeatures,
+              postings: Dict[Tuple[str, Optional[str]], CoursePostings],
+              fingerprint: List) -> None:
+        """Write a store for `courses` (by source file) and swap it in atomically"""
+        store_dir = Path(store_dir)
+        tmp_dir = store_dir.with_name(f"{store_dir.name}.tmp-{os.getpid()}")
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+        
+        sources = list(courses.keys())
+        rows = [(source_num, course) for source_num, source in enumerate(sources)
+                for course in courses[source]]
+        count = len(rows)
+        arrays = {"source": np.array([source_num for source_num, _ in rows], dtype=np.uint8)}
+        
+        # Numeric columns
+        for field in cls.NUMERIC_FIELDS:
+            values = np.zeros(count, dtype=np.float64)
+            kinds = np.zeros(count, dtype=np.uint8)
+            for row, (_, course) in enumerate(rows):
+                value = course.get(field)
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                values[row] = value
+                kinds[row] = cls.KIND_INT if isinstance(value, int) else cls.KIND_FLOAT
+            arrays[f"num_{field}"] = values
+            arrays[f"kind_{field}"] = kinds
+        
+        # String columns in one blob; anything else goes to a JSON `_extra` column
+        known_fields = set(cls.NUMERIC_FIELDS) | set(cls.STRING_FIELDS) | {"skills"}
+        string_columns = {field: [] for field in cls.STRING_FIELDS + ["_extra"]}
+        for _, course in rows:
+            extra = {key: value for key, value in course.items() if key not in known_fields}
+            for field in cls.NUMERIC_FIELDS:
+                value = course.get(field)
+                if field in course and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                    extra[field] = value
+            for field in cls.STRING_FIELDS:
+                value = course.get(field)
+                if field in course and not isinstance(value, str):
+                    extra[field] = value
+                    value = None
+                string_columns[field].append(value)
+            string_columns["_extra"].append(json.dumps(extra) if extra else None)
+        
+        blob = bytearray()
+        for field, values in string_columns.items():
+            offsets = np.full(count + 1, len(blob), dtype=np.int64)
+            nulls = np.zeros(count, dtype=np.bool_)
+            for row, value in enumerate(values):
+                if value is None:
+                    nulls[row] = True
+                else:
+                    blob += value.encode('utf-8')
+                offsets[row + 1] = len(blob)
+            arrays[f"offsets_{field}"] = offsets
+            arrays[f"null_{field}"] = nulls
+        arrays["strings"] = np.frombuffer(bytes(blob), dtype=np.uint8)
+        
+        # Skills as CSR over the skill vocabulary
+        skill_vocab: Dict[str, int] = {}
+        indptr = np.zeros(count + 1, dtype=np.int64)
+        indices = []
+        absent = np.zeros(count, dtype=np.bool_)
+        for row, (_, course) in enumerate(rows):
+            if "skills" not in course:
+                absent[row] = True
+            for skill in course.get("skills") or []:
+                indices.append(skill_vocab.setdefault(skill, len(skill_vocab)))
+            indptr[row + 1] = len(indices)
+        arrays["skills_indptr"] = indptr
+        arrays["skills_indices"] = np.array(indices, dtype=np.int32)
+        arrays["skills_absent"] = absent
+        
+        # Scoring features
+        styles = list(features.style_bonuses.keys())
+        arrays["feature_base_scores"] = features.base_scores
+        arrays["feature_prices"] = features.prices
+        arrays["feature_hours"] = features.hours
+        for i, style in enumerate(styles):
+            arrays[f"feature_style_{i}"] = features.style_bonuses[style]
+        
+        # Postings, concatenated in key order
+        posting_keys = list(postings.keys())
+        posting_indptr = np.zeros(len(posting_keys) + 1, dtype=np.int64)
+        for i, key in enumerate(posting_keys):
+            posting_indptr[i + 1] = posting_indptr[i] + len(postings[key].by_rating)
+        arrays["postings_indptr"] = posting_indptr
+        for field, dtype in (("by_rating", np.int32), ("rating_prices", np.float64),
+                             ("by_price", np.int32), ("prices", np.float64)):
+            parts = [getattr(postings[key], field) for key in posting_keys]
+            arrays[f"postings_{field}"] = (
+                np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype=dtype)
+            )
+        
+        for name, array in arrays.items():
+            np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(array))
+        
+        manifest = {
+            "format": cls.FORMAT_VERSION,
+            "count": count,
+            "sources": sources,
+            "fingerprint": fingerprint,
+            "skill_vocab": list(skill_vocab.keys()),
+            "styles": styles,
+            "posting_keys": [list(key) for key in posting_keys]
+        }
+        with open(tmp_dir / cls.MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        
+        # Swap directories; processes that mapped the old files keep their pages
+        old_dir = store_dir.with_name(f"{store_dir.name}.old-{os.getpid()}")
+        if store_dir.exists():
+            store_dir.rename(old_dir)
+        tmp_dir.rename(store_dir)
+        if old_dir.exists():
+            shutil.rmtree(old_dir, ignore_errors=True)
+        
+        logger.info(f"Wrote course store with {count} courses to {store_dir}")
+
+def source_fingerprint(config: Optional[Config] = None,
+                       course_files: Optional[List[str]] = None) -> Optional[List]:
+    """Modification time and size of each course catalog file (None if any is missing)"""
+    config = config or Config()
+    fingerprint = []
+    for name in course_files or []:
+        path = config.COURSES_DIR / name
+        if not path.exists():
+            return None
+        stat = path.stat()
+        fingerprint.append([name, stat.st_mtime_ns, stat.st_size])
+    return fingerprint
+
+def open_course_store(store_dir: Path, fingerprint: Optional[List]) -> Optional[ColumnarCourseStore]:
+    """Open a store if it exists and was built from the current source files"""
+    if fingerprint is None or not (Path(store_dir) / ColumnarCourseStore.MANIFEST_FILE).exists():
+        return None
+    
+    try:
+        store = ColumnarCourseStore(store_dir)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable course store {store_dir}: {e}")
+        return None
+    
+    if store.fingerprint != fingerprint:
+        return None
+    return store
+
+if __name__ == "__main__":
+    # Test the columnar course store
+    Config.create_directories()
+    
+    import random
+    import tempfile
+    import time
+    
+    from recommendation_engine import CourseDatabase
+    
+    providers = ["udemy", "coursera", "youtube"]
+    difficulties = ["Beginner", "Intermediate", "Advanced"]
+    skill_pool = ["Python", "JavaScript", "React", "SQL", "AWS", "Docker", "Machine Learning",
+                  "Kubernetes", "Git", "Java", "Go", "Data Science"]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        Config.COURSES_DIR = Path(tmp_dir) / "courses"
+        Config.INDEX_DIR = Path(tmp_dir) / "index"
+        Config.COURSES_DIR.mkdir()
+        
+        # Synthetic provider catalogs
+        for course_file in CourseDatabase.COURSE_FILES:
+            courses = [{
+                "id": f"{course_file}_{i}",
+                "title": f"Course {i}",
+                "provider": random.choice(providers),
+                "difficulty": random.choice(difficulties),
+                "duration_hours": random.randint(1, 60),
+                "rating": round(random.uniform(3.0, 5.0), 1),
+                "price": random.choice([0, 19.99, 49.0, 89.99]),
+                "url": f"https://example.com/{i}",
+                "skills": random.sample(skill_pool, random.randint(1, 3)),
+                "description": "Synthetic course",
+                "type": "course"
+            } for i in range(40000)]
+            with open(Config.COURSES_DIR / course_file, 'w', encoding='utf-8') as f:
+                json.dump(courses, f)
+        
+        start = time.time()
+        json_db = CourseDatabase()
+        print(f"JSON load + store build: {time.time() - start:.2f}s")
+        
+        start = time.time()
+        store_db = CourseDatabase()
+        print(f"Memory-mapped open: {(time.time() - start) * 1000:.1f}ms")
+        
+        print("=== COURSE STORE TEST ===")
+        print(f"Courses: {len(store_db.course_rows)}")
+        print(f"Top Python courses: {[c['id'] for c in store_db.find_courses_for_skill('Python', 'Beginner')]}")
+        assert all(store_db.course_rows[row] == json_db.course_rows[row]
+                   for row in range(0, len(json_db.course_rows), 997))
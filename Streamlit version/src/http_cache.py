@@ -0,0 +1,99 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from fastapi.responses import JSONResponse, Response
+
+from config import Config
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def content_hash(*parts: Any) -> str:
+    """SHA-256 over the canonical JSON of `parts` (key order does not matter)"""
+    canonical = json.dumps(parts, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    """ETag for a response determined by `parts`
+    
+    Use a weak ETag when equal `parts` give semantically equal but not
+    byte-identical bodies (e.g. timings in `meta`).
+    """
+    etag = f'"{content_hash(Config.API_VERSION, *parts)[:32]}"'
+    return f"W/{etag}" if weak else etag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an `If-None-Match` header matches `etag` (weak comparison, as for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    opaque = etag.removeprefix("W/")
+    return any(candidate.removeprefix("W/") == opaque for candidate in candidates)
+
+class ETagRegistry:
+    """Bounded LRU set of ETags whose responses were actually served
+    
+    Lets an endpoint answer 304 before doing the work only for ETags it
+    produced a cacheable response for, not for ones computed from inputs alone.
+    """
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._etags: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def add(self, etag: str) -> None:
+        with self._lock:
+            self._etags[etag] = None
+            self._etags.move_to_end(etag)
+            while len(self._etags) > self.max_entries:
+                self._etags.popitem(last=False)
+    
+    def discard(self, etag: str) -> None:
+        with self._lock:
+            self._etags.pop(etag, None)
+    
+    def __contains__(self, etag: str) -> bool:
+        with self._lock:
+            if etag not in self._etags:
+                return False
+            self._etags.move_to_end(etag)
+            return True
+
+def cache_headers(etag: Optional[str], cache_control: str) -> Dict[str, str]:
+    headers = {"Cache-Control": cache_control}
+    if etag:
+        headers["ETag"] = etag
+    return headers
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """304 response; the client or proxy reuses the body it already has"""
+    return Response(status_code=304, headers=cache_headers(etag, cache_control))
+
+def cached_json(payload: Dict[str, Any], etag: Optional[str], cache_control: str) -> JSONResponse:
+    """JSON response carrying validator and caching headers"""
+    return JSONResponse(payload, headers=cache_headers(etag, cache_control))
+
+if __name__ == "__main__":
+    # Test ETag generation and matching
+    Config.create_directories()
+    
+    etag = make_etag("catalog-v1", {"phase": 2, "jobContext": {"roleId": "software_engineer", "title": None}})
+    same = make_etag("catalog-v1", {"jobContext": {"title": None, "roleId": "software_engineer"}, "phase": 2})
+    changed = make_etag("catalog-v2", {"phase": 2, "jobContext": {"roleId": "software_engineer", "title": None}})
+    
+    print("=== HTTP CACHE TEST ===")
+    print(f"ETag: {etag}")
+    print(f"Stable across key order: {etag == same}")
+    print(f"Changes with catalog version: {etag != changed}")
+    header = f'"other", W/{etag}'
+    print(f"Matches list: {etag_matches(header, etag)}, wildcard: {etag_matches('*', etag)}")
+    weak = make_etag("catalog-v1", weak=True)
+    print(f"Weak ETag: {weak}, matches strong form: {etag_matches(weak.removeprefix('W/'), weak)}")
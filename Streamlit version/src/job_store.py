@@ -0,0 +1,413 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+
+from config import Config
+from worker_pool import AnalysisWorkerPool
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class BatchJobStore:
+    """Persistent store of batch analysis jobs and their per-file results
+    
+    Jobs and items live in SQLite, uploaded files under `JOBS_DIR/<job id>/`.
+    Finished items keep their result, so a job interrupted by a restart is
+    queued again and only its pending items are analyzed. Several processes
+    may share the store: a job is claimed by a guarded update with a lease
+    that its runner renews while it works, and a running job is queued again
+    only once its lease expired (or its owner restarts).
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            phase INTEGER NOT NULL,
+            job_context TEXT,
+            total INTEGER NOT NULL,
+            succeeded INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL,
+            owner_pid INTEGER,
+            lease_expires_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS job_items (
+            job_id TEXT NOT NULL,
+            item_num INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            stored_path TEXT,
+            status TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            PRIMARY KEY (job_id, item_num)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+    """
+    
+    def __init__(self, config: Optional[Config] = None, db_path: Optional[Path] = None):
+        self.config = config or Config()
+        self.db_path = Path(db_path or self.config.get_job_store_path())
+        self.jobs_dir = self.config.JOBS_DIR
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+        for column, column_type in (("owner_pid", "INTEGER"), ("lease_expires_at", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        self._conn.commit()
+    
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+    
+    @staticmethod
+    def new_job_id() -> str:
+        return uuid.uuid4().hex
+    
+    def job_dir(self, job_id: str) -> Path:
+        """Folder holding a job's uploaded files"""
+        return self.jobs_dir / job_id
+    
+    def create_job(self, job_id: str, phase: int, job_context: Optional[Dict[str, Any]],
+                   items: List[Tuple[str, Optional[Path], Optional[str]]]) -> None:
+        """Queue a job of (filename, stored path, error) items
+        
+        Items that already carry an error (e.g. an unsupported format) are
+        recorded as failed right away and never analyzed.
+        """
+        failed = sum(1 for _, _, error in items if error)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, phase, job_context, total, failed, created_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, phase, json.dumps(job_context) if job_context else None,
+                 len(items), failed, time.time())
+            )
+            self._conn.executemany(
+                "INSERT INTO job_items (job_id, item_num, filename, stored_path, status, error) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(job_id, item_num, filename, str(stored_path) if stored_path else None,
+                  "error" if error else "pending", error)
+                 for item_num, (filename, stored_path, error) in enumerate(items)]
+            )
+    
+    def requeue_interrupted(self, own_jobs: bool = True) -> int:
+        """Queue running jobs whose lease expired
+        
+        With `own_jobs` (when this process starts its runner) the jobs this
+        process claimed before count as interrupted too.
+        """
+        condition = "lease_expires_at IS NULL OR lease_expires_at < ?"
+        params: List[Any] = [time.time()]
+        if own_jobs:
+            condition += " OR owner_pid = ?"
+            params.append(os.getpid())
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE jobs SET status = 'queued', owner_pid = NULL, lease_expires_at = NULL "
+                f"WHERE status = 'running' AND ({condition})", params
+            ).rowcount
+    
+    def renew_lease(self, job_id: str) -> bool:
+        """Extend this process's lease on a running job; False if it was lost"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE job_id = ? AND status = 'running' AND owner_pid = ?",
+                (time.time() + self.config.JOB_LEASE_SECONDS, job_id, os.getpid())
+            ).rowcount > 0
+    
+    def next_queued_job(self) -> Optional[Dict[str, Any]]:
+        """Claim the oldest queued job for this process and mark it as running"""
+        with self._lock:
+            while True:
+                with self._conn:
+                    row = self._conn.execute(
+                        "SELECT job_id, phase, job_context FROM jobs WHERE status = 'queued' "
+                        "ORDER BY created_at LIMIT 1"
+                    ).fetchone()
+                    if row is None:
+                        return None
+                    now = time.time()
+                    claimed = self._conn.execute(
+                        "UPDATE jobs SET status = 'running', owner_pid = ?, lease_expires_at = ?, "
+                        "started_at = COALESCE(started_at, ?) WHERE job_id = ? AND status = 'queued'",
+                        (os.getpid(), now + self.config.JOB_LEASE_SECONDS, now, row[0])
+                    ).rowcount
+                if claimed:
+                    return {"jobId": row[0], "phase": row[1],
+                            "jobContext": json.loads(row[2]) if row[2] else None}
+                # Another process claimed it between the select and the update
+    
+    def pending_items(self, job_id: str) -> List[Tuple[int, str, Path]]:
+        """(item number, filename, stored path) of items still to analyze"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_num, filename, stored_path FROM job_items "
+                "WHERE job_id = ? AND status = 'pending' ORDER BY item_num", (job_id,)
+            ).fetchall()
+        return [(item_num, filename, Path(stored_path)) for item_num, filename, stored_path in rows]
+    
+    def record_item(self, job_id: str, item_num: int, result: Optional[Dict[str, Any]] = None,
+                    error: Optional[str] = None) -> None:
+        """Store one item's result (or error) and update the job counters"""
+        status = "error" if error else "success"
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE job_items SET status = ?, result = ?, error = ? WHERE job_id = ? AND item_num = ?",
+                (status, json.dumps(result) if result is not None else None, error, job_id, item_num)
+            )
+            counter = "failed" if error else "succeeded"
+            self._conn.execute(f"UPDATE jobs SET {counter} = {counter} + 1 WHERE job_id = ?", (job_id,))
+    
+    def finish_job(self, job_id: str, status: str = "completed") -> None:
+        """Mark a job as finished and drop its uploaded files"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE job_id = ?", (status, time.time(), job_id)
+            )
+        shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+    
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status and progress"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, phase, job_context, total, succeeded, failed, created_at, started_at, finished_at "
+                "FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        
+        status, phase, job_context, total, succeeded, failed, created_at, started_at, finished_at = row
+        done = succeeded + failed
+        return {
+            "jobId": job_id,
+            "status": status,
+            "phase": phase,
+            "jobContext": json.loads(job_context) if job_context else None,
+            "totalFiles": total,
+            "successful": succeeded,
+            "failed": failed,
+            "pending": total - done,
+            "progress": round(100 * done / total, 1) if total else 100.0,
+            "createdAt": int(created_at),
+            "startedAt": int(started_at) if started_at else None,
+            "finishedAt": int(finished_at) if finished_at else None
+        }
+    
+    def get_results(self, job_id: str, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Per-file results of a job, in upload order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_num, filename, status, result, error FROM job_items "
+                "WHERE job_id = ? ORDER BY item_num LIMIT ? OFFSET ?", (job_id, limit, offset)
+            ).fetchall()
+        
+        results = []
+        for item_num, filename, status, result, error in rows:
+            item = {"index": item_num, "filename": filename, "status": status}
+            if error:
+                item["error"] = error
+            if result:
+                item.update(json.loads(result))
+            results.append(item)
+        return results
+    
+    def purge_expired(self, max_age_hours: Optional[float] = None) -> int:
+        """Delete finished jobs older than the retention period"""
+        max_age_hours = max_age_hours or self.config.JOB_RETENTION_HOURS
+        cutoff = time.time() - max_age_hours * 3600
+        with self._lock, self._conn:
+            job_ids = [row[0] for row in self._conn.execute(
+                "SELECT job_id FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,)
+            )]
+            for job_id in job_ids:
+                self._conn.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+                self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        for job_id in job_ids:
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+        return len(job_ids)
+
+def summarize_item(result: Dict[str, Any], phase: int) -> Dict[str, Any]:
+    """Per-file entry in the batch-analyze result format"""
+    return {
+        "skillsCount": len(result.get('skills', [])),
+        "matchScore": result.get('matchScore', {}).get('overall_score', 0) if phase >= 2 else None,
+        "analysis": result
+    }
+
+class BatchJobRunner:
+    """Background task that works through queued jobs on the analysis workers
+    
+    Jobs run one at a time, oldest first, with at most one item per worker in
+    flight at batch priority, so interactive requests are served between
+    items and most of the workers' queue room stays free for them. When the
+    workers are saturated the runner waits for the suggested Retry-After, and
+    an item that times out is recorded as failed. Store calls run on threads, and a failing poll (e.g. a
+    locked database) is retried with backoff instead of stopping the runner.
+    """
+    
+    MAX_BACKOFF = 60  # seconds
+    
+    def __init__(self, store: BatchJobStore, pool: AnalysisWorkerPool,
+                 config: Optional[Config] = None):
+        self.config = config or Config()
+        self.store = store
+        self.pool = pool
+        self.concurrency = max(1, pool.workers)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Resume interrupted jobs and start the runner on the current event loop"""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run_loop())
+    
+    async def stop(self) -> None:
+        """Stop the runner; a job in progress is resumed on the next start"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def notify(self) -> None:
+        """Wake the runner after a job was submitted"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    async def _resume_interrupted(self) -> None:
+        requeued = await asyncio.to_thread(self.store.requeue_interrupted)
+        if requeued:
+            logger.info(f"Resuming {requeued} interrupted batch jobs")
+        await asyncio.to_thread(self.store.purge_expired)
+    
+    async def _run_loop(self) -> None:
+        resumed = False
+        failures = 0
+        while True:
+            try:
+                if not resumed:
+                    await self._resume_interrupted()
+                    resumed = True
+                job = await asyncio.to_thread(self.store.next_queued_job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                delay = min(self.config.JOB_POLL_INTERVAL * 2 ** (failures - 1), self.MAX_BACKOFF)
+                logger.error(f"Polling batch jobs failed, retrying in {delay}s: {e}")
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+            
+            if job is None:
+                try:
+                    # Jobs of runners that stopped renewing their lease
+                    if await asyncio.to_thread(self.store.requeue_interrupted, False):
+                        continue
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Requeueing expired batch jobs failed: {e}")
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.config.JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            try:
+                await self._run_job(job)
+                await asyncio.to_thread(self.store.finish_job, job["jobId"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Batch job {job['jobId']} failed: {e}")
+                try:
+                    await asyncio.to_thread(self.store.finish_job, job["jobId"], "failed")
+                except Exception as e:
+                    # Queued again once its lease expires
+                    logger.error(f"Could not mark batch job {job['jobId']} as failed: {e}")
+    
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        items = await asyncio.to_thread(self.store.pending_items, job["jobId"])
+        logger.info(f"Running batch job {job['jobId']} ({len(items)} pending files)")
+        semaphore = asyncio.Semaphore(self.concurrency)
+        heartbeat = asyncio.create_task(self._renew_lease(job["jobId"]))
+        
+        async def run_item(item_num: int, filename: str, stored_path: Path) -> None:
+            async with semaphore:
+                try:
+                    result = await self.pool.run_queued(
+                        "parse_resume_file", stored_path, phase=job["phase"], job_context=job["jobContext"],
+                        priority="batch"
+                    )
+                    await asyncio.to_thread(self.store.record_item, job["jobId"], item_num,
+                                            summarize_item(result, job["phase"]))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    await asyncio.to_thread(self.store.record_item, job["jobId"], item_num, error=str(e))
+                stored_path.unlink(missing_ok=True)
+        
+        try:
+            await asyncio.gather(*(run_item(*item) for item in items))
+        finally:
+            heartbeat.cancel()
+    
+    async def _renew_lease(self, job_id: str) -> None:
+        """Keep the lease of a running job until cancelled"""
+        while True:
+            await asyncio.sleep(self.config.JOB_LEASE_SECONDS / 3)
+            try:
+                if not await asyncio.to_thread(self.store.renew_lease, job_id):
+                    logger.warning(f"Lost the lease on batch job {job_id}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Could not renew the lease on batch job {job_id}: {e}")
+
+if __name__ == "__main__":
+    # Test the job store
+    import tempfile
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        class TempJobConfig(Config):
+            JOBS_DIR = Path(tmp_dir) / "jobs"
+        
+        store = BatchJobStore(TempJobConfig(), db_path=Path(tmp_dir) / "jobs.db")
+        job_id = store.new_job_id()
+        store.create_job(job_id, 1, None, [
+            ("alice.pdf", store.job_dir(job_id) / "00000.pdf", None),
+            ("notes.png", None, "Unsupported file format: .png")
+        ])
+        print("=== JOB STORE TEST ===")
+        print(store.next_queued_job())
+        for item_num, filename, stored_path in store.pending_items(job_id):
+            store.record_item(job_id, item_num, {"skillsCount": 3, "matchScore": None, "analysis": {}})
+        store.finish_job(job_id)
+        print(store.get_job(job_id))
+        print(store.get_results(job_id))
+        store.close()
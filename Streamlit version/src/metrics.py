@@ -0,0 +1,268 @@
+import bisect
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from pathlib import Path
+from contextlib import contextmanager
+
+from config import Config
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Metrics recorded by the analysis code: name -> (type, help)
+METRICS = {
+    "http_requests_total": ("counter", "HTTP requests by endpoint, method and status"),
+    "http_request_duration_seconds": ("histogram", "HTTP request latency by endpoint"),
+    "analyses_total": ("counter", "Resume analyses by kind, phase and outcome"),
+    "analysis_duration_seconds": ("histogram", "End-to-end analysis latency by kind and phase"),
+    "stage_duration_seconds": ("histogram", "Latency of computed (not cached) analysis stages"),
+    "pipeline_cache_total": ("counter", "Pipeline stage cache lookups by stage and result"),
+    "worker_queue_wait_seconds": ("histogram", "Time calls waited for an analysis worker by priority class"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+# Collector samples: (name, type, help, labels, value)
+Sample = Tuple[str, str, str, Dict[str, Any], float]
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = [
+        (key, value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n"))
+        for key, value in labels
+    ]
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class MetricsRegistry:
+    """Process-local counters and latency histograms in the Prometheus text format
+    
+    Analyses that run in worker processes record into the worker's registry;
+    `drain()` hands those samples back with each result and the parent
+    `merge()`s them, so the API and CLI registries report the totals.
+    Collectors add gauges (queue depth, utilization) read at render time.
+    """
+    
+    def __init__(self, config: Optional[Config] = None, buckets: Optional[Tuple[float, ...]] = None):
+        self.config = config or Config()
+        self.prefix = self.config.METRICS_PREFIX
+        self.buckets = tuple(buckets or self.config.METRICS_LATENCY_BUCKETS)
+        
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        # Per-bucket (non-cumulative) counts, the +Inf count, then the sum
+        self._histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        self._collectors: List[Callable[[], List[Sample]]] = []
+    
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        """Increase a counter"""
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+    
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Record one latency in a histogram"""
+        key = (name, _labels(labels))
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            histogram[index] += 1
+            histogram[-1] += seconds
+    
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observe the duration of a block"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start_time, **labels)
+    
+    def value(self, name: str, **labels) -> float:
+        """Current value of a counter"""
+        with self._lock:
+            return self._counters.get((name, _labels(labels)), 0.0)
+    
+    def add_collector(self, collector: Callable[[], List[Sample]]) -> None:
+        """Register a callable returning gauge/counter samples at render time"""
+        self._collectors.append(collector)
+    
+    def drain(self) -> Dict[str, Any]:
+        """Take all samples recorded so far, leaving the registry empty"""
+        with self._lock:
+            samples = {"counters": self._counters, "histograms": self._histograms}
+            self._counters, self._histograms = {}, {}
+        return samples
+    
+    def merge(self, samples: Optional[Dict[str, Any]]) -> None:
+        """Add samples drained from another process's registry"""
+        if not samples:
+            return
+        with self._lock:
+            for key, value in samples["counters"].items():
+                self._counters[key] = self._counters.get(key, 0.0) + value
+            for key, other in samples["histograms"].items():
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    self._histograms[key] = list(other)
+                elif len(histogram) == len(other):
+                    self._histograms[key] = [mine + theirs for mine, theirs in zip(histogram, other)]
+                else:
+                    logger.warning(f"Dropping samples of {key[0]} recorded with other buckets")
+    
+    def _cache_hit_ratios(self) -> List[Sample]:
+        lookups: Dict[str, Dict[str, float]] = {}
+        for (name, labels), value in self._counters.items():
+            if name == "pipeline_cache_total":
+                label_map = dict(labels)
+                lookups.setdefault(label_map["stage"], {})[label_map["result"]] = value
+        return [
+            ("pipeline_cache_hit_ratio", "gauge", "Share of pipeline stage lookups served from cache",
+             {"stage": stage}, counts.get("hit", 0.0) / sum(counts.values()))
+            for stage, counts in sorted(lookups.items())
+        ]
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+            derived = self._cache_hit_ratios()
+        
+        for name, (metric_type, help_text) in METRICS.items():
+            full_name = f"{self.prefix}_{name}"
+            if metric_type == "counter":
+                samples = [(labels, value) for (metric, labels), value in counters if metric == name]
+                if not samples:
+                    continue
+                lines += [f"# HELP {full_name} {help_text}", f"# TYPE {full_name} counter"]
+                lines += [f"{full_name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples]
+            else:
+                samples = [(labels, histogram) for (metric, labels), histogram in histograms if metric == name]
+                if not samples:
+                    continue
+                lines += [f"# HELP {full_name} {help_text}", f"# TYPE {full_name} histogram"]
+                for labels, histogram in samples:
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float("inf"),), histogram[:-1]):
+                        cumulative += count
+                        bucket_labels = labels + (("le", _format_value(bound)),)
+                        lines.append(f"{full_name}_bucket{_format_labels(bucket_labels)} {_format_value(cumulative)}")
+                    lines.append(f"{full_name}_sum{_format_labels(labels)} {_format_value(histogram[-1])}")
+                    lines.append(f"{full_name}_count{_format_labels(labels)} {_format_value(cumulative)}")
+        
+        collected = list(derived)
+        for collector in self._collectors:
+            try:
+                collected.extend(collector())
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {e}")
+        
+        described = set()
+        for name, metric_type, help_text, labels, value in collected:
+            full_name = f"{self.prefix}_{name}"
+            if full_name not in described:
+                described.add(full_name)
+                lines += [f"# HELP {full_name} {help_text}", f"# TYPE {full_name} {metric_type}"]
+            lines.append(f"{full_name}{_format_labels(_labels(labels))} {_format_value(value)}")
+        
+        return "\n".join(lines) + "\n"
+    
+    def write_textfile(self, path: Path) -> None:
+        """Write the rendered metrics atomically (node_exporter textfile format)"""
+        path = Path(path)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(self.render(), encoding='utf-8')
+        os.replace(tmp_path, path)
+
+_analysis_context = threading.local()
+
+def observe_analysis(kind: str):
+    """Count and time ResumeParser analyses
+    
+    Only the outermost instrumented call on a thread is recorded, so a file
+    analysis is not counted again as the text analysis it delegates to.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        default_phase = signature.parameters["phase"].default
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_analysis_context, "active", False):
+                return func(*args, **kwargs)
+            
+            phase = signature.bind(*args, **kwargs).arguments.get("phase", default_phase)
+            metrics = get_metrics()
+            _analysis_context.active = True
+            start_time = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                metrics.inc("analyses_total", kind=kind, phase=phase, outcome="exception")
+                raise
+            finally:
+                _analysis_context.active = False
+            
+            outcome = "error" if "error" in (result.get("meta") or {}) else "success"
+            metrics.inc("analyses_total", kind=kind, phase=phase, outcome=outcome)
+            metrics.observe("analysis_duration_seconds", time.perf_counter() - start_time, kind=kind, phase=phase)
+            return result
+        return wrapper
+    return decorator
+
+# Shared registry of this process
+_shared_metrics: Optional[MetricsRegistry] = None
+_shared_metrics_lock = threading.Lock()
+
+def get_metrics() -> MetricsRegistry:
+    """Get the process-wide metrics registry"""
+    global _shared_metrics
+    registry = _shared_metrics
+    if registry is None:
+        with _shared_metrics_lock:
+            if _shared_metrics is None:
+                _shared_metrics = MetricsRegistry()
+            registry = _shared_metrics
+    return registry
+
+if __name__ == "__main__":
+    # Test the registry and a worker -> parent merge
+    Config.create_directories()
+    
+    worker = MetricsRegistry()
+    for seconds in (0.003, 0.04, 0.04, 0.7, 12.0):
+        worker.observe("stage_duration_seconds", seconds, stage="spacy")
+    worker.inc("pipeline_cache_total", stage="phase1", result="miss")
+    
+    parent = get_metrics()
+    parent.inc("pipeline_cache_total", 3, stage="phase1", result="hit")
+    parent.inc("http_requests_total", endpoint="/api/v1/analyze-resume", method="POST", status=200)
+    parent.merge(worker.drain())
+    parent.add_collector(lambda: [("worker_queue_depth", "gauge", "Calls waiting for a worker", {}, 2)])
+    
+    print("=== METRICS TEST ===")
+    print(parent.render())
+    
+    start = time.perf_counter()
+    for _ in range(100000):
+        parent.observe("stage_duration_seconds", 0.02, stage="gaps")
+    print(f"observe(): {(time.perf_counter() - start) * 10:.2f}us per call")
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import Dict, Any, Optional, Callable, Tuple
+from collections import OrderedDict
+
+from config import Config
+from skill_extractor import analyze_resume_phase1
+from gap_analyzer import analyze_phase2
+from recommendation_engine import generate_recommendations_phase3
+from catalog import CatalogWatcher, CatalogSnapshot, get_catalog_watcher
+from candidate_index import CandidateSkillIndex, get_candidate_index
+from session_store import SharedSessionStore, get_session_store
+from metrics import get_metrics
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class AnalysisPipeline:
+    """Memoized analysis stages: phase1 -> gaps -> recommendations
+    
+    Each stage output is cached under a key built from its inputs: the resume
+    content hash (the session id) for phase 1, plus role and catalog version
+    for gaps, plus user preferences for recommendations. A later call runs
+    only the stages whose inputs changed, so new preferences rerun just the
+    recommendations.
+    
+    Each newly extracted phase-1 result is added to the candidate index
+    (the shared one unless `CANDIDATE_INDEX_ENABLED` is off), so analyzed
+    resumes can be ranked for roles later. It is also saved in the session
+    store (unless `SESSION_STORE_ENABLED` is off), so a `session_id`
+    follow-up works in any process, not only the one that extracted it.
+    """
+    
+    STAGES = ("phase1", "gaps", "recommendations")
+    
+    def __init__(self, config: Optional[Config] = None,
+                 catalog: Optional[CatalogWatcher] = None,
+                 max_entries: Optional[int] = None,
+                 candidate_index: Optional[CandidateSkillIndex] = None,
+                 session_store: Optional[SharedSessionStore] = None):
+        self.config = config or Config()
+        self.catalog = catalog or get_catalog_watcher(config)
+        self.max_entries = max_entries or self.config.PIPELINE_CACHE_SIZE
+        if candidate_index is None and self.config.CANDIDATE_INDEX_ENABLED:
+            candidate_index = get_candidate_index(config)
+        self.candidate_index = candidate_index
+        if session_store is None and self.config.SESSION_STORE_ENABLED:
+            session_store = get_session_store(config)
+        self.session_store = session_store
+        
+        self._cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {stage: {"hits": 0, "misses": 0} for stage in self.STAGES}
+        self.metrics = get_metrics()
+    
+    @staticmethod
+    def session_id_for(resume_text: str) -> str:
+        """Analysis session id for a resume (hash of its content)"""
+        return hashlib.sha256(resume_text.encode('utf-8')).hexdigest()[:32]
+    
+    @staticmethod
+    def _prefs_key(user_prefs: Optional[Dict[str, Any]]) -> str:
+        return json.dumps(user_prefs or {}, sort_keys=True, default=str)
+    
+    @staticmethod
+    def _is_cacheable(value: Dict[str, Any]) -> bool:
+        """Failed stages are not cached so the next call retries them"""
+        return "error" not in value and "error" not in (value.get("matchScore") or {})
+    
+    def _get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+            return value
+    
+    def _put(self, key: Tuple, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+    
+    def _run_stage(self, stage: str, key: Tuple, compute: Callable[[], Dict[str, Any]],
+                   stage_status: Dict[str, str]) -> Dict[str, Any]:
+        """Return a cached stage output or compute and cache it"""
+        value = self._get(key)
+        if value is not None:
+            stage_status[stage] = "hit"
+            self.stats[stage]["hits"] += 1
+            self.metrics.inc("pipeline_cache_total", stage=stage, result="hit")
+            return value
+        
+        with self.metrics.timer("stage_duration_seconds", stage=stage):
+            value = compute()
+        if self._is_cacheable(value):
+            self._put(key, value)
+        stage_status[stage] = "miss"
+        self.stats[stage]["misses"] += 1
+        self.metrics.inc("pipeline_cache_total", stage=stage, result="miss")
+        return value
+    
+    def run_phase1(self, resume_text: Optional[str], session_id: Optional[str],
+                   stage_status: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Return (session id, phase-1 output) for a resume text or earlier session"""
+        if resume_text:
+            session_id = self.session_id_for(resume_text)
+        elif not session_id:
+            raise ValueError("resume_text or session_id required")
+        
+        phase1_key = ("phase1", session_id)
+        if resume_text:
+            phase1 = self._run_stage(
+                "phase1", phase1_key, lambda: analyze_resume_phase1(resume_text), stage_status
+            )
+            if stage_status["phase1"] == "miss":
+                self._index_candidate(session_id, phase1)
+                self._save_session(session_id, phase1)
+        else:
+            phase1 = self._get(phase1_key)
+            if phase1 is None:
+                phase1 = self._load_session(session_id)
+            if phase1 is None:
+                raise ValueError(f"Unknown or expired analysis session: {session_id}")
+            stage_status["phase1"] = "hit"
+            self.stats["phase1"]["hits"] += 1
+            self.metrics.inc("pipeline_cache_total", stage="phase1", result="hit")
+        
+        return session_id, phase1
+    
+    def _index_candidate(self, session_id: str, phase1: Dict[str, Any]) -> None:
+        """Add a new phase-1 result to the candidate index; failures do not fail the analysis"""
+        if self.candidate_index is None or "error" in phase1 or not phase1.get("skills"):
+            return
+        try:
+            self.candidate_index.add_resume(session_id, phase1["skills"])
+        except Exception as e:
+            logger.error(f"Could not index candidate {session_id}: {e}")
+    
+    def _save_session(self, session_id: str, phase1: Dict[str, Any]) -> None:
+        """Share a new phase-1 result with other processes; failures do not fail the analysis"""
+        if self.session_store is None or not self._is_cacheable(phase1):
+            return
+        try:
+            self.session_store.save_phase1(session_id, phase1)
+        except Exception as e:
+            logger.error(f"Could not save analysis session {session_id}: {e}")
+    
+    def _load_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Phase-1 result of a session extracted by another process (cached here)"""
+        if self.session_store is None:
+            return None
+        try:
+            phase1 = self.session_store.load_phase1(session_id)
+        except Exception as e:
+            logger.error(f"Could not load analysis session {session_id}: {e}")
+            return None
+        if phase1 is not None:
+            self._put(("phase1", session_id), phase1)
+        return phase1
+    
+    def run_role(self, session_id: str, phase1: Dict[str, Any], role_id: str, phase: int,
+                 user_prefs: Optional[Dict[str, Any]], catalog: CatalogSnapshot,
+                 stage_status: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the gap (and for phase 3, recommendation) stages for one role"""
+        outputs = {}
+        gaps_key = ("gaps", session_id, role_id, catalog.version)
+        outputs["gaps"] = self._run_stage(
+            "gaps", gaps_key,
+            lambda: analyze_phase2(phase1["skills"], role_id, catalog.skill_matcher),
+            stage_status
+        )
+        
+        if phase < 3:
+            return outputs
+        
+        recommendations_key = gaps_key + (self._prefs_key(user_prefs),)
+        outputs["recommendations"] = self._run_stage(
+            "recommendations", recommendations_key,
+            lambda: generate_recommendations_phase3(
+                outputs["gaps"]["gaps"], user_prefs, catalog.recommendation_engine
+            ),
+            stage_status
+        )
+        return outputs
+    
+    def run(self, resume_text: Optional[str] = None, phase: int = 1,
+            role_id: Optional[str] = None, user_prefs: Optional[Dict[str, Any]] = None,
+            session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Run the stages needed for `phase`, reusing cached outputs
+        
+        Either `resume_text` or the `session_id` of an earlier call is required.
+        Stage outputs are shared with the cache and must not be mutated.
+        """
+        stage_status: Dict[str, str] = {}
+        session_id, phase1 = self.run_phase1(resume_text, session_id, stage_status)
+        outputs = {"sessionId": session_id, "stages": stage_status, "phase1": phase1}
+        
+        if phase < 2:
+            return outputs
+        
+        # One catalog snapshot for the whole request
+        catalog = self.catalog.snapshot
+        outputs["catalog"] = catalog
+        outputs.update(self.run_role(session_id, phase1, role_id, phase, user_prefs,
+                                     catalog, stage_status))
+        return outputs
+    
+    def clear(self) -> None:
+        """Drop all cached stage outputs"""
+        with self._lock:
+            self._cache.clear()
+
+if __name__ == "__main__":
+    # Test the memoized pipeline
+    Config.create_directories()
+    # Keep the sample resume out of the real candidate index and session store
+    Config.CANDIDATE_INDEX_ENABLED = False
+    Config.SESSION_STORE_ENABLED = False
+    
+    sample_resume = """
+    Senior Software Engineer with 6 years of Python, JavaScript and React.
+    Built microservices on AWS with Docker and Kubernetes. Led a team of 4.
+    """
+    
+    pipeline = AnalysisPipeline()
+    print("=== PIPELINE TEST ===")
+    first = pipeline.run(sample_resume, phase=3, role_id="software_engineer",
+                         user_prefs={"learningStyle": "video"})
+    print(f"First run: {first['stages']}")
+    
+    second = pipeline.run(session_id=first["sessionId"], phase=3, role_id="software_engineer",
+                          user_prefs={"learningStyle": "structured"})
+    print(f"New preferences: {second['stages']}")
+    
+    third = pipeline.run(session_id=first["sessionId"], phase=2, role_id="senior_software_engineer")
+    print(f"New role: {third['stages']}")
+    print(f"Stats: {pipeline.stats}")
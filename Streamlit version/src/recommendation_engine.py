@@ -4,8 +4,14 @@ from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 from collections import defaultdict
 import random
+import threading
+import time
+import numpy as np
 
 from config import Config
+from course_store import (
+    CoursePostings, CourseFeatures, ColumnarCourseStore, open_course_store, source_fingerprint
+)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -14,23 +20,65 @@ logger = logging.getLogger(__name__)
 class CourseDatabase:
     """Manage course database and recommendations"""
     
+    # Course catalog files, in load order
+    COURSE_FILES = [
+        "udemy_courses.json",
+        "coursera_courses.json", 
+        "youtube_tutorials.json"
+    ]
+    
+    # Learning styles that change course scores
+    LEARNING_STYLES = ("video", "structured", "hands-on")
+    
     def __init__(self, config: Optional[Config] = None):
         self.config = config or Config()
-        self.courses = self.load_courses()
+        self._courses = None
+        
+        fingerprint = source_fingerprint(self.config, self.COURSE_FILES)
+        self.store = open_course_store(self.config.get_course_store_dir(), fingerprint)
+        if self.store is not None:
+            # Memory-mapped columns; course dicts are materialized on access
+            self.course_rows = self.store.rows
+            self.course_features = self.store.features
+            self.skill_course_mapping = self.store.postings
+            logger.info(f"Opened course store with {len(self.course_rows)} courses")
+            return
+        
+        self._courses = self.load_courses()
+        # Flat course table; postings refer to courses by row number
+        self.course_rows = [course for course_list in self._courses.values() for course in course_list]
+        self.course_features = self._build_course_features()
         self.skill_course_mapping = self._build_skill_course_mapping()
+        
+        if fingerprint is not None and len(self.course_rows) >= self.config.COURSE_STORE_MIN_COURSES:
+            self._write_store(fingerprint)
+    
+    @property
+    def courses(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Courses grouped by catalog file"""
+        if self._courses is None:
+            courses = {source: [] for source in self.store.sources}
+            for row in range(len(self.course_rows)):
+                courses[self.store.source_of(row)].append(self.course_rows[row])
+            self._courses = courses
+        return self._courses
+    
+    def _write_store(self, fingerprint: List) -> None:
+        """Persist the loaded catalog as a columnar store for later processes"""
+        try:
+            ColumnarCourseStore.write(
+                self.config.get_course_store_dir(), self._courses, self.course_features,
+                self.skill_course_mapping, fingerprint
+            )
+        except Exception as e:
+            logger.warning(f"Could not write course store: {e}")
     
     def load_courses(self) -> Dict[str, List[Dict[str, Any]]]:
         """Load course data from various sources"""
         courses = {}
         
         # Load from different course files
-        course_files = [
-            "udemy_courses.json",
-            "coursera_courses.json", 
-            "youtube_tutorials.json"
-        ]
-        
-        for course_file in course_files:
+        for course_file in self.COURSE_FILES:
             file_path = self.config.COURSES_DIR / course_file
             if file_path.exists():
                 with open(file_path, 'r', encoding='utf-8') as f:
@@ -196,36 +244,171 @@ class CourseDatabase:
                 }
             ]
     
-    def _build_skill_course_mapping(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Build mapping from skills to courses"""
-        skill_mapping = defaultdict(list)
+    @staticmethod
+    def base_course_score(course: Dict[str, Any]) -> float:
+        """Preference-independent part of a course score (rating, price, duration)"""
+        score = 0.0
         
-        for source, course_list in self.courses.items():
-            for course in course_list:
-                for skill in course.get('skills', []):
-                    skill_mapping[skill.lower()].append(course)
+        # Base score from rating
+        score += course.get('rating', 0) * 20
         
-        return dict(skill_mapping)
+        # Price preference (lower is better, but free isn't always best)
+        price = course.get('price', 0)
+        if price == 0:
+            score += 5  # Free courses get some bonus
+        else:
+            # Normalize price score (assume max reasonable price is 200)
+            price_score = max(0, 10 - (price / 20))
+            score += price_score
+        
+        # Duration preference (moderate length preferred)
+        duration = course.get('duration_hours', 10)
+        if 10 <= duration <= 30:
+            score += 5
+        elif duration < 5:
+            score -= 2  # Too short might not be comprehensive
+        elif duration > 50:
+            score -= 3  # Too long might be overwhelming
+        
+        return score
+    
+    @staticmethod
+    def style_bonus(course: Dict[str, Any], learning_style: str) -> float:
+        """Score bonus for courses that suit a learning style"""
+        provider = (course.get('provider') or '').lower()
+        
+        if learning_style == "video" and provider in ['youtube', 'udemy']:
+            return 10
+        elif learning_style == "structured" and provider in ['coursera']:
+            return 10
+        elif learning_style == "hands-on" and 'project' in (course.get('title') or '').lower():
+            return 15
+        return 0
+    
+    def _build_course_features(self) -> CourseFeatures:
+        """Precompute scoring features once per catalog load"""
+        return CourseFeatures(
+            base_scores=np.array([self.base_course_score(course) for course in self.course_rows],
+                                 dtype=np.float64),
+            prices=np.array([course.get('price', 0) for course in self.course_rows], dtype=np.float64),
+            hours=np.array([course.get('duration_hours', 0) for course in self.course_rows],
+                           dtype=np.float64),
+            style_bonuses={
+                style: np.array([self.style_bonus(course, style) for course in self.course_rows],
+                                dtype=np.float64)
+                for style in self.LEARNING_STYLES
+            }
+        )
+    
+    @staticmethod
+    def _normalize_key(skill: str, difficulty: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """Posting key for a skill and optional difficulty (None = any difficulty)"""
+        return skill.lower(), (difficulty.lower() if difficulty else None)
+    
+    def _build_skill_course_mapping(self) -> Dict[Tuple[str, Optional[str]], CoursePostings]:
+        """Build pre-sorted postings keyed by (skill, difficulty)
+        
+        Every course is listed under (skill, its difficulty) and (skill, None),
+        sorted once here so lookups never sort per request.
+        """
+        # Sort by rating and relevance once; postings filled in this order stay sorted
+        rating_order = sorted(
+            range(len(self.course_rows)),
+            key=lambda row: (-self.course_rows[row].get('rating', 0),
+                             self.course_rows[row].get('price', float('inf')))
+        )
+        
+        skill_rows = defaultdict(list)
+        for row in rating_order:
+            course = self.course_rows[row]
+            difficulty = course.get('difficulty', '')
+            course_keys = set()
+            for skill in course.get('skills', []):
+                course_keys.add(self._normalize_key(skill))
+                course_keys.add(self._normalize_key(skill, difficulty or ''))
+            for key in course_keys:
+                skill_rows[key].append(row)
+        
+        prices = self.course_features.prices
+        
+        skill_mapping = {}
+        for key, rows in skill_rows.items():
+            by_rating = np.array(rows, dtype=np.int32)
+            by_price = by_rating[np.argsort(prices[by_rating], kind='stable')]
+            skill_mapping[key] = CoursePostings(
+                by_rating=by_rating,
+                rating_prices=prices[by_rating],
+                by_price=by_price,
+                prices=prices[by_price]
+            )
+        
+        return skill_mapping
+    
+    def get_course(self, row: int) -> Dict[str, Any]:
+        """Get a course by row number"""
+        return self.course_rows[row]
+    
+    def find_course_rows(self, skill: str, difficulty: str = None, max_results: int = 5,
+                         max_price: Optional[float] = None) -> np.ndarray:
+        """Find top-rated course rows for a skill, optionally under a price cap"""
+        postings = self.skill_course_mapping.get(self._normalize_key(skill, difficulty))
+        if postings is None:
+            return np.empty(0, dtype=np.int32)
+        
+        if max_price is not None:
+            # Budget cut-off on the price-sorted side array
+            affordable = np.searchsorted(postings.prices, max_price, side='right')
+            if affordable == 0:
+                return np.empty(0, dtype=np.int32)
+            if affordable < len(postings.prices):
+                return self._first_affordable_rows(postings, max_price, min(max_results, affordable))
+        
+        return postings.by_rating[:max_results]
+    
+    @staticmethod
+    def _first_affordable_rows(postings: CoursePostings, max_price: float, wanted: int) -> np.ndarray:
+        """First `wanted` rows in rating order costing at most `max_price`
+        
+        Scans the rating order in chunks and stops once enough rows are found,
+        so the cost depends on how deep the affordable rows are, not on the
+        length of the posting list. `wanted` must not exceed the number of
+        affordable rows.
+        """
+        chunk_size = max(4 * wanted, 64)
+        found = []
+        count = 0
+        for start in range(0, len(postings.by_rating), chunk_size):
+            window = slice(start, start + chunk_size)
+            rows = postings.by_rating[window][postings.rating_prices[window] <= max_price]
+            found.append(rows)
+            count += len(rows)
+            if count >= wanted:
+                break
+        return np.concatenate(found)[:wanted]
     
     def find_courses_for_skill(self, skill: str, difficulty: str = None, 
-                              max_results: int = 5) -> List[Dict[str, Any]]:
+                              max_results: int = 5, max_price: Optional[float] = None) -> List[Dict[str, Any]]:
         """Find courses for a specific skill"""
-        courses = self.skill_course_mapping.get(skill.lower(), [])
-        
-        if difficulty:
-            courses = [c for c in courses if c.get('difficulty', '').lower() == difficulty.lower()]
-        
-        # Sort by rating and relevance
-        courses.sort(key=lambda x: (-x.get('rating', 0), x.get('price', float('inf'))))
+        rows = self.find_course_rows(skill, difficulty, max_results, max_price)
+        return [self.course_rows[row] for row in rows]
+    
+    def find_courses_within_budget(self, skill: str, max_price: float,
+                                   difficulty: str = None) -> List[Dict[str, Any]]:
+        """Find all courses for a skill costing at most `max_price`, cheapest first"""
+        postings = self.skill_course_mapping.get(self._normalize_key(skill, difficulty))
+        if postings is None:
+            return []
         
-        return courses[:max_results]
+        affordable = np.searchsorted(postings.prices, max_price, side='right')
+        return [self.course_rows[row] for row in postings.by_price[:affordable]]
 
 class RecommendationEngine:
     """Generate personalized learning recommendations"""
     
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None,
+                 course_db: Optional[CourseDatabase] = None):
         self.config = config or Config()
-        self.course_db = CourseDatabase(config)
+        self.course_db = course_db or CourseDatabase(config)
         
         # Difficulty progression mapping
         self.difficulty_progression = {
@@ -240,26 +423,55 @@ class RecommendationEngine:
     def generate_recommendations(self, gaps: List[Dict[str, Any]], 
                                user_prefs: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Generate course recommendations based on skill gaps"""
+        recommendations, _ = self.select_recommendations(gaps, user_prefs)
+        return recommendations
+    
+    def select_recommendations(self, gaps: List[Dict[str, Any]],
+                               user_prefs: Optional[Dict[str, Any]] = None
+                               ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Generate recommendations plus a report on how they were selected
+        
+        `user_prefs["selectionMode"]` picks "greedy" (default) or "optimal".
+        """
+        user_prefs = user_prefs or {}
+        if user_prefs.get("selectionMode", "greedy") == "optimal":
+            return self._select_optimal(gaps, user_prefs)
+        
+        return self._select_greedy(gaps, user_prefs), {"mode": "greedy"}
+    
+    @staticmethod
+    def _sort_gaps(gaps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Gaps in selection order (by priority)"""
+        return sorted(gaps, key=lambda x: (x.get('priority', 5), x.get('gapType') == 'missing'))
+    
+    def _select_greedy(self, gaps: List[Dict[str, Any]],
+                       user_prefs: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Pick the best affordable course per gap in priority order"""
         
         if not gaps:
             return []
         
-        user_prefs = user_prefs or {}
+        sorted_gaps = self._sort_gaps(gaps)
+        return [
+            self._create_recommendation(self.course_db.get_course(row), sorted_gaps[gap_num], difficulty)
+            for gap_num, row, difficulty in self._greedy_picks(sorted_gaps, user_prefs)
+        ]
+    
+    def _greedy_picks(self, sorted_gaps: List[Dict[str, Any]],
+                      user_prefs: Dict[str, Any]) -> List[Tuple[int, int, str]]:
+        """Greedy choices as (gap number, course row, difficulty)"""
         learning_style = user_prefs.get("learningStyle", "mixed")
         budget_limit = user_prefs.get("budgetLimit", 1000)
         time_limit = user_prefs.get("timeLimit", 100)  # hours per month
         
-        recommendations = []
+        picks = []
         total_time = 0
         total_cost = 0
         
-        # Sort gaps by priority
-        sorted_gaps = sorted(gaps, key=lambda x: (x.get('priority', 5), x.get('gapType') == 'missing'))
-        
-        for gap in sorted_gaps:
+        for gap_num, gap in enumerate(sorted_gaps):
             if total_time >= time_limit:
                 break
-                
+            
             skill_name = gap.get('skillName', '')
             target_level = gap.get('targetLevel', 'Intermediate')
             current_level = gap.get('currentLevel', 'None')
@@ -267,21 +479,226 @@ class RecommendationEngine:
             # Determine appropriate difficulty
             recommended_difficulty = self._get_recommended_difficulty(current_level, target_level)
             
-            # Find courses
-            courses = self.course_db.find_courses_for_skill(skill_name, recommended_difficulty)
+            # Find candidate courses
+            rows = self.course_db.find_course_rows(
+                skill_name, recommended_difficulty, max_results=self.config.COURSE_CANDIDATE_LIMIT
+            )
             
-            if courses:
+            if len(rows):
                 # Select best course based on preferences
-                best_course = self._select_best_course(courses, learning_style, budget_limit - total_cost)
+                best_row = self._select_best_row(rows, learning_style, budget_limit - total_cost)
+                best_course = self.course_db.get_course(best_row) if best_row is not None else None
                 
                 if best_course and total_cost + best_course.get('price', 0) <= budget_limit:
-                    recommendation = self._create_recommendation(best_course, gap, recommended_difficulty)
-                    recommendations.append(recommendation)
+                    picks.append((gap_num, best_row, recommended_difficulty))
                     
                     total_time += best_course.get('duration_hours', 0)
                     total_cost += best_course.get('price', 0)
         
-        return recommendations
+        return picks
+    
+    def _build_candidate_groups(self, sorted_gaps: List[Dict[str, Any]], learning_style: str,
+                                budget_limit: float, time_limit: float) -> List[List[Tuple]]:
+        """Candidate courses per gap as (value, cost, hours, course, difficulty), best first
+        
+        A course's value is its preference score weighted by the gap priority,
+        so a critical gap is worth more than an optional one.
+        """
+        groups = []
+        per_gap = self.config.OPTIMIZER_CANDIDATES_PER_GAP
+        features = self.course_db.course_features
+        for gap in sorted_gaps:
+            difficulty = self._get_recommended_difficulty(
+                gap.get('currentLevel', 'None'), gap.get('targetLevel', 'Intermediate')
+            )
+            priority_weight = self._priority_weight(gap)
+            
+            rows = self.course_db.find_course_rows(
+                gap.get('skillName', ''), difficulty,
+                max_results=self.config.COURSE_CANDIDATE_LIMIT, max_price=budget_limit
+            )
+            rows = rows[features.hours[rows] <= time_limit]
+            values = priority_weight * self.score_course_rows(rows, learning_style)
+            rows, values = rows[values > 0], values[values > 0]
+            
+            candidates = []
+            for i in self._top_k_indices(values, per_gap):
+                row = rows[i]
+                candidates.append((float(values[i]), float(features.prices[row]),
+                                   float(features.hours[row]), self.course_db.get_course(row), difficulty))
+            groups.append(candidates)
+        
+        return groups
+    
+    @staticmethod
+    def _priority_weight(gap: Dict[str, Any]) -> int:
+        return max(1, 6 - gap.get('priority', 3))
+    
+    @staticmethod
+    def _fractional_bound(groups: List[List[Tuple[float, float]]], capacity: float) -> float:
+        """LP-relaxation bound of a multiple-choice knapsack with one resource
+        
+        `groups` hold (value, weight) items that fit the capacity, sorted by
+        weight, and taking no item of a group is allowed. Each group's upper convex hull from (0, 0) gives
+        increments with falling value per weight; filling the capacity with the
+        most efficient increments, the last one fractionally, is the LP optimum.
+        """
+        total = 0.0
+        increments = []
+        for items in groups:
+            hull = [(0.0, 0.0)]
+            for value, weight in items:
+                if value <= hull[-1][1]:
+                    continue  # dominated: no lighter item is worth less
+                while hull and hull[-1][0] >= weight:
+                    hull.pop()
+                while len(hull) >= 2 and ((hull[-1][1] - hull[-2][1]) * (weight - hull[-1][0])
+                                          <= (value - hull[-1][1]) * (hull[-1][0] - hull[-2][0])):
+                    hull.pop()
+                hull.append((weight, value))
+            total += hull[0][1]  # weightless start (a free course, or nothing)
+            increments.extend(
+                (hull[i + 1][0] - hull[i][0], hull[i + 1][1] - hull[i][1]) for i in range(len(hull) - 1)
+            )
+        
+        increments.sort(key=lambda step: step[1] / step[0], reverse=True)
+        for weight, value in increments:
+            if weight <= capacity:
+                total += value
+                capacity -= weight
+            else:
+                total += value * capacity / weight
+                break
+        return total
+    
+    def _select_optimal(self, gaps: List[Dict[str, Any]],
+                        user_prefs: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Maximize priority-weighted course score under hard budget and time limits
+        
+        This is a multiple-choice knapsack (at most one course per gap) solved
+        by depth-first branch-and-bound. The bound for the remaining gaps is the
+        smaller of the LP relaxations for the remaining budget and for the
+        remaining time. The search starts from the greedy plan when that plan
+        meets the time limit, so this mode never does worse than greedy. It
+        stops at the latency budget and returns the incumbent with a proven gap
+        to the bound; oversized candidate sets fall back to greedy.
+        """
+        start_time = time.perf_counter()
+        report = {"mode": "optimal", "objective": 0.0, "upperBound": 0.0,
+                  "optimalityGap": 0.0, "proven": True, "candidates": 0, "nodes": 0}
+        if not gaps:
+            return [], report
+        
+        learning_style = user_prefs.get("learningStyle", "mixed")
+        budget_limit = user_prefs.get("budgetLimit", 1000)
+        time_limit = user_prefs.get("timeLimit", 100)
+        
+        sorted_gaps = self._sort_gaps(gaps)
+        groups = self._build_candidate_groups(sorted_gaps, learning_style, budget_limit, time_limit)
+        report["candidates"] = sum(len(group) for group in groups)
+        
+        # Most valuable gaps first so the bound tightens early
+        order = sorted((i for i in range(len(groups)) if groups[i]),
+                       key=lambda i: groups[i][0][0], reverse=True)
+        # Candidates sorted by cost and by hours, for the fractional bounds
+        by_cost = {i: sorted(groups[i], key=lambda candidate: (candidate[1], -candidate[0])) for i in order}
+        by_hours = {i: sorted(groups[i], key=lambda candidate: (candidate[2], -candidate[0])) for i in order}
+        
+        # Incumbent: the greedy plan, if it meets the hard time limit (greedy
+        # only stops adding courses once the limit is reached)
+        best_value = 0.0
+        best_choice: Dict[int, Tuple] = {}
+        features = self.course_db.course_features
+        greedy_picks = self._greedy_picks(sorted_gaps, user_prefs)
+        if sum(features.hours[row] for _, row, _ in greedy_picks) <= time_limit:
+            for group_num, row, difficulty in greedy_picks:
+                value = self._priority_weight(sorted_gaps[group_num]) * float(
+                    self.score_course_rows(np.array([row]), learning_style)[0]
+                )
+                best_choice[group_num] = (value, float(features.prices[row]), float(features.hours[row]),
+                                          self.course_db.get_course(row), difficulty)
+                best_value += value
+        
+        # Or the best fitting candidate per gap in priority order, if that is worth more
+        value_first: Dict[int, Tuple] = {}
+        budget_left, time_left = budget_limit, time_limit
+        for group_num, group in enumerate(groups):
+            for candidate in group:
+                if candidate[1] <= budget_left and candidate[2] <= time_left:
+                    value_first[group_num] = candidate
+                    budget_left -= candidate[1]
+                    time_left -= candidate[2]
+                    break
+        if sum(candidate[0] for candidate in value_first.values()) > best_value:
+            best_choice = value_first
+            best_value = sum(candidate[0] for candidate in value_first.values())
+        
+        deadline = start_time + self.config.OPTIMIZER_TIME_BUDGET_MS / 1000
+        choice: Dict[int, Tuple] = {}
+        truncated = report["candidates"] > self.config.OPTIMIZER_MAX_CANDIDATES
+        nodes = 0
+        if truncated:
+            report["mode"] = "greedy-fallback"
+        
+        def bound(depth: int, budget_left: float, time_left: float) -> float:
+            remaining = order[depth:]
+            by_budget = [
+                [(value, cost) for value, cost, hours, _, _ in by_cost[group_num]
+                 if cost <= budget_left and hours <= time_left]
+                for group_num in remaining
+            ]
+            by_time = [
+                [(value, hours) for value, cost, hours, _, _ in by_hours[group_num]
+                 if cost <= budget_left and hours <= time_left]
+                for group_num in remaining
+            ]
+            return min(self._fractional_bound(by_budget, budget_left),
+                       self._fractional_bound(by_time, time_left))
+        
+        root_bound = bound(0, budget_limit, time_limit)
+        
+        def search(depth: int, value: float, budget_left: float, time_left: float) -> None:
+            nonlocal best_value, best_choice, truncated, nodes
+            nodes += 1
+            if value > best_value:
+                best_value, best_choice = value, dict(choice)
+            if depth == len(order) or truncated:
+                return
+            if nodes % 256 == 0 and time.perf_counter() > deadline:
+                truncated = True
+                return
+            if value + bound(depth, budget_left, time_left) <= best_value:
+                return
+            
+            group_num = order[depth]
+            for candidate in groups[group_num]:
+                _, cost, hours, _, _ = candidate
+                if cost <= budget_left and hours <= time_left:
+                    choice[group_num] = candidate
+                    search(depth + 1, value + candidate[0], budget_left - cost, time_left - hours)
+                    del choice[group_num]
+            # Skipping the gap is always feasible
+            search(depth + 1, value, budget_left, time_left)
+        
+        if not truncated:
+            search(0, 0.0, budget_limit, time_limit)
+        
+        recommendations = []
+        for group_num, gap in enumerate(sorted_gaps):
+            if group_num in best_choice:
+                _, _, _, course, difficulty = best_choice[group_num]
+                recommendations.append(self._create_recommendation(course, gap, difficulty))
+        
+        upper_bound = best_value if not truncated else max(best_value, root_bound)
+        report.update({
+            "objective": round(best_value, 2),
+            "upperBound": round(upper_bound, 2),
+            "optimalityGap": round(1 - best_value / upper_bound, 4) if upper_bound > 0 else 0.0,
+            "proven": not truncated,
+            "nodes": nodes,
+            "latencyMs": round((time.perf_counter() - start_time) * 1000, 2)
+        })
+        return recommendations, report
     
     def _get_recommended_difficulty(self, current_level: str, target_level: str) -> str:
         """Determine recommended course difficulty"""
@@ -301,64 +718,40 @@ class RecommendationEngine:
         else:
             return "Advanced" if current_num >= 2 else "Intermediate"
     
-    def _select_best_course(self, courses: List[Dict[str, Any]], learning_style: str, 
-                           remaining_budget: float) -> Optional[Dict[str, Any]]:
-        """Select the best course based on preferences"""
+    def _select_best_row(self, rows: np.ndarray, learning_style: str,
+                         remaining_budget: float) -> Optional[int]:
+        """Select the best affordable course row based on preferences"""
+        features = self.course_db.course_features
         
         # Filter by budget
-        affordable_courses = [c for c in courses if c.get('price', 0) <= remaining_budget]
-        
-        if not affordable_courses:
+        rows = rows[features.prices[rows] <= remaining_budget]
+        if len(rows) == 0:
             return None
         
-        # Score courses based on learning style
-        scored_courses = []
-        for course in affordable_courses:
-            score = self._calculate_course_score(course, learning_style)
-            scored_courses.append((score, course))
-        
-        # Sort by score (descending)
-        scored_courses.sort(key=lambda x: x[0], reverse=True)
-        
-        return scored_courses[0][1] if scored_courses else None
+        # Ties go to the earlier (higher-rated) row, as with a stable sort
+        scores = self.score_course_rows(rows, learning_style)
+        return int(rows[np.argmax(scores)])
+    
+    @staticmethod
+    def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k highest scores, best first (ties keep input order)"""
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        return top[np.lexsort((top, -scores[top]))]
     
     def _calculate_course_score(self, course: Dict[str, Any], learning_style: str) -> float:
         """Calculate course score based on learning preferences"""
-        score = 0.0
-        
-        # Base score from rating
-        score += course.get('rating', 0) * 20
-        
-        # Learning style preferences
-        course_type = course.get('type', 'course')
-        provider = course.get('provider', '').lower()
-        
-        if learning_style == "video" and provider in ['youtube', 'udemy']:
-            score += 10
-        elif learning_style == "structured" and provider in ['coursera']:
-            score += 10
-        elif learning_style == "hands-on" and 'project' in course.get('title', '').lower():
-            score += 15
-        
-        # Price preference (lower is better, but free isn't always best)
-        price = course.get('price', 0)
-        if price == 0:
-            score += 5  # Free courses get some bonus
-        else:
-            # Normalize price score (assume max reasonable price is 200)
-            price_score = max(0, 10 - (price / 20))
-            score += price_score
-        
-        # Duration preference (moderate length preferred)
-        duration = course.get('duration_hours', 10)
-        if 10 <= duration <= 30:
-            score += 5
-        elif duration < 5:
-            score -= 2  # Too short might not be comprehensive
-        elif duration > 50:
-            score -= 3  # Too long might be overwhelming
-        
-        return score
+        return self.course_db.base_course_score(course) + self.course_db.style_bonus(course, learning_style)
+    
+    def score_course_rows(self, rows: np.ndarray, learning_style: str) -> np.ndarray:
+        """Scores for many course rows in one vectorized expression"""
+        features = self.course_db.course_features
+        style_bonuses = features.style_bonuses.get(learning_style)
+        if style_bonuses is None:
+            return features.base_scores[rows]
+        return features.base_scores[rows] + style_bonuses[rows]
     
     def _create_recommendation(self, course: Dict[str, Any], gap: Dict[str, Any], 
                              difficulty: str) -> Dict[str, Any]:
@@ -456,22 +849,49 @@ class RecommendationEngine:
             "steps": steps
         }
 
+# Process-wide engine shared by the API, ResumeParser and scripts
+_shared_engine: Optional[RecommendationEngine] = None
+_shared_engine_lock = threading.Lock()
+
+def get_recommendation_engine(config: Optional[Config] = None) -> RecommendationEngine:
+    """Get the shared recommendation engine, building it on first use"""
+    global _shared_engine
+    engine = _shared_engine
+    if engine is None:
+        with _shared_engine_lock:
+            if _shared_engine is None:
+                _shared_engine = RecommendationEngine(config)
+            engine = _shared_engine
+    return engine
+
+def reload_recommendation_engine(config: Optional[Config] = None,
+                                 course_db: Optional[CourseDatabase] = None) -> RecommendationEngine:
+    """Rebuild the shared engine (re-reading course catalogs) and swap it in"""
+    global _shared_engine
+    engine = RecommendationEngine(config, course_db=course_db)
+    with _shared_engine_lock:
+        _shared_engine = engine
+    logger.info(f"Recommendation engine reloaded ({len(engine.course_db.course_rows)} courses)")
+    return engine
+
 # Main function for Phase 3
 def generate_recommendations_phase3(gaps: List[Dict[str, Any]], 
-                                  user_prefs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                                  user_prefs: Optional[Dict[str, Any]] = None,
+                                  engine: Optional[RecommendationEngine] = None) -> Dict[str, Any]:
     """Phase 3: Generate complete recommendations and learning path"""
     try:
-        engine = RecommendationEngine()
+        engine = engine or get_recommendation_engine()
         
         # Generate recommendations
-        recommendations = engine.generate_recommendations(gaps, user_prefs)
+        recommendations, selection = engine.select_recommendations(gaps, user_prefs)
         
         # Create learning path
         learning_path = engine.create_learning_path(recommendations, user_prefs)
         
         return {
             "recommendations": recommendations,
-            "learningPath": learning_path
+            "learningPath": learning_path,
+            "selection": selection
         }
     
     except Exception as e:
@@ -517,3 +937,39 @@ if __name__ == "__main__":
     
     print("=== RECOMMENDATION ENGINE TEST ===")
     print(json.dumps(result, indent=2))
+    
+    # Compare greedy and optimal selection under a tight budget
+    engine = RecommendationEngine()
+    tight_gaps = [
+        {"skillName": "Python", "targetLevel": "Intermediate", "currentLevel": "None",
+         "priority": 1, "gapType": "missing"},
+        {"skillName": "React", "targetLevel": "Intermediate", "currentLevel": "Beginner",
+         "priority": 2, "gapType": "level"},
+        {"skillName": "Git", "targetLevel": "Beginner", "currentLevel": "None",
+         "priority": 3, "gapType": "missing"}
+    ]
+    tight_prefs = {"learningStyle": "structured", "budgetLimit": 100, "timeLimit": 40}
+    for mode in ("greedy", "optimal"):
+        recommendations, selection = engine.select_recommendations(
+            tight_gaps, dict(tight_prefs, selectionMode=mode)
+        )
+        print(f"{mode}: {[rec['title'] for rec in recommendations]}")
+        print(f"  selection: {selection}")
+    
+    # Benchmark per-course scoring against vectorized scoring of a large candidate set
+    import timeit
+    candidate_courses = [dict(course, price=i % 200, rating=3 + (i % 20) / 10)
+                         for i, course in enumerate(engine.course_db.course_rows * 500)]
+    engine.course_db._courses = {"benchmark": candidate_courses}
+    engine.course_db.course_rows = candidate_courses
+    engine.course_db.course_features = engine.course_db._build_course_features()
+    candidate_rows = np.arange(len(candidate_courses))
+    
+    per_course = timeit.timeit(
+        lambda: max(candidate_courses, key=lambda c: engine._calculate_course_score(c, "video")), number=10
+    ) / 10
+    vectorized = timeit.timeit(
+        lambda: engine._select_best_row(candidate_rows, "video", 1000), number=10
+    ) / 10
+    print(f"Scoring {len(candidate_rows)} candidates: per-course {per_course * 1000:.2f}ms, "
+          f"vectorized {vectorized * 1000:.2f}ms")
@@ -0,0 +1,163 @@
+import logging
+from typing import Dict, Any, Optional, Iterable
+
+from config import Config
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Top-level sections of analysis responses (`roles` for multi-role analyses)
+RESPONSE_SECTIONS = (
+    "skills", "gaps", "matchScore", "recommendations", "learningPath", "summary", "roles", "bestFitRoleId"
+)
+ALWAYS_INCLUDED = ("version", "meta")
+VIEWS = ("full", "compact")
+
+# Keys kept by the compact view
+COMPACT_SKILL_KEYS = ("id", "name", "category", "score", "level")
+COMPACT_GAP_KEYS = ("skillId", "skillName", "currentLevel", "targetLevel", "priority")
+COMPACT_RECOMMENDATION_KEYS = ("id", "title", "provider", "estimatedHours", "price", "link", "skillName")
+COMPACT_STEP_KEYS = ("id", "title", "estimatedHours", "priority")
+
+def _pick(item: Dict[str, Any], keys: Iterable[str]) -> Dict[str, Any]:
+    return {key: item[key] for key in keys if key in item}
+
+class ResponseView:
+    """Section selection (`fields`) and detail level (`compact`) for a response
+    
+    Projections build new dicts and never modify the result they are given,
+    which may share objects with the analysis pipeline cache.
+    """
+    
+    def __init__(self, fields: Optional[Iterable[str]] = None, compact: bool = False):
+        self.fields = set(fields) if fields else None
+        self.compact = compact
+    
+    @classmethod
+    def from_params(cls, fields: Optional[str] = None, view: Optional[str] = None) -> Optional["ResponseView"]:
+        """Parse `fields=skills,matchScore` and `view=compact` (None when both are unset)"""
+        if not fields and (view is None or view == "full"):
+            return None
+        if view is not None and view not in VIEWS:
+            raise ValueError(f"view must be one of {list(VIEWS)}")
+        
+        selected = [field.strip() for field in (fields or "").split(",") if field.strip()]
+        unknown = [field for field in selected if field not in RESPONSE_SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown fields {unknown}; allowed: {list(RESPONSE_SECTIONS)}")
+        return cls(selected, compact=view == "compact")
+    
+    def includes(self, section: str) -> bool:
+        return self.fields is None or section in self.fields
+    
+    @property
+    def needs_recommendations(self) -> bool:
+        """Whether the phase-3 recommendation stage has to run at all"""
+        return any(self.includes(section) for section in ("recommendations", "learningPath", "summary"))
+    
+    def describe(self) -> Dict[str, Any]:
+        return {"fields": sorted(self.fields) if self.fields is not None else None, "compact": self.compact}
+    
+    def apply(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Project an analysis (or multi-role analysis) result"""
+        projected = {}
+        for key, value in result.items():
+            if key in ALWAYS_INCLUDED:
+                projected[key] = value
+            elif self.includes(key):
+                projected[key] = self._project_section(key, value)
+        
+        if "meta" in projected:
+            projected["meta"] = dict(projected["meta"], view=self.describe())
+        return projected
+    
+    def _project_section(self, section: str, value: Any) -> Any:
+        if section == "roles":
+            return [self._project_role(role) for role in value]
+        if not self.compact or not value:
+            return value
+        if section == "skills":
+            return [_pick(skill, COMPACT_SKILL_KEYS) for skill in value]
+        if section == "gaps":
+            return [_pick(gap, COMPACT_GAP_KEYS) for gap in value]
+        if section == "recommendations":
+            return [_pick(rec, COMPACT_RECOMMENDATION_KEYS) for rec in value]
+        if section == "learningPath":
+            return self._compact_learning_path(value)
+        return value
+    
+    def _project_role(self, role: Dict[str, Any]) -> Dict[str, Any]:
+        """Per-role entries keep their identity and apply the view to their sections"""
+        projected = {}
+        for key, value in role.items():
+            if key in RESPONSE_SECTIONS:
+                if self.fields is None or key in self.fields or key == "matchScore":
+                    projected[key] = self._project_section(key, value)
+            else:
+                projected[key] = value
+        return projected
+    
+    @staticmethod
+    def _compact_learning_path(learning_path: Dict[str, Any]) -> Dict[str, Any]:
+        """Totals plus slim steps that reference recommendations by id"""
+        compact = {key: value for key, value in learning_path.items() if key != "steps"}
+        compact["steps"] = [
+            dict(_pick(step, COMPACT_STEP_KEYS),
+                 resourceIds=[resource.get("id") for resource in step.get("resources", [])])
+            for step in learning_path.get("steps", [])
+        ]
+        return compact
+
+if __name__ == "__main__":
+    # Benchmark payload size and serialization time per view
+    Config.create_directories()
+    
+    import json
+    import time
+    
+    from batch_output import dumps_line, ORJSON_AVAILABLE
+    
+    evidence = [{"text": "Built and maintained production services " * 3, "start": 0, "end": 120}] * 3
+    recommendations = [{
+        "id": f"course_{i}", "title": f"Course {i}", "provider": "Coursera", "instructor": "Jane Doe",
+        "type": "course", "difficulty": "Intermediate", "estimatedHours": 20, "rating": 4.6, "price": 49,
+        "link": f"https://example.com/course/{i}", "skills": ["Python", "Docker", "AWS"],
+        "reason": "Add missing Python skills - Critical priority for target role", "priority": 1 + i % 5,
+        "skillName": f"Skill {i}", "description": "Hands-on course covering the fundamentals " * 4
+    } for i in range(10)]
+    phase3_result = {
+        "version": "1.0.0",
+        "skills": [{"id": f"skill_{i}", "name": f"Skill {i}", "category": "programming", "score": 80,
+                    "level": "Intermediate", "confidence": 0.9, "evidence": evidence} for i in range(30)],
+        "gaps": [{"skillId": f"gap_{i}", "skillName": f"Skill {i}", "targetLevel": "Advanced",
+                  "currentLevel": "None", "priority": 1 + i % 5,
+                  "rationale": f"Skill {i} is required for this role but not found in resume"} for i in range(15)],
+        "matchScore": {"overall_score": 72, "required_skills_score": 70, "preferred_skills_score": 78},
+        "recommendations": recommendations,
+        "learningPath": {"totalHours": 200, "totalCost": 490, "estimatedWeeks": 20, "hoursPerWeek": 10,
+                         "steps": [{"id": f"step_{i}", "title": f"Master Skill {i}", "description": rec["reason"],
+                                    "estimatedHours": 20, "priority": rec["priority"], "resources": [rec]}
+                                   for i, rec in enumerate(recommendations)]},
+        "summary": {"strengths": ["Skill 1"], "improvements": ["Skill 2"], "profileSummary": "Well qualified"},
+        "meta": {"model": "resume-analyzer-phase3", "phase": 3}
+    }
+    
+    print(f"=== RESPONSE VIEW BENCHMARK (orjson: {ORJSON_AVAILABLE}) ===")
+    modes = {
+        "full": None,
+        "view=compact": ResponseView.from_params(view="compact"),
+        "fields=skills,matchScore": ResponseView.from_params(fields="skills,matchScore"),
+        "fields=skills,matchScore&view=compact": ResponseView.from_params("skills,matchScore", "compact")
+    }
+    # 1000 runs each, so total seconds read as milliseconds per response
+    for name, view in modes.items():
+        start = time.perf_counter()
+        for _ in range(1000):
+            payload = json.dumps(view.apply(phase3_result) if view else phase3_result)
+        json_ms = (time.perf_counter() - start)
+        start = time.perf_counter()
+        for _ in range(1000):
+            dumps_line(view.apply(phase3_result) if view else phase3_result)
+        fast_ms = (time.perf_counter() - start)
+        print(f"{name:40s} {len(payload):7d} bytes  json {json_ms:.3f}ms  dumps_line {fast_ms:.3f}ms")
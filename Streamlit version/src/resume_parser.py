@@ -1,44 +1,86 @@
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Iterable, Iterator
 from pathlib import Path
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 import json
 import time
 
 from config import Config
 from data_preprocessing import ResumeTextExtractor, DataValidator
-from skill_extractor import analyze_resume_phase1
-from gap_analyzer import analyze_gaps_phase2, calculate_match_score
-from recommendation_engine import generate_recommendations_phase3
+from skill_extractor import get_skill_extractor
+from catalog import CatalogWatcher, get_catalog_watcher
+from pipeline import AnalysisPipeline
+from candidate_index import CandidateSkillIndex
+from batch_output import JsonlBatchWriter
+from run_manifest import RunManifest, file_content_hash
+from response_views import ResponseView
+from metrics import get_metrics, observe_analysis
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Synthetic resume used to warm up models and caches
+WARMUP_RESUME_TEXT = """
+Senior Software Engineer with 6 years of experience in Python, JavaScript and SQL.
+Built REST APIs with Django and Flask, frontends with React, and deployed services
+on AWS using Docker, Kubernetes and Jenkins. Used Git, PostgreSQL and Redis daily.
+"""
+
 class ResumeParser:
     """Main resume parsing orchestrator for all phases"""
     
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None,
+                 catalog: Optional[CatalogWatcher] = None,
+                 pipeline: Optional[AnalysisPipeline] = None):
         self.config = config or Config()
         self.text_extractor = ResumeTextExtractor(config)
         self.validator = DataValidator()
+        self.catalog = catalog or get_catalog_watcher(config)
+        self.pipeline = pipeline or AnalysisPipeline(config, self.catalog)
+        self.metrics = get_metrics()
+    
+    def warm_up(self) -> float:
+        """Load models and catalogs and run one synthetic analysis
+        
+        The synthetic phase-3 run goes through spaCy, taxonomy matching, gap
+        analysis and course selection, so everything built lazily is in place
+        before the first request. Returns the seconds it took.
+        """
+        start_time = time.time()
+        get_skill_extractor()
+        roles = self.catalog.snapshot.job_manager.list_available_roles()
+        role_id = roles[0]["id"] if roles else None
+        
+        stages = self.pipeline.run(WARMUP_RESUME_TEXT, 3 if role_id else 1, role_id, {})
+        if "error" in stages["phase1"]:
+            raise RuntimeError(f"Warm-up analysis failed: {stages['phase1']['error']}")
+        
+        elapsed = time.time() - start_time
+        logger.info(f"Warm-up finished in {elapsed:.2f}s")
+        return elapsed
     
+    @observe_analysis("file")
     def parse_resume_file(self, file_path: Path, phase: int = 1, 
                          job_context: Optional[Dict[str, Any]] = None,
-                         user_prefs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                         user_prefs: Optional[Dict[str, Any]] = None,
+                         view: Optional[ResponseView] = None) -> Dict[str, Any]:
         """Parse a resume file and return results based on phase"""
         
         start_time = time.time()
         
         try:
             # Extract text based on file type
-            if file_path.suffix.lower() == '.pdf':
-                text = self.text_extractor.extract_from_pdf(file_path)
-            elif file_path.suffix.lower() == '.docx':
-                text = self.text_extractor.extract_from_docx(file_path)
-            elif file_path.suffix.lower() == '.txt':
-                text = self.text_extractor.extract_from_txt(file_path)
-            else:
-                raise ValueError(f"Unsupported file format: {file_path.suffix}")
+            with self.metrics.timer("stage_duration_seconds", stage="text_extraction"):
+                if file_path.suffix.lower() == '.pdf':
+                    text = self.text_extractor.extract_from_pdf(file_path)
+                elif file_path.suffix.lower() == '.docx':
+                    text = self.text_extractor.extract_from_docx(file_path)
+                elif file_path.suffix.lower() == '.txt':
+                    text = self.text_extractor.extract_from_txt(file_path)
+                else:
+                    raise ValueError(f"Unsupported file format: {file_path.suffix}")
             
             if not text:
                 raise ValueError("Could not extract text from resume")
@@ -49,44 +91,71 @@ class ResumeParser:
                 logger.warning(f"Resume validation failed: {validation['reason']}")
             
             # Parse based on phase
-            return self.parse_resume_text(text, phase, job_context, user_prefs)
+            return self.parse_resume_text(text, phase, job_context, user_prefs, view=view)
         
         except Exception as e:
             logger.error(f"Error parsing resume file {file_path}: {e}")
-            return self._create_error_response(str(e), time.time() - start_time)
+            error_response = self._create_error_response(str(e), time.time() - start_time)
+            return view.apply(error_response) if view else error_response
     
-    def parse_resume_text(self, resume_text: str, phase: int = 1,
+    @observe_analysis("text")
+    def parse_resume_text(self, resume_text: Optional[str], phase: int = 1,
                          job_context: Optional[Dict[str, Any]] = None,
-                         user_prefs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Parse resume text and return results based on phase"""
+                         user_prefs: Optional[Dict[str, Any]] = None,
+                         session_id: Optional[str] = None,
+                         view: Optional[ResponseView] = None) -> Dict[str, Any]:
+        """Parse resume text and return results based on phase
+        
+        Stage outputs are memoized per analysis session, so repeating a call
+        with another role or other preferences only reruns what changed.
+        Pass `session_id` instead of the text to reuse an earlier analysis.
+        A `view` trims the response; phase 3 skips the recommendation stage
+        when the view selects none of its sections.
+        """
+        
+        if view is not None:
+            return view.apply(self._analyze_text(resume_text, phase, job_context, user_prefs, session_id,
+                                                 recommendations=view.needs_recommendations))
+        return self._analyze_text(resume_text, phase, job_context, user_prefs, session_id)
+    
+    def _analyze_text(self, resume_text: Optional[str], phase: int,
+                      job_context: Optional[Dict[str, Any]], user_prefs: Optional[Dict[str, Any]],
+                      session_id: Optional[str], recommendations: bool = True) -> Dict[str, Any]:
+        """Analysis behind parse_resume_text; without `recommendations` phase 3 leaves out its sections"""
         
         start_time = time.time()
         
         try:
+            if phase >= 2 and (not job_context or 'roleId' not in job_context):
+                raise ValueError("Job context with roleId required for Phase 2+")
+            target_role_id = job_context['roleId'] if phase >= 2 else None
+            
+            stage_phase = phase if recommendations else min(phase, 2)
+            stages = self.pipeline.run(resume_text, stage_phase, target_role_id, user_prefs, session_id)
+            pipeline_meta = {"sessionId": stages["sessionId"], "stages": stages["stages"]}
+            
             # Phase 1: Extract skills only
-            phase1_result = analyze_resume_phase1(resume_text)
+            phase1_result = dict(stages["phase1"])
             
             if phase == 1:
                 phase1_result["meta"] = {
                     "model": "resume-analyzer-phase1",
                     "latencyMs": int((time.time() - start_time) * 1000),
-                    "phase": 1
+                    "phase": 1,
+                    "pipeline": pipeline_meta
                 }
                 return phase1_result
             
             # Phase 2: Add gap analysis
             if phase >= 2:
-                if not job_context or 'roleId' not in job_context:
-                    raise ValueError("Job context with roleId required for Phase 2+")
-                
-                target_role_id = job_context['roleId']
-                gaps = analyze_gaps_phase2(phase1_result['skills'], target_role_id)
-                match_score = calculate_match_score(phase1_result['skills'], target_role_id)
+                catalog = stages["catalog"]
+                phase2 = stages["gaps"]
+                gaps = phase2["gaps"]
                 
                 phase2_result = phase1_result.copy()
                 phase2_result.update({
                     "gaps": gaps,
-                    "matchScore": match_score
+                    "matchScore": phase2["matchScore"]
                 })
                 
                 if phase == 2:
@@ -94,38 +163,144 @@ class ResumeParser:
                         "model": "resume-analyzer-phase2",
                         "latencyMs": int((time.time() - start_time) * 1000),
                         "phase": 2,
-                        "targetRole": job_context.get('title', target_role_id)
+                        "targetRole": job_context.get('title', target_role_id),
+                        "catalogVersion": catalog.version,
+                        "pipeline": pipeline_meta
                     }
                     return phase2_result
             
             # Phase 3: Add recommendations and learning path
             if phase >= 3:
-                recommendations_result = generate_recommendations_phase3(gaps, user_prefs)
-                
                 phase3_result = phase2_result.copy()
-                phase3_result.update({
-                    "recommendations": recommendations_result["recommendations"],
-                    "learningPath": recommendations_result["learningPath"]
-                })
-                
-                # Generate summary
-                summary = self._generate_summary(phase3_result)
-                phase3_result["summary"] = summary
-                
-                phase3_result["meta"] = {
+                phase3_meta = {
                     "model": "resume-analyzer-phase3",
-                    "latencyMs": int((time.time() - start_time) * 1000),
+                    "latencyMs": 0,
                     "phase": 3,
                     "targetRole": job_context.get('title', target_role_id),
-                    "totalRecommendations": len(recommendations_result["recommendations"])
+                    "catalogVersion": catalog.version,
+                    "pipeline": pipeline_meta
                 }
                 
+                if recommendations:
+                    recommendations_result = stages["recommendations"]
+                    phase3_result.update({
+                        "recommendations": recommendations_result["recommendations"],
+                        "learningPath": recommendations_result["learningPath"]
+                    })
+                    
+                    # Generate summary
+                    summary = self._generate_summary(phase3_result)
+                    phase3_result["summary"] = summary
+                    
+                    phase3_meta.update({
+                        "totalRecommendations": len(recommendations_result["recommendations"]),
+                        "selection": recommendations_result.get("selection")
+                    })
+                
+                phase3_meta["latencyMs"] = int((time.time() - start_time) * 1000)
+                phase3_result["meta"] = phase3_meta
+                
                 return phase3_result
-            
+        
         except Exception as e:
             logger.error(f"Error in parse_resume_text: {e}")
             return self._create_error_response(str(e), time.time() - start_time)
     
+    @observe_analysis("multi_role")
+    def parse_resume_multi_role(self, resume_text: Optional[str], job_contexts: List[Dict[str, Any]],
+                                phase: int = 2, user_prefs: Optional[Dict[str, Any]] = None,
+                                session_id: Optional[str] = None,
+                                view: Optional[ResponseView] = None) -> Dict[str, Any]:
+        """Extract skills once and analyze them against several roles
+        
+        Roles are returned ranked by overall match score; roles that could
+        not be analyzed (e.g. unknown role ids) are listed last.
+        """
+        
+        if view is not None:
+            return view.apply(self._analyze_multi_role(resume_text, job_contexts, phase, user_prefs, session_id,
+                                                       recommendations=view.needs_recommendations))
+        return self._analyze_multi_role(resume_text, job_contexts, phase, user_prefs, session_id)
+    
+    def _analyze_multi_role(self, resume_text: Optional[str], job_contexts: List[Dict[str, Any]],
+                            phase: int, user_prefs: Optional[Dict[str, Any]],
+                            session_id: Optional[str], recommendations: bool = True) -> Dict[str, Any]:
+        """Analysis behind parse_resume_multi_role; without `recommendations` phase 3 leaves out its sections"""
+        
+        start_time = time.time()
+        
+        try:
+            if phase < 2:
+                raise ValueError("Multi-role analysis requires phase 2 or 3")
+            if not job_contexts or any('roleId' not in job_context for job_context in job_contexts):
+                raise ValueError("Job contexts with roleId required for multi-role analysis")
+            
+            phase1_status: Dict[str, str] = {}
+            session_id, phase1 = self.pipeline.run_phase1(resume_text, session_id, phase1_status)
+            if "error" in phase1:
+                raise ValueError(phase1["error"])
+            
+            # One catalog snapshot for every role in the request
+            catalog = self.catalog.snapshot
+            stage_counts = {"gaps": Counter(), "recommendations": Counter()}
+            
+            stage_phase = phase if recommendations else min(phase, 2)
+            roles = []
+            for job_context in job_contexts:
+                role_id = job_context['roleId']
+                role_status: Dict[str, str] = {}
+                stages = self.pipeline.run_role(session_id, phase1, role_id, stage_phase, user_prefs,
+                                                catalog, role_status)
+                for stage, status in role_status.items():
+                    stage_counts[stage][status] += 1
+                
+                role_requirements = catalog.job_manager.get_role_requirements(role_id) or {}
+                role_result = {
+                    "roleId": role_id,
+                    "title": job_context.get('title') or role_requirements.get('title', role_id),
+                    "matchScore": stages["gaps"]["matchScore"],
+                    "gapSummary": stages["gaps"]["gapSummary"],
+                    "gaps": stages["gaps"]["gaps"]
+                }
+                
+                if stage_phase >= 3:
+                    role_result["recommendations"] = stages["recommendations"]["recommendations"]
+                    role_result["learningPath"] = stages["recommendations"]["learningPath"]
+                    role_result["summary"] = self._generate_summary(dict(phase1, **role_result))
+                
+                roles.append(role_result)
+            
+            # Best match first; failed roles last (stable for ties)
+            roles.sort(key=lambda role: ('error' in role["matchScore"],
+                                         -role["matchScore"].get('overall_score', 0)))
+            for rank, role_result in enumerate(roles, start=1):
+                role_result["rank"] = rank
+            
+            return {
+                "version": phase1.get("version", self.config.API_VERSION),
+                "skills": phase1["skills"],
+                "roles": roles,
+                "bestFitRoleId": roles[0]["roleId"] if 'error' not in roles[0]["matchScore"] else None,
+                "meta": {
+                    "model": f"resume-analyzer-phase{phase}-multi-role",
+                    "latencyMs": int((time.time() - start_time) * 1000),
+                    "phase": phase,
+                    "rolesAnalyzed": len(roles),
+                    "catalogVersion": catalog.version,
+                    "pipeline": {
+                        "sessionId": session_id,
+                        "stages": {
+                            "phase1": phase1_status["phase1"],
+                            **{stage: dict(counts) for stage, counts in stage_counts.items() if counts}
+                        }
+                    }
+                }
+            }
+        
+        except Exception as e:
+            logger.error(f"Error in parse_resume_multi_role: {e}")
+            return self._create_error_response(str(e), time.time() - start_time)
+    
     def _generate_summary(self, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
         """Generate summary of analysis results"""
         
@@ -199,13 +374,123 @@ class ResumeParser:
             }
         }
     
+    def _process_batch_item(self, resume_file: Path, output_folder: Optional[Path], phase: int,
+                            job_context: Optional[Dict[str, Any]]) -> Tuple:
+        """Parse one resume for a batch and return (summary, skills, result)
+        
+        With an output folder the result is written to `*_analysis.json` and
+        not returned; without one it is returned for a streaming sink.
+        """
+        result = self.parse_resume_file(resume_file, phase, job_context)
+        summary = {
+            "filename": resume_file.name,
+            "status": "success",
+            "skills_count": len(result.get('skills', [])),
+            "match_score": result.get('matchScore', {}).get('overall_score', 0),
+            "session_id": ((result.get('meta') or {}).get('pipeline') or {}).get('sessionId')
+        }
+        analysis_error = (result.get('summary') or {}).get('error')
+        if analysis_error:
+            summary["error"] = analysis_error
+        
+        if output_folder is None:
+            return summary, result.get('skills', []), result
+        
+        output_file = output_folder / f"{resume_file.stem}_analysis.json"
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        summary["output_file"] = output_file.name
+        return summary, result.get('skills', []), None
+    
+    def _iter_sequential(self, resume_files: Iterable[Path], output_folder: Optional[Path], phase: int,
+                         job_context: Optional[Dict[str, Any]]) -> Iterator[Tuple]:
+        for resume_file in resume_files:
+            logger.info(f"Processing: {resume_file.name}")
+            try:
+                yield (resume_file, *self._process_batch_item(resume_file, output_folder, phase, job_context), None)
+            except Exception as e:
+                yield resume_file, None, [], None, str(e)
+    
+    def _iter_parallel(self, resume_files: Iterable[Path], output_folder: Optional[Path], phase: int,
+                       job_context: Optional[Dict[str, Any]], workers: int) -> Iterator[Tuple]:
+        """Parse resumes in a process pool, yielding results as they finish
+        
+        Only `workers * BATCH_QUEUE_FACTOR` files are submitted at a time, so
+        memory stays flat however large the folder is.
+        """
+        max_in_flight = workers * self.config.BATCH_QUEUE_FACTOR
+        pending_files = iter(resume_files)
+        in_flight = {}
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker) as executor:
+            while True:
+                while len(in_flight) < max_in_flight:
+                    resume_file = next(pending_files, None)
+                    if resume_file is None:
+                        break
+                    future = executor.submit(
+                        _process_resume_in_worker, resume_file, output_folder, phase, job_context
+                    )
+                    in_flight[future] = resume_file
+                
+                if not in_flight:
+                    break
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    resume_file = in_flight.pop(future)
+                    try:
+                        *outcome, samples = future.result()
+                        self.metrics.merge(samples)
+                        yield (resume_file, *outcome, None)
+                    except Exception as e:
+                        yield resume_file, None, [], None, str(e)
+    
     def batch_process_resumes(self, resume_folder: Path, output_folder: Path,
-                            phase: int = 1, job_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Process multiple resumes in batch"""
+                            phase: int = 1, job_context: Optional[Dict[str, Any]] = None,
+                            candidate_index: Optional[CandidateSkillIndex] = None,
+                            workers: Optional[int] = None,
+                            output_format: Optional[str] = None,
+                            checkpoint: Optional[bool] = None) -> Dict[str, Any]:
+        """Process multiple resumes in batch
+        
+        Each successful result is added to `candidate_index` (by default the
+        pipeline's) under its session id, with the file name, so stored
+        candidates can be ranked without re-analysis.
+        With more than one worker (default `Config.BATCH_WORKERS`), resumes are
+        parsed in a process pool whose workers load models and catalogs once.
+        
+        `output_format="jsonl"` streams one line per resume into rotating
+        `analysis-*.jsonl` parts instead of one JSON file per resume, and
+        keeps only counters in memory (no per-resume `results` list).
+        
+        With checkpointing (default `Config.BATCH_CHECKPOINT`), a run manifest
+        in the output folder records each input's content hash and outcome.
+        Rerunning into the same folder with the same phase, job context and
+        output format skips finished inputs and retries failed ones up to
+        `Config.BATCH_MAX_ATTEMPTS`; progress with throughput and ETA
+        is logged periodically and returned under `run`.
+        
+        Metrics of the process (including its workers) are written to
+        `Config.BATCH_METRICS_NAME` in the output folder when the run ends.
+        """
         
         resume_folder = Path(resume_folder)
         output_folder = Path(output_folder)
         output_folder.mkdir(parents=True, exist_ok=True)
+        workers = workers or self.config.BATCH_WORKERS
+        if candidate_index is None:
+            candidate_index = self.pipeline.candidate_index
+        output_format = output_format or self.config.BATCH_OUTPUT_FORMAT
+        sink = JsonlBatchWriter(output_folder, config=self.config) if output_format == "jsonl" else None
+        if checkpoint is None:
+            checkpoint = self.config.BATCH_CHECKPOINT
+        manifest = None
+        if checkpoint:
+            # Inputs finished with other parameters are analyzed again
+            run_params = {"phase": phase, "jobContext": job_context, "outputFormat": output_format}
+            manifest = RunManifest(output_folder / self.config.BATCH_MANIFEST_NAME, self.config,
+                                   run_params=run_params)
         
         results = {
             "processed": 0,
@@ -213,41 +498,124 @@ class ResumeParser:
             "results": []
         }
         
-        # Process each resume file
-        for resume_file in resume_folder.iterdir():
-            if resume_file.suffix.lower() in ['.pdf', '.docx', '.txt']:
-                logger.info(f"Processing: {resume_file.name}")
-                
-                try:
-                    # Parse resume
-                    result = self.parse_resume_file(resume_file, phase, job_context)
-                    
-                    # Save result
-                    output_file = output_folder / f"{resume_file.stem}_analysis.json"
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        json.dump(result, f, indent=2)
+        resume_files = sorted(
+            resume_file for resume_file in resume_folder.iterdir()
+            if resume_file.suffix.lower() in ['.pdf', '.docx', '.txt']
+        )
+        content_hashes: Dict[Path, str] = {}
+        if manifest:
+            manifest.start_run(len(resume_files))
+            resume_files = self._iter_unfinished(resume_files, manifest, content_hashes)
+        item_folder = None if sink else output_folder
+        if workers > 1:
+            outcomes = self._iter_parallel(resume_files, item_folder, phase, job_context, workers)
+        else:
+            outcomes = self._iter_sequential(resume_files, item_folder, phase, job_context)
+        
+        # Record each resume as soon as it finishes
+        last_progress = time.time()
+        try:
+            for resume_file, summary, skills, result, error in outcomes:
+                # A resume the parser could not analyze (summary.error) failed too
+                error = error or (summary or {}).get("error")
+                if error is None:
+                    if candidate_index is not None and skills and summary.get("session_id"):
+                        candidate_index.add_resume(summary["session_id"], skills, resume_file.name)
                     
                     results["processed"] += 1
-                    results["results"].append({
-                        "filename": resume_file.name,
-                        "output_file": output_file.name,
-                        "status": "success",
-                        "skills_count": len(result.get('skills', [])),
-                        "match_score": result.get('matchScore', {}).get('overall_score', 0)
-                    })
-                    
+                    if sink:
+                        sink.write({"resumeId": resume_file.stem, "filename": resume_file.name,
+                                    "status": "success", **result})
+                    else:
+                        results["results"].append(summary)
                     logger.info(f"Successfully processed: {resume_file.name}")
-                    
-                except Exception as e:
+                else:
                     results["failed"] += 1
-                    results["results"].append({
+                    failure = {
                         "filename": resume_file.name,
                         "status": "failed",
-                        "error": str(e)
-                    })
-                    logger.error(f"Failed to process {resume_file.name}: {e}")
+                        "error": error
+                    }
+                    if sink:
+                        sink.write({"resumeId": resume_file.stem, **failure})
+                    else:
+                        results["results"].append(failure)
+                    logger.error(f"Failed to process {resume_file.name}: {error}")
+                
+                if manifest:
+                    self._checkpoint_item(manifest, sink, resume_file, content_hashes.pop(resume_file), error)
+                    if time.time() - last_progress >= self.config.BATCH_PROGRESS_INTERVAL:
+                        last_progress = time.time()
+                        logger.info(f"Batch progress: {manifest.summary()}")
+        finally:
+            if sink:
+                sink.close()
+            if manifest:
+                # Outputs are closed, so everything recorded so far is durable
+                manifest.finish_run()
+                results["run"] = manifest.summary()
+                manifest.close()
+            self.metrics.write_textfile(output_folder / self.config.BATCH_METRICS_NAME)
+        
+        if sink:
+            del results["results"]
+            results["outputFiles"] = [path.name for path in sink.files]
         
         return results
+    
+    @staticmethod
+    def _iter_unfinished(resume_files: List[Path], manifest: RunManifest,
+                         content_hashes: Dict[Path, str]) -> Iterator[Path]:
+        """Yield inputs the manifest has not finished, remembering their hashes"""
+        for resume_file in resume_files:
+            content_hash = file_content_hash(resume_file)
+            if manifest.should_process(resume_file.name, content_hash):
+                content_hashes[resume_file] = content_hash
+                yield resume_file
+            else:
+                logger.info(f"Skipping finished: {resume_file.name}")
+    
+    def _checkpoint_item(self, manifest: RunManifest, sink: Optional[JsonlBatchWriter],
+                         resume_file: Path, content_hash: str, error: Optional[str]) -> None:
+        """Record an outcome, committing once outputs up to it are flushed"""
+        if error:
+            manifest.record_failure(resume_file.name, content_hash, error)
+        else:
+            manifest.record_success(resume_file.name, content_hash)
+        
+        if manifest.pending_count >= self.config.BATCH_CHECKPOINT_EVERY:
+            if sink:
+                sink.flush()
+            manifest.commit()
+
+# Batch worker process state
+_batch_parser: Optional[ResumeParser] = None
+
+def _init_batch_worker() -> None:
+    """Load the NLP pipeline, taxonomy, roles and courses once per worker"""
+    global _batch_parser
+    _batch_parser = ResumeParser()
+    get_skill_extractor()
+    _batch_parser.catalog.snapshot
+
+def _process_resume_in_worker(resume_file: Path, output_folder: Optional[Path], phase: int,
+                              job_context: Optional[Dict[str, Any]]) -> Tuple:
+    """Process one batch item; its metrics samples are appended to the tuple"""
+    outcome = _batch_parser._process_batch_item(resume_file, output_folder, phase, job_context)
+    return (*outcome, get_metrics().drain())
+
+def _warm_up_worker() -> float:
+    return _batch_parser.warm_up()
+
+def _run_parser_in_worker(method: Optional[str], args: Tuple, kwargs: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+    """Call a parser method in a worker, picking up catalog changes first
+    
+    Returns (result, metrics samples recorded by the call).
+    """
+    _batch_parser.catalog.check_for_changes()
+    if method is None:
+        return None, get_metrics().drain()
+    return getattr(_batch_parser, method)(*args, **kwargs), get_metrics().drain()
 
 # Utility functions for direct API use
 def parse_resume_phase1(resume_text: str) -> Dict[str, Any]:
@@ -269,6 +637,9 @@ def parse_resume_phase3(resume_text: str, job_context: Dict[str, Any],
 if __name__ == "__main__":
     # Test the complete resume parser
     Config.create_directories()
+    # Keep the sample resume out of the real candidate index and session store
+    Config.CANDIDATE_INDEX_ENABLED = False
+    Config.SESSION_STORE_ENABLED = False
     
     sample_resume = """
     John Doe
@@ -317,3 +688,7 @@ if __name__ == "__main__":
     print(f"Recommendations: {len(phase3_result['recommendations'])}")
     print(f"Learning path steps: {len(phase3_result['learningPath']['steps'])}")
     print(f"Estimated weeks: {phase3_result['learningPath']['estimatedWeeks']}")
+    
+    # Metrics collected by the runs above
+    print("\n=== METRICS ===")
+    print(parser.metrics.render())
@@ -0,0 +1,250 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+from collections import Counter
+
+from config import Config
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def file_content_hash(file_path: Path) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class RunManifest:
+    """Checkpoint of a batch run: one row per input with its content hash and status
+    
+    An item is skipped on restart once it is done with the same content hash
+    and run parameters (e.g. phase and job context), and failed items are
+    retried until they reach `max_attempts`; a rerun with other parameters
+    processes every input again. Outcomes are
+    buffered and written by `commit()` in one transaction, which the caller
+    runs after flushing the outputs they checkpoint; `summary()` can be read
+    from another process while the run is still going.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS items (
+            item_id TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            params TEXT,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL,
+            error TEXT,
+            run_id INTEGER NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            finished_at REAL,
+            total INTEGER NOT NULL DEFAULT 0,
+            succeeded INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            skipped INTEGER NOT NULL DEFAULT 0
+        );
+    """
+    
+    def __init__(self, manifest_path: Path, config: Optional[Config] = None,
+                 max_attempts: Optional[int] = None,
+                 run_params: Optional[Dict[str, Any]] = None):
+        self.config = config or Config()
+        self.manifest_path = Path(manifest_path)
+        self.max_attempts = max_attempts or self.config.BATCH_MAX_ATTEMPTS
+        self.params = json.dumps(run_params or {}, sort_keys=True, default=str)
+        self.run_id: Optional[int] = None
+        self._pending: List[Tuple[str, str, str, Optional[str]]] = []
+        self._pending_skipped = 0
+        
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.manifest_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(items)")]
+        if "params" not in columns:
+            # Items of older manifests have unknown parameters and are processed again
+            self._conn.execute("ALTER TABLE items ADD COLUMN params TEXT")
+        self._conn.commit()
+    
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+    
+    def start_run(self, total: int) -> int:
+        """Open a new run over `total` inputs and return its id"""
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (started_at, updated_at, total) VALUES (?, ?, ?)", (now, now, total)
+            )
+        self.run_id = cursor.lastrowid
+        return self.run_id
+    
+    def finish_run(self) -> None:
+        """Commit pending outcomes and mark the current run as finished"""
+        self.commit()
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ?, updated_at = ? WHERE run_id = ?", (now, now, self.run_id)
+            )
+    
+    def should_process(self, item_id: str, content_hash: str) -> bool:
+        """Whether an input still needs work; counts it as skipped if not"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, params, status, attempts FROM items WHERE item_id = ?", (item_id,)
+            ).fetchone()
+        
+        if row is None or row[0] != content_hash or row[1] != self.params:
+            return True
+        status, attempts = row[2], row[3]
+        if status == "failed" and attempts < self.max_attempts:
+            return True
+        
+        self._pending_skipped += 1
+        return False
+    
+    def record_success(self, item_id: str, content_hash: str) -> None:
+        """Queue a finished input for the next checkpoint"""
+        self._pending.append((item_id, content_hash, "done", None))
+    
+    def record_failure(self, item_id: str, content_hash: str, error: str) -> None:
+        """Queue a failed input (retried on restart until attempts run out)"""
+        self._pending.append((item_id, content_hash, "failed", error))
+    
+    @property
+    def pending_count(self) -> int:
+        """Outcomes recorded since the last commit"""
+        return len(self._pending)
+    
+    def commit(self) -> None:
+        """Write queued outcomes and run counters in one transaction"""
+        pending, self._pending = self._pending, []
+        skipped, self._pending_skipped = self._pending_skipped, 0
+        now = time.time()
+        counters = Counter(status for _, _, status, _ in pending)
+        
+        with self._lock, self._conn:
+            for item_id, content_hash, status, error in pending:
+                row = self._conn.execute(
+                    "SELECT content_hash, params, attempts FROM items WHERE item_id = ?", (item_id,)
+                ).fetchone()
+                # Attempts restart when the input content or the run parameters changed
+                same_input = row is not None and row[0] == content_hash and row[1] == self.params
+                attempts = row[2] + 1 if same_input else 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO items "
+                    "(item_id, content_hash, params, status, attempts, error, run_id, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (item_id, content_hash, self.params, status, attempts, error, self.run_id, now)
+                )
+            self._conn.execute(
+                "UPDATE runs SET succeeded = succeeded + ?, failed = failed + ?, skipped = skipped + ?, "
+                "updated_at = ? WHERE run_id = ?",
+                (counters["done"], counters["failed"], skipped, now, self.run_id)
+            )
+    
+    def failed_items(self) -> Dict[str, Dict[str, Any]]:
+        """Inputs whose last attempt failed, with attempts and error"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_id, attempts, error FROM items WHERE status = 'failed' ORDER BY item_id"
+            ).fetchall()
+        return {
+            item_id: {"attempts": attempts, "error": error, "retryable": attempts < self.max_attempts}
+            for item_id, attempts, error in rows
+        }
+    
+    def summary(self, run_id: Optional[int] = None) -> Dict[str, Any]:
+        """Progress of a run (default: the latest) with throughput and ETA"""
+        with self._lock:
+            if run_id is None:
+                run_id = self.run_id or self._conn.execute("SELECT MAX(run_id) FROM runs").fetchone()[0]
+            row = self._conn.execute(
+                "SELECT started_at, updated_at, finished_at, total, succeeded, failed, skipped "
+                "FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        
+        if row is None:
+            return {"runId": None, "status": "none"}
+        
+        started_at, updated_at, finished_at, total, succeeded, failed, skipped = row
+        elapsed = (finished_at or time.time()) - started_at
+        processed = succeeded + failed
+        remaining = max(0, total - skipped - processed)
+        throughput = processed / elapsed if elapsed > 0 else 0.0
+        if not remaining:
+            eta = 0.0
+        elif throughput > 0:
+            eta = round(remaining / throughput, 1)
+        else:
+            eta = None
+        
+        return {
+            "runId": run_id,
+            "status": "finished" if finished_at else "running",
+            "total": total,
+            "succeeded": succeeded,
+            "failed": failed,
+            "skipped": skipped,
+            "remaining": remaining,
+            "elapsedSeconds": round(elapsed, 1),
+            "itemsPerSecond": round(throughput, 2),
+            "etaSeconds": eta,
+            "lastUpdate": int(updated_at)
+        }
+
+if __name__ == "__main__":
+    # Show the progress of a run: python run_manifest.py <output_folder>
+    Config.create_directories()
+    
+    import json
+    import sys
+    import tempfile
+    
+    if len(sys.argv) > 1:
+        manifest = RunManifest(Path(sys.argv[1]) / Config.BATCH_MANIFEST_NAME)
+        print(json.dumps(manifest.summary(), indent=2))
+        print(json.dumps(manifest.failed_items(), indent=2))
+        sys.exit(0)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manifest = RunManifest(Path(tmp_dir) / Config.BATCH_MANIFEST_NAME, max_attempts=2)
+        items = {f"resume_{i}.txt": f"hash_{i}" for i in range(10)}
+        
+        # First run dies after 6 items, one of which failed
+        manifest.start_run(len(items))
+        for item_id in list(items)[:6]:
+            if item_id == "resume_3.txt":
+                manifest.record_failure(item_id, items[item_id], "Could not extract text from resume")
+            else:
+                manifest.record_success(item_id, items[item_id])
+        manifest.commit()
+        print("=== RUN MANIFEST TEST ===")
+        print(f"Interrupted run: {manifest.summary()}")
+        
+        # Restart: finished items are skipped, the failure is retried once more
+        manifest.start_run(len(items))
+        todo = [item_id for item_id, content_hash in items.items()
+                if manifest.should_process(item_id, content_hash)]
+        print(f"Restarted run processes: {todo}")
+        for item_id in todo:
+            manifest.record_success(item_id, items[item_id])
+        manifest.finish_run()
+        print(f"Finished run: {manifest.summary()}")
@@ -0,0 +1,273 @@
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import List, Dict, Any, Optional
+
+from config import Config
+from metrics import Sample
+
+# Memory introspection outside Linux /proc
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def process_memory(pid: int) -> Dict[str, int]:
+    """RSS, PSS and USS (memory unique to the process) in bytes"""
+    try:
+        fields = {}
+        with open(f"/proc/{pid}/smaps_rollup", 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+        return {
+            "rss": fields.get("Rss", 0),
+            "pss": fields.get("Pss", 0),
+            "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+        }
+    except OSError:
+        if not PSUTIL_AVAILABLE:
+            return {}
+        try:
+            info = psutil.Process(pid).memory_full_info()
+        except psutil.Error:
+            return {}
+        return {"rss": info.rss, "pss": getattr(info, "pss", 0), "uss": info.uss}
+
+def worker_memory_samples() -> List[Sample]:
+    """Memory of the current worker for its /metrics"""
+    memory = process_memory(os.getpid())
+    if not memory:
+        return []
+    return [
+        ("process_unique_memory_bytes", "gauge", "Memory private to this worker (USS)", {}, memory["uss"]),
+        ("process_proportional_memory_bytes", "gauge", "Memory of this worker with shared pages split (PSS)", {},
+         memory["pss"]),
+    ]
+
+class PreforkServer:
+    """Load models once, then fork HTTP workers that share them copy-on-write
+    
+    The parent loads the spaCy pipeline, taxonomy and catalog snapshot and runs
+    one synthetic analysis, then freezes the GC so collections in the workers
+    never write to the pages holding those objects. Each forked worker
+    imports the API and serves the shared listening socket, running analyses
+    in-process (`API_WORKERS=0`) on the inherited models. A worker that dies
+    is forked again from the still-warm parent, after a delay that doubles
+    with each consecutive crash; a slot that keeps crashing is given up.
+    
+    Requests are spread over the workers by the kernel, so state a follow-up
+    needs is shared: analysis and what-if sessions are kept in the session
+    store, and only worker 0 runs batch jobs while the others queue them in
+    the job store. What stays per worker (stage caches, request coalescing,
+    served ETags) only saves work.
+    """
+    
+    def __init__(self, config: Optional[Config] = None, workers: Optional[int] = None,
+                 host: Optional[str] = None, port: Optional[int] = None,
+                 report_interval: Optional[float] = None):
+        self.config = config or Config()
+        self.workers = self.config.SERVER_WORKERS if workers is None else workers
+        if self.workers < 1:
+            raise ValueError(f"workers must be at least 1, got {self.workers}")
+        self.host = host or self.config.SERVER_HOST
+        self.port = port or self.config.SERVER_PORT
+        self.report_interval = report_interval or self.config.SERVER_MEMORY_REPORT_INTERVAL
+        
+        self.children: Dict[int, int] = {}  # pid -> worker slot
+        self.started_at: Dict[int, float] = {}  # worker slot -> fork time
+        self.crashes: Dict[int, int] = {}  # worker slot -> consecutive crashes
+        self.restarts: Dict[int, float] = {}  # worker slot -> time to fork it again
+        self._socket: Optional[socket.socket] = None
+        self._stopping = False
+    
+    def preload(self) -> float:
+        """Load every read-only model and index in this (parent) process"""
+        # No collections while the shared heap is built; it is frozen before forking
+        gc.disable()
+        Config.API_WORKERS = 0
+        
+        import fastapi, uvicorn  # noqa: F401 (shared by the workers)
+        from resume_parser import ResumeParser
+        return ResumeParser(self.config).warm_up()
+    
+    def _bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+    
+    def _spawn(self, slot: int) -> int:
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+                gc.enable()
+                self._serve(slot)
+            except BaseException as e:
+                logger.error(f"Worker {os.getpid()} failed: {e}")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        
+        self.children[pid] = slot
+        self.started_at[slot] = time.time()
+        logger.info(f"Forked worker {slot} (pid {pid})")
+        return pid
+    
+    def _serve(self, slot: int) -> None:
+        """Worker body: run the API on the inherited socket"""
+        # One runner per job store; re-forked workers take over the same slot
+        Config.JOB_RUNNER_ENABLED = slot == 0
+        
+        import uvicorn
+        import api
+        
+        api.metrics.add_collector(worker_memory_samples)
+        server = uvicorn.Server(uvicorn.Config(api.app, log_level="info"))
+        server.run(sockets=[self._socket])
+    
+    def schedule_restart(self, slot: int, uptime: float) -> Optional[float]:
+        """Schedule re-forking a worker that exited; returns the delay, or None if the slot is given up
+        
+        The delay doubles with each consecutive crash of the slot, up to
+        `SERVER_RESTART_MAX_DELAY`; a worker that ran for `SERVER_STABLE_SECONDS`
+        starts the count over.
+        """
+        crashes = 1 if uptime >= self.config.SERVER_STABLE_SECONDS else self.crashes.get(slot, 0) + 1
+        self.crashes[slot] = crashes
+        if crashes > self.config.SERVER_MAX_CRASHES:
+            return None
+        
+        delay = min(self.config.SERVER_RESTART_DELAY * 2 ** (crashes - 1), self.config.SERVER_RESTART_MAX_DELAY)
+        self.restarts[slot] = time.time() + delay
+        return delay
+    
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    
+    def memory_report(self) -> Dict[str, Any]:
+        """Parent RSS and per-worker memory, with the estimated total footprint
+        
+        Pages the workers still share with the parent are counted once (in the
+        parent's RSS); each worker adds only its unique set size (USS).
+        """
+        parent = process_memory(os.getpid())
+        workers = [
+            {"slot": slot, "pid": pid, **process_memory(pid)}
+            for pid, slot in sorted(self.children.items(), key=lambda item: item[1])
+        ]
+        return {
+            "parent": parent,
+            "workers": workers,
+            "footprintBytes": parent.get("rss", 0) + sum(worker.get("uss", 0) for worker in workers),
+            "summedRssBytes": parent.get("rss", 0) + sum(worker.get("rss", 0) for worker in workers)
+        }
+    
+    def log_memory_report(self) -> None:
+        report = self.memory_report()
+        mb = lambda value: f"{value / 1024 / 1024:.0f}MB"
+        workers = ", ".join(
+            f"#{worker['slot']} uss {mb(worker.get('uss', 0))} rss {mb(worker.get('rss', 0))}"
+            for worker in report["workers"]
+        )
+        logger.info(f"Memory: parent rss {mb(report['parent'].get('rss', 0))}; workers {workers}; "
+                    f"footprint {mb(report['footprintBytes'])} (summed RSS {mb(report['summedRssBytes'])})")
+    
+    def run(self) -> None:
+        """Preload, fork the workers and supervise them until SIGTERM/SIGINT"""
+        start_time = time.time()
+        warmup_seconds = self.preload()
+        self._socket = self._bind()
+        
+        if self.workers > 1 and not self.config.SESSION_STORE_ENABLED:
+            logger.warning("SESSION_STORE_ENABLED is off; with several workers sessionId "
+                           "follow-ups may reach a worker without the session")
+        
+        gc.collect()
+        gc.freeze()
+        logger.info(f"Preloaded models in {time.time() - start_time:.2f}s (warm-up {warmup_seconds:.2f}s), "
+                    f"{gc.get_freeze_count()} objects frozen; forking {self.workers} workers "
+                    f"on {self.host}:{self.port}")
+        
+        for slot in range(self.workers):
+            self._spawn(slot)
+        
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self.log_memory_report())
+        
+        next_report = time.time() + min(30.0, self.report_interval)
+        while self.children or (self.restarts and not self._stopping):
+            for slot, restart_at in list(self.restarts.items()):
+                if time.time() >= restart_at and not self._stopping:
+                    del self.restarts[slot]
+                    self._spawn(slot)
+            
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid = 0
+            
+            if pid:
+                slot = self.children.pop(pid)
+                if not self._stopping:
+                    delay = self.schedule_restart(slot, time.time() - self.started_at[slot])
+                    if delay is None:
+                        logger.error(f"Worker {slot} (pid {pid}) exited with status {status}, "
+                                     f"{self.crashes[slot]} times in a row; not forking it again")
+                    else:
+                        logger.error(f"Worker {slot} (pid {pid}) exited with status {status}; "
+                                     f"forking a replacement in {delay:.1f}s")
+                continue
+            
+            if time.time() >= next_report:
+                next_report = time.time() + self.report_interval
+                self.log_memory_report()
+            time.sleep(0.5)
+        
+        self._socket.close()
+        logger.info("All workers stopped")
+
+if __name__ == "__main__":
+    # Run the preload-and-fork server: python server.py --workers 4 --port 8000
+    # Memory of running processes: python server.py --memory-report <pid> [<pid> ...]
+    Config.create_directories()
+    
+    cli = argparse.ArgumentParser(description="Resume Analyzer API with preloaded, shared models")
+    cli.add_argument("--workers", type=int, default=None, help="HTTP worker processes")
+    cli.add_argument("--host", default=None)
+    cli.add_argument("--port", type=int, default=None)
+    cli.add_argument("--report-interval", type=float, default=None, help="Seconds between memory reports")
+    cli.add_argument("--memory-report", type=int, nargs="+", metavar="PID", help="Print RSS/PSS/USS and exit")
+    args = cli.parse_args()
+    if args.workers is not None and args.workers < 1:
+        cli.error("--workers must be at least 1")
+    
+    if args.memory_report:
+        for pid in args.memory_report:
+            memory = process_memory(pid)
+            print(f"pid {pid}: " + ", ".join(f"{key} {value / 1024 / 1024:.1f}MB" for key, value in memory.items()))
+    else:
+        PreforkServer(workers=args.workers, host=args.host, port=args.port,
+                      report_interval=args.report_interval).run()
@@ -0,0 +1,178 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+
+from config import Config
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class SharedSessionStore:
+    """Analysis and what-if sessions shared by every process of a deployment
+    
+    Workers (forked server workers, analysis pool processes) keep their own
+    in-memory caches; this SQLite store holds what a `sessionId` follow-up
+    needs, so any of them can serve it. Phase-1 outputs are stored under
+    their analysis session id; what-if sessions store their role and current
+    skills with a version that guards concurrent updates. `last_used` is a
+    logical clock shared by all processes, and each table keeps only its
+    most recently used sessions.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS analysis_sessions (
+            session_id TEXT PRIMARY KEY,
+            phase1 TEXT NOT NULL,
+            last_used INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS what_if_sessions (
+            session_id TEXT PRIMARY KEY,
+            role_id TEXT NOT NULL,
+            skills TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            last_used INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_analysis_sessions_used ON analysis_sessions (last_used);
+        CREATE INDEX IF NOT EXISTS idx_what_if_sessions_used ON what_if_sessions (last_used);
+    """
+    
+    def __init__(self, config: Optional[Config] = None, db_path: Optional[Path] = None):
+        self.config = config or Config()
+        self.db_path = Path(db_path or self.config.get_session_store_path())
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+    
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+    
+    def _touch(self, table: str, session_id: str) -> bool:
+        """Mark a session as the most recently used one (caller holds the transaction)"""
+        return self._conn.execute(
+            f"UPDATE {table} SET last_used = (SELECT COALESCE(MAX(last_used), 0) + 1 FROM {table}) "
+            "WHERE session_id = ?", (session_id,)
+        ).rowcount > 0
+    
+    def _evict(self, table: str, max_entries: int) -> None:
+        """Drop all but the `max_entries` most recently used sessions"""
+        self._conn.execute(
+            f"DELETE FROM {table} WHERE last_used <= "
+            f"(SELECT last_used FROM {table} ORDER BY last_used DESC LIMIT 1 OFFSET ?)", (max_entries,)
+        )
+    
+    def save_phase1(self, session_id: str, phase1: Dict[str, Any]) -> None:
+        """Store the phase-1 output of an analysis session"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO analysis_sessions (session_id, phase1, last_used) VALUES "
+                "(?, ?, (SELECT COALESCE(MAX(last_used), 0) + 1 FROM analysis_sessions)) "
+                "ON CONFLICT (session_id) DO UPDATE SET phase1 = excluded.phase1, last_used = excluded.last_used",
+                (session_id, json.dumps(phase1))
+            )
+            self._evict("analysis_sessions", self.config.SESSION_STORE_MAX_ANALYSES)
+    
+    def load_phase1(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Phase-1 output of an analysis session, or None if unknown or evicted"""
+        with self._lock, self._conn:
+            if not self._touch("analysis_sessions", session_id):
+                return None
+            row = self._conn.execute(
+                "SELECT phase1 FROM analysis_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return json.loads(row[0])
+    
+    def create_what_if(self, session_id: str, role_id: str, skills: List[Dict[str, Any]],
+                       max_sessions: Optional[int] = None) -> None:
+        """Store a new what-if session at version 1"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO what_if_sessions (session_id, role_id, skills, version, last_used) VALUES "
+                "(?, ?, ?, 1, (SELECT COALESCE(MAX(last_used), 0) + 1 FROM what_if_sessions))",
+                (session_id, role_id, json.dumps(skills))
+            )
+            self._evict("what_if_sessions", max_sessions or self.config.WHAT_IF_MAX_SESSIONS)
+    
+    def what_if_version(self, session_id: str) -> Optional[int]:
+        """Mark a what-if session as used and return its version (None if unknown)"""
+        with self._lock, self._conn:
+            if not self._touch("what_if_sessions", session_id):
+                return None
+            return self._conn.execute(
+                "SELECT version FROM what_if_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+    
+    def load_what_if(self, session_id: str) -> Optional[Tuple[str, List[Dict[str, Any]], int]]:
+        """(role id, skills, version) of a what-if session"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT role_id, skills, version FROM what_if_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), row[2]
+    
+    def update_what_if(self, session_id: str, skills: List[Dict[str, Any]], version: int) -> bool:
+        """Save a session's skills if it is still at `version`; False if it changed meanwhile"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE what_if_sessions SET skills = ?, version = version + 1 "
+                "WHERE session_id = ? AND version = ?", (json.dumps(skills), session_id, version)
+            ).rowcount > 0
+    
+    def delete_what_if(self, session_id: str) -> bool:
+        """Drop a what-if session"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM what_if_sessions WHERE session_id = ?", (session_id,)
+            ).rowcount > 0
+
+# Session store of this process
+_shared_store: Optional[SharedSessionStore] = None
+_shared_store_pid: Optional[int] = None
+_shared_store_lock = threading.Lock()
+
+def get_session_store(config: Optional[Config] = None) -> SharedSessionStore:
+    """Get the shared session store of this process (opened on first use)
+    
+    A forked child (e.g. a server worker) opens its own connection instead of
+    using the one inherited from its parent.
+    """
+    global _shared_store, _shared_store_pid
+    with _shared_store_lock:
+        if _shared_store is None or _shared_store_pid != os.getpid():
+            _shared_store = SharedSessionStore(config)
+            _shared_store_pid = os.getpid()
+        return _shared_store
+
+if __name__ == "__main__":
+    # Test the shared session store with two connections, as two workers would have
+    import tempfile
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = Path(temp_dir) / "sessions.db"
+        first, second = SharedSessionStore(db_path=db_path), SharedSessionStore(db_path=db_path)
+        
+        print("=== SHARED SESSION STORE TEST ===")
+        first.save_phase1("resume-1", {"skills": [{"name": "Python", "level": "Advanced"}]})
+        print(f"Phase 1 seen by the other worker: {second.load_phase1('resume-1')}")
+        
+        first.create_what_if("what-if-1", "software_engineer", [{"name": "Python"}])
+        version = second.what_if_version("what-if-1")
+        print(f"Update at version {version}: {second.update_what_if('what-if-1', [], version)}")
+        print(f"Stale update rejected: {not first.update_what_if('what-if-1', [{'name': 'Git'}], version)}")
+        print(f"Stored session: {first.load_what_if('what-if-1')}")
+        
+        first.close()
+        second.close()
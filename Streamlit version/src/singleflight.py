@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import time
+from typing import List, Dict, Any, Callable, Awaitable
+
+from config import Config
+from metrics import Sample
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class _Flight:
+    """One in-flight computation and the callers waiting on it"""
+    
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.followers = 0
+        self.start_time = time.perf_counter()
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one computation
+    
+    The first caller for a key starts the computation; callers arriving
+    while it runs await the same task and get its result (or exception).
+    The task is shielded, so a caller that disconnects does not cancel the
+    work for the others. Results are shared objects and must not be
+    mutated by callers. Runs on one event loop; it is not thread-safe.
+    """
+    
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.stats = {"leaders": 0, "coalesced": 0, "savedSeconds": 0.0}
+    
+    def _finish(self, key: str, flight: _Flight) -> None:
+        self._flights.pop(key, None)
+        if flight.followers:
+            self.stats["savedSeconds"] += flight.followers * (time.perf_counter() - flight.start_time)
+        # Retrieve the exception so it is not reported as unhandled if all callers left
+        if not flight.task.cancelled():
+            flight.task.exception()
+    
+    async def do(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return `await compute()`, shared with concurrent callers using `key`"""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(compute()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._finish(key, flight))
+            self.stats["leaders"] += 1
+        else:
+            flight.followers += 1
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(flight.task)
+    
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+    
+    def status(self) -> Dict[str, Any]:
+        return {"inFlight": self.in_flight, **self.stats}
+    
+    def metric_samples(self) -> List[Sample]:
+        """Coalescing counters for the metrics registry"""
+        return [
+            ("singleflight_leaders_total", "counter", "Analyses computed for a request", {},
+             self.stats["leaders"]),
+            ("singleflight_coalesced_total", "counter", "Requests served by another request's analysis", {},
+             self.stats["coalesced"]),
+            ("singleflight_saved_seconds_total", "counter", "Analysis time coalesced requests did not spend", {},
+             self.stats["savedSeconds"]),
+            ("singleflight_in_flight", "gauge", "Distinct analyses currently running", {}, self.in_flight),
+        ]
+
+if __name__ == "__main__":
+    # Test coalescing of concurrent identical calls
+    Config.create_directories()
+    
+    runs = {"count": 0}
+    
+    async def analyze(text: str) -> Dict[str, Any]:
+        runs["count"] += 1
+        await asyncio.sleep(0.5)
+        return {"skills": text.split()}
+    
+    async def main():
+        flights = SingleFlight()
+        start_time = time.time()
+        results = await asyncio.gather(
+            *(flights.do("resume-a", lambda: analyze("Python Docker")) for _ in range(8)),
+            *(flights.do("resume-b", lambda: analyze("Java Spring")) for _ in range(2))
+        )
+        print("=== SINGLE-FLIGHT TEST ===")
+        print(f"{len(results)} requests, {runs['count']} analyses, {time.time() - start_time:.2f}s")
+        print(f"Same object shared: {results[0] is results[7]}")
+        print(flights.status())
+    
+    asyncio.run(main())
@@ -2,6 +2,7 @@ import spacy
 import json
 import re
 import logging
+import threading
 from typing import List, Dict, Any, Tuple, Optional, Set
 from pathlib import Path
 from collections import defaultdict, Counter
@@ -10,6 +11,7 @@ from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
 from config import Config
+from metrics import get_metrics
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -258,14 +260,18 @@ class SkillExtractor:
         if not resume_text or len(resume_text.strip()) < 50:
             return []
         
+        metrics = get_metrics()
+        
         # Process text with spaCy
-        doc = self.nlp(resume_text)
+        with metrics.timer("stage_duration_seconds", stage="spacy"):
+            doc = self.nlp(resume_text)
         
         # Extract skills using multiple methods
         all_skills = []
         
         # Method 1: Taxonomy-based extraction
-        taxonomy_skills = self._extract_taxonomy_skills(resume_text, doc)
+        with metrics.timer("stage_duration_seconds", stage="taxonomy_match"):
+            taxonomy_skills = self._extract_taxonomy_skills(resume_text, doc)
         all_skills.extend(taxonomy_skills)
         
         # Method 2: Pattern-based extraction
@@ -648,10 +654,25 @@ class SkillExtractor:
         return filtered_skills
 
 # Main function for Phase 1
+# Process-wide extractor; loading spaCy and the taxonomy dominates phase-1 latency
+_shared_extractor: Optional[SkillExtractor] = None
+_shared_extractor_lock = threading.Lock()
+
+def get_skill_extractor() -> SkillExtractor:
+    """Get the shared skill extractor, loading models on first use"""
+    global _shared_extractor
+    extractor = _shared_extractor
+    if extractor is None:
+        with _shared_extractor_lock:
+            if _shared_extractor is None:
+                _shared_extractor = SkillExtractor()
+            extractor = _shared_extractor
+    return extractor
+
 def analyze_resume_phase1(resume_text: str) -> Dict[str, Any]:
     """Phase 1 implementation: Extract skills only"""
     try:
-        extractor = SkillExtractor()
+        extractor = get_skill_extractor()
         skills = extractor.extract_skills_phase1(resume_text)
         
         # Format skills for API response
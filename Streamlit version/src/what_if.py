@@ -0,0 +1,338 @@
+import json
+import logging
+import threading
+import uuid
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+
+from config import Config
+from gap_analyzer import SkillMatcher, format_gaps
+from session_store import SharedSessionStore, get_session_store
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class WhatIfSession:
+    """Per-session scoring state for a resume against one role
+    
+    Skill additions and level changes re-evaluate only the requirements that
+    name that skill, updating their score contributions, the gap counters and
+    the gap set instead of re-running phase-2 analysis. Reading the result
+    still costs O(requirements): group scores are re-summed in requirement
+    order (see `_group_score`) and the open gaps are sorted.
+    """
+    
+    def __init__(self, extracted_skills: List[Dict[str, Any]], target_role_id: str,
+                 matcher: Optional[SkillMatcher] = None):
+        self.matcher = matcher or SkillMatcher()
+        self.target_role_id = target_role_id
+        
+        role_requirements = self.matcher.job_manager.get_role_requirements(target_role_id)
+        if not role_requirements:
+            raise ValueError(f"Role {target_role_id} not found")
+        
+        self.skills = {skill['name'].lower(): dict(skill) for skill in extracted_skills}
+        
+        # Requirement table: (skill type, requirement, weight)
+        self.requirements = []
+        self.requirements_by_skill: Dict[str, List[int]] = {}
+        self.group_requirements: Dict[str, List[int]] = {'required': [], 'preferred': []}
+        self.group_weight = {'required': 0, 'preferred': 0}
+        for skill_type, group in (('required', 'required_skills'), ('preferred', 'preferred_skills')):
+            for req_skill in role_requirements.get(group, []):
+                weight = 6 - req_skill['priority']
+                self.requirements_by_skill.setdefault(req_skill['skill'].lower(), []).append(
+                    len(self.requirements)
+                )
+                self.group_requirements[skill_type].append(len(self.requirements))
+                self.requirements.append((skill_type, req_skill, weight))
+                self.group_weight[skill_type] += weight
+        
+        # Running state updated by deltas
+        self.contributions = [0] * len(self.requirements)
+        self.gaps: Dict[int, Dict[str, Any]] = {}
+        self.gap_counters = {"critical": 0, "missing": 0, "level": 0, "weight": 0}
+        self.priority_counts = {i: 0 for i in range(1, 6)}
+        
+        for req_num in range(len(self.requirements)):
+            self._apply_requirement(req_num, sign=1)
+    
+    def _evaluate_requirement(self, req_num: int):
+        """Evaluate one requirement against the current skills"""
+        skill_type, req_skill, weight = self.requirements[req_num]
+        gap = self.matcher.gap_analyzer._analyze_skill_gap(req_skill, self.skills, skill_type)
+        return self.matcher._score_requirement(req_skill, gap) * weight, gap
+    
+    def _apply_requirement(self, req_num: int, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a requirement's state from the totals"""
+        if sign > 0:
+            self.contributions[req_num], gap = self._evaluate_requirement(req_num)
+            if gap is not None:
+                self.gaps[req_num] = gap
+        else:
+            gap = self.gaps.pop(req_num, None)
+        
+        if gap is not None:
+            self.gap_counters["critical"] += sign * (gap['priority'] <= 2)
+            self.gap_counters["missing"] += sign * (gap['gapType'] == 'missing')
+            self.gap_counters["level"] += sign * (gap['gapType'] == 'level')
+            self.gap_counters["weight"] += sign * (6 - gap['priority'])
+            if gap['priority'] in self.priority_counts:
+                self.priority_counts[gap['priority']] += sign
+    
+    def _update_skill(self, skill_key: str) -> None:
+        """Re-evaluate every requirement naming a skill"""
+        for req_num in self.requirements_by_skill.get(skill_key, []):
+            self._apply_requirement(req_num, sign=-1)
+            self._apply_requirement(req_num, sign=1)
+    
+    def set_skill_level(self, skill_name: str, level: str) -> Dict[str, Any]:
+        """Add a skill or change its level, then return the updated result"""
+        skill_key = skill_name.lower()
+        skill = dict(self.skills.get(skill_key, {"name": skill_name}))
+        skill['level'] = level
+        self.skills[skill_key] = skill
+        self._update_skill(skill_key)
+        return self.result()
+    
+    def remove_skill(self, skill_name: str) -> Dict[str, Any]:
+        """Remove a skill, then return the updated result"""
+        skill_key = skill_name.lower()
+        if self.skills.pop(skill_key, None) is not None:
+            self._update_skill(skill_key)
+        return self.result()
+    
+    def apply_changes(self, changes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply a list of `{"skill", "level"}` or `{"skill", "remove": true}` changes"""
+        for change in changes:
+            if change.get('remove'):
+                self.remove_skill(change['skill'])
+            else:
+                self.set_skill_level(change['skill'], change.get('level', 'Beginner'))
+        return self.result()
+    
+    def gap_summary(self) -> Dict[str, Any]:
+        """Gap summary from the running counters"""
+        total_gaps = len(self.gaps)
+        if not total_gaps:
+            return self.matcher.gap_analyzer.get_gap_summary([])
+        
+        gap_impact = (self.gap_counters["weight"] / (total_gaps * 5)) * 100
+        readiness_score = max(0, 100 - gap_impact)
+        
+        return {
+            "total_gaps": total_gaps,
+            "critical_gaps": self.gap_counters["critical"],
+            "missing_skills": self.gap_counters["missing"],
+            "level_gaps": self.gap_counters["level"],
+            "readiness_score": int(readiness_score),
+            "priority_breakdown": {
+                f"priority_{i}": self.priority_counts[i] for i in range(1, 6)
+            }
+        }
+    
+    def _group_score(self, skill_type: str) -> float:
+        requirement_nums = self.group_requirements[skill_type]
+        if not requirement_nums:
+            return 100.0
+        
+        # Re-add contributions in requirement order so the float result is
+        # bit-identical to SkillMatcher.analyze_role (running +/- deltas drift)
+        total_score = 0
+        for req_num in requirement_nums:
+            total_score += self.contributions[req_num]
+        
+        total_weight = self.group_weight[skill_type]
+        return (total_score / total_weight) if total_weight > 0 else 0
+    
+    def match_score(self) -> Dict[str, Any]:
+        """Current match score in the phase-2 `matchScore` format"""
+        return self.matcher.build_match_score(
+            self._group_score('required'), self._group_score('preferred'), self.gap_summary()
+        )
+    
+    def current_gaps(self) -> List[Dict[str, Any]]:
+        """Current gaps in phase-2 order"""
+        # Requirement order breaks ties, as in the stable sort of analyze_role
+        ordered = sorted(
+            self.gaps.items(),
+            key=lambda item: (item[1]['priority'], -item[1].get('level_gap', 0), item[0])
+        )
+        return [gap for _, gap in ordered]
+    
+    def result(self) -> Dict[str, Any]:
+        """Current `gaps` and `matchScore` as returned by phase 2"""
+        return {
+            "gaps": format_gaps(self.current_gaps()),
+            "matchScore": self.match_score()
+        }
+
+class WhatIfSessionStore:
+    """Bounded store of what-if sessions (least recently used evicted)
+    
+    With the shared session store (unless `SESSION_STORE_ENABLED` is off)
+    every session's role and skills are saved there after each change, so
+    any process can serve it. Sessions in memory are then a cache, rebuilt
+    from the stored skills when another process changed them.
+    """
+    
+    # Retries of an update that raced with another process's update
+    MAX_UPDATE_ATTEMPTS = 5
+    
+    def __init__(self, config: Optional[Config] = None, matcher: Optional[SkillMatcher] = None,
+                 max_sessions: Optional[int] = None, shared_store: Optional[SharedSessionStore] = None):
+        self.config = config or Config()
+        self.matcher = matcher or SkillMatcher(config)
+        self.max_sessions = max_sessions or self.config.WHAT_IF_MAX_SESSIONS
+        if shared_store is None and self.config.SESSION_STORE_ENABLED:
+            shared_store = get_session_store(config)
+        self.shared_store = shared_store
+        # Session id -> (session, version of the stored session it reflects)
+        self._sessions: "OrderedDict[str, Tuple[WhatIfSession, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _cache(self, session_id: str, session: WhatIfSession, version: int) -> None:
+        with self._lock:
+            self._sessions[session_id] = (session, version)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+    
+    def create(self, extracted_skills: List[Dict[str, Any]], target_role_id: str,
+               matcher: Optional[SkillMatcher] = None) -> str:
+        """Start a session and return its id"""
+        session = WhatIfSession(extracted_skills, target_role_id, matcher or self.matcher)
+        session_id = uuid.uuid4().hex
+        
+        if self.shared_store is not None:
+            self.shared_store.create_what_if(session_id, target_role_id, list(session.skills.values()),
+                                             self.max_sessions)
+        self._cache(session_id, session, 1)
+        return session_id
+    
+    def get(self, session_id: str, matcher: Optional[SkillMatcher] = None) -> Optional[WhatIfSession]:
+        """Get a session by id, marking it as recently used
+        
+        A session last changed by another process is rebuilt from the shared
+        store with `matcher` (default: the store's).
+        """
+        entry = self._get_entry(session_id, matcher)
+        return entry[0] if entry else None
+    
+    def _get_entry(self, session_id: str, matcher: Optional[SkillMatcher]) -> Optional[Tuple[WhatIfSession, int]]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self._sessions.move_to_end(session_id)
+        if self.shared_store is None:
+            return entry
+        
+        version = self.shared_store.what_if_version(session_id)
+        if version is None:
+            with self._lock:
+                self._sessions.pop(session_id, None)
+            return None
+        if entry is not None and entry[1] == version:
+            return entry
+        
+        stored = self.shared_store.load_what_if(session_id)
+        if stored is None:
+            return None
+        role_id, skills, version = stored
+        session = WhatIfSession(skills, role_id, matcher or self.matcher)
+        self._cache(session_id, session, version)
+        return session, version
+    
+    def apply_changes(self, session_id: str, changes: List[Dict[str, Any]],
+                      matcher: Optional[SkillMatcher] = None) -> Optional[Dict[str, Any]]:
+        """Apply changes to a session and save it; None if the session is unknown
+        
+        Returns the role, the change in overall score and the updated result.
+        When another process updated the session meanwhile, the changes are
+        applied again on top of its update.
+        """
+        for _ in range(self.MAX_UPDATE_ATTEMPTS):
+            entry = self._get_entry(session_id, matcher)
+            if entry is None:
+                return None
+            session, version = entry
+            previous_score = session.match_score()["overall_score"]
+            result = session.apply_changes(changes)
+            
+            if self.shared_store is None or self.shared_store.update_what_if(
+                    session_id, list(session.skills.values()), version):
+                self._cache(session_id, session, version + 1)
+                return {
+                    "roleId": session.target_role_id,
+                    "scoreDelta": result["matchScore"]["overall_score"] - previous_score,
+                    **result
+                }
+            
+            # Changed by another process; rebuild from its version
+            with self._lock:
+                self._sessions.pop(session_id, None)
+        
+        raise RuntimeError(f"What-if session {session_id} kept changing during the update")
+    
+    def delete(self, session_id: str) -> bool:
+        """Drop a session"""
+        with self._lock:
+            deleted = self._sessions.pop(session_id, None) is not None
+        if self.shared_store is not None:
+            deleted = self.shared_store.delete_what_if(session_id) or deleted
+        return deleted
+
+def verify_against_full_recompute(session: WhatIfSession) -> bool:
+    """Check that a session's delta state matches a full phase-2 recomputation"""
+    analysis = session.matcher.analyze_role(list(session.skills.values()), session.target_role_id)
+    return (
+        session.current_gaps() == analysis["gaps"]
+        and session.gap_summary() == analysis["gap_summary"]
+        and session.match_score() == analysis["match_score"]
+    )
+
+if __name__ == "__main__":
+    # Test what-if sessions
+    Config.create_directories()
+    
+    import random
+    
+    sample_skills = [
+        {"id": "skill_0", "name": "Python", "level": "Intermediate", "score": 85},
+        {"id": "skill_1", "name": "JavaScript", "level": "Beginner", "score": 70},
+        {"id": "skill_2", "name": "Git", "level": "Intermediate", "score": 80}
+    ]
+    
+    session = WhatIfSession(sample_skills, "software_engineer")
+    print("=== WHAT-IF TEST ===")
+    print(f"Initial match score: {session.match_score()['overall_score']}")
+    result = session.set_skill_level("React", "Intermediate")
+    print(f"After adding React: {result['matchScore']['overall_score']} ({len(result['gaps'])} gaps)")
+    
+    # Property check: random change sequences always match a full recomputation
+    matcher = SkillMatcher()
+    levels = list(matcher.gap_analyzer.level_hierarchy.keys())
+    checked = 0
+    for role_id in matcher.job_manager.job_roles:
+        role = matcher.job_manager.get_role_requirements(role_id)
+        skill_names = [req['skill'] for group in ('required_skills', 'preferred_skills')
+                       for req in role.get(group, [])] + ["Rust", "Go"]
+        
+        for trial in range(50):
+            initial = [{"name": name, "level": random.choice(levels)}
+                       for name in random.sample(skill_names, random.randint(0, len(skill_names)))]
+            session = WhatIfSession(initial, role_id, matcher)
+            assert verify_against_full_recompute(session)
+            
+            for step in range(20):
+                name = random.choice(skill_names)
+                if random.random() < 0.2:
+                    session.remove_skill(name.upper())
+                else:
+                    session.set_skill_level(name, random.choice(levels))
+                assert verify_against_full_recompute(session), (role_id, session.skills)
+                checked += 1
+    
+    print(f"Property check passed for {checked} random changes")
+    print(json.dumps(session.result()["matchScore"], indent=2))
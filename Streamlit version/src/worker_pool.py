@@ -0,0 +1,383 @@
+import asyncio
+import logging
+import math
+import multiprocessing
+import threading
+import time
+import zlib
+from collections import deque
+from typing import List, Dict, Any, Optional, Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import Config
+from resume_parser import ResumeParser, _init_batch_worker, _run_parser_in_worker, _warm_up_worker
+from metrics import get_metrics, Sample
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class PoolSaturatedError(Exception):
+    """Raised when the admission queue is full"""
+    
+    def __init__(self, retry_after: int):
+        super().__init__(f"Analysis workers are busy, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+class AnalysisTimeoutError(Exception):
+    """Raised when an analysis does not finish within its timeout"""
+
+# Priority classes, most latency-sensitive first
+PRIORITIES = ("interactive", "batch", "background")
+
+class _Call:
+    """A parser call waiting in a lane's priority queue"""
+    
+    def __init__(self, priority: str, fn: Callable, args: tuple, kwargs: Dict[str, Any]):
+        self.priority = priority
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+class _Lane:
+    """One worker process (or thread) with its own bounded, prioritized queue"""
+    
+    def __init__(self, executor: Executor):
+        self.executor = executor
+        self.in_flight = 0
+        self.queues = {priority: deque() for priority in PRIORITIES}
+        # Stride scheduling: a class's pass advances by 1/weight per dispatched call
+        self.passes = dict.fromkeys(PRIORITIES, 0.0)
+        self.virtual_time = 0.0
+        self.running = False
+
+class AnalysisWorkerPool:
+    """Run ResumeParser calls off the event loop with backpressure
+    
+    Each worker is a single-process lane whose initializer loads the NLP
+    pipeline and catalogs once. A call is admitted only if its lane has fewer
+    than `lane_capacity` calls in flight, of all priority classes together
+    (one running plus its share of `max_queue`), otherwise
+    `PoolSaturatedError` carries a Retry-After estimate. Calls with an affinity key (the analysis session id)
+    always go to the same lane so its pipeline cache is reused; others go to
+    the least loaded lane.
+    
+    Each lane runs one call at a time and picks the next one from its
+    per-class queues by weighted fair (stride) scheduling, so interactive
+    requests get most of a busy worker while batch and background work keep
+    their share. Batch jobs submit one call per file, so a waiting
+    interactive request runs as soon as the current file is done.
+    
+    With `workers=0` calls run on threads in this process, using `parser`.
+    """
+    
+    def __init__(self, config: Optional[Config] = None, workers: Optional[int] = None,
+                 max_queue: Optional[int] = None, timeout: Optional[float] = None,
+                 parser: Optional[ResumeParser] = None):
+        self.config = config or Config()
+        self.workers = self.config.API_WORKERS if workers is None else workers
+        self.max_queue = self.config.API_MAX_QUEUE if max_queue is None else max_queue
+        self.timeout = timeout or self.config.API_REQUEST_TIMEOUT
+        self.parser = parser
+        self.weights = dict(self.config.API_PRIORITY_WEIGHTS)
+        
+        lanes = max(self.workers, 1)
+        self.lane_capacity = 1 + math.ceil(self.max_queue / lanes)
+        self._lanes: List[_Lane] = []
+        self._lock = threading.Lock()
+        self._service_time = 1.0  # moving average, seconds
+        self.stats = {"completed": 0, "failed": 0, "rejected": 0, "timeouts": 0, "restarts": 0}
+    
+    def _new_executor(self) -> Executor:
+        if self.workers == 0:
+            return ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis")
+        # Spawn: the API process runs background threads that must not be forked
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_batch_worker
+        )
+    
+    def start(self) -> None:
+        """Start the workers and begin loading models in each of them"""
+        with self._lock:
+            if self._lanes:
+                return
+            self._lanes = [_Lane(self._new_executor()) for _ in range(max(self.workers, 1))]
+            if self.workers:
+                for lane in self._lanes:
+                    lane.executor.submit(_run_parser_in_worker, None, (), {})
+        logger.info(f"Started {self.workers} analysis workers (lane capacity {self.lane_capacity})")
+    
+    async def warm_up(self) -> List[float]:
+        """Run the parser warm-up on every worker and return their durations
+        
+        Calls bypass admission, so this is meant for startup before traffic
+        is routed to this process.
+        """
+        self.start()
+        if self.workers == 0:
+            futures = [lane.executor.submit(self.parser.warm_up) for lane in self._lanes]
+        else:
+            futures = [lane.executor.submit(_warm_up_worker) for lane in self._lanes]
+        return list(await asyncio.gather(*(asyncio.wrap_future(future) for future in futures)))
+    
+    def shutdown(self) -> None:
+        """Stop all workers, cancelling queued calls"""
+        with self._lock:
+            lanes, self._lanes = self._lanes, []
+        for lane in lanes:
+            for queue in lane.queues.values():
+                for call in list(queue):
+                    call.future.cancel()
+            lane.executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _retry_after(self, lane: _Lane) -> int:
+        return max(1, min(60, math.ceil(self._service_time * lane.in_flight)))
+    
+    def _admit(self, affinity: Optional[str], priority: str) -> _Lane:
+        if priority not in self.weights:
+            raise ValueError(f"priority must be one of {list(self.weights)}")
+        if not self._lanes:
+            self.start()
+        with self._lock:
+            if affinity:
+                lane = self._lanes[zlib.crc32(affinity.encode('utf-8')) % len(self._lanes)]
+            else:
+                lane = min(self._lanes, key=lambda candidate: candidate.in_flight)
+            
+            if lane.in_flight >= self.lane_capacity:
+                self.stats["rejected"] += 1
+                raise PoolSaturatedError(self._retry_after(lane))
+            lane.in_flight += 1
+            return lane
+    
+    def _release(self, lane: _Lane, call: _Call, elapsed: Optional[float], ok: bool) -> None:
+        with self._lock:
+            lane.in_flight -= 1
+            self.stats["completed" if ok else "failed"] += 1
+            if elapsed is not None:
+                self._service_time = 0.8 * self._service_time + 0.2 * elapsed
+    
+    def _enqueue(self, lane: _Lane, call: _Call) -> None:
+        with self._lock:
+            queue = lane.queues[call.priority]
+            if not queue:
+                # A class that was idle joins at the current virtual time instead of
+                # spending credit it saved up while it had nothing to run
+                lane.passes[call.priority] = max(lane.passes[call.priority], lane.virtual_time)
+            queue.append(call)
+        call.future.add_done_callback(lambda future: self._discard(lane, call) if future.cancelled() else None)
+        self._dispatch(lane)
+    
+    def _discard(self, lane: _Lane, call: _Call) -> None:
+        """Drop a call cancelled (timed out) while still queued"""
+        with self._lock:
+            try:
+                lane.queues[call.priority].remove(call)
+            except ValueError:
+                return  # already taken by the dispatcher, which releases it
+        self._release(lane, call, None, ok=False)
+    
+    def _next_call(self, lane: _Lane) -> Optional[_Call]:
+        """Pop the queued call of the class with the lowest pass (under the lock)"""
+        waiting = [priority for priority in PRIORITIES if lane.queues[priority]]
+        if not waiting:
+            return None
+        priority = min(waiting, key=lambda candidate: lane.passes[candidate])
+        lane.virtual_time = lane.passes[priority]
+        lane.passes[priority] += 1.0 / self.weights[priority]
+        return lane.queues[priority].popleft()
+    
+    def _dispatch(self, lane: _Lane) -> None:
+        """Start the next queued call if the lane's worker is idle"""
+        while True:
+            with self._lock:
+                if lane.running:
+                    return
+                call = self._next_call(lane)
+                if call is None:
+                    return
+                lane.running = True
+            
+            if not call.future.set_running_or_notify_cancel():
+                with self._lock:
+                    lane.running = False
+                self._release(lane, call, None, ok=False)
+                continue
+            
+            get_metrics().observe("worker_queue_wait_seconds", time.perf_counter() - call.enqueued_at,
+                                  priority=call.priority)
+            start_time = time.time()
+            try:
+                submitted = lane.executor.submit(call.fn, *call.args, **call.kwargs)
+            except Exception as e:
+                # Pool shut down, or its process died since the last call
+                with self._lock:
+                    lane.running = False
+                self._release(lane, call, None, ok=False)
+                call.future.set_exception(e)
+                continue
+            submitted.add_done_callback(lambda done: self._finish(lane, call, start_time, done))
+            return
+    
+    def _finish(self, lane: _Lane, call: _Call, start_time: float, done: Future) -> None:
+        """Hand a worker's result to the caller and start the lane's next call"""
+        if done.cancelled():
+            error: Optional[BaseException] = RuntimeError("Analysis workers were shut down")
+        else:
+            error = done.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._restart_lane(lane)
+        
+        with self._lock:
+            lane.running = False
+        self._release(lane, call, time.time() - start_time, ok=error is None)
+        self._dispatch(lane)
+        
+        if error is None:
+            call.future.set_result(done.result())
+        else:
+            call.future.set_exception(error)
+    
+    def _restart_lane(self, lane: _Lane) -> None:
+        """Replace a lane whose worker process died"""
+        old_executor = None
+        with self._lock:
+            if lane in self._lanes:
+                old_executor, lane.executor = lane.executor, self._new_executor()
+                self.stats["restarts"] += 1
+        if old_executor is not None:
+            # The broken executor still holds its management thread and pipes
+            old_executor.shutdown(wait=False, cancel_futures=True)
+        logger.error("Analysis worker died; started a replacement")
+    
+    async def run(self, method: str, *args, affinity: Optional[str] = None,
+                  timeout: Optional[float] = None, priority: str = "interactive", **kwargs) -> Any:
+        """Call `ResumeParser.<method>(*args, **kwargs)` on a worker
+        
+        `priority` is one of `PRIORITIES`. Raises `PoolSaturatedError` when the
+        lane is full and `AnalysisTimeoutError` after `timeout` seconds,
+        queueing included. A timed-out call that already started
+        keeps its slot until the worker finishes it.
+        """
+        lane = self._admit(affinity, priority)
+        if self.workers == 0:
+            call = _Call(priority, getattr(self.parser, method), args, kwargs)
+        else:
+            call = _Call(priority, _run_parser_in_worker, (method, args, kwargs), {})
+        self._enqueue(lane, call)
+        
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(call.future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.stats["timeouts"] += 1
+            call.future.cancel()
+            raise AnalysisTimeoutError(f"Analysis did not finish within {timeout or self.timeout}s")
+        
+        if self.workers:
+            # Worker processes send back the metrics their call recorded
+            result, samples = result
+            get_metrics().merge(samples)
+        return result
+    
+    async def run_queued(self, method: str, *args, **kwargs) -> Any:
+        """Like `run`, but wait out saturation instead of failing (for batch work)
+        
+        Callers pass `priority="batch"` or `"background"`.
+        """
+        while True:
+            try:
+                return await self.run(method, *args, **kwargs)
+            except PoolSaturatedError as e:
+                await asyncio.sleep(e.retry_after)
+    
+    def status(self) -> Dict[str, Any]:
+        """Pool status for diagnostics"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "laneCapacity": self.lane_capacity,
+                "inFlight": [lane.in_flight for lane in self._lanes],
+                "running": sum(1 for lane in self._lanes if lane.running),
+                "queued": {
+                    priority: sum(len(lane.queues[priority]) for lane in self._lanes)
+                    for priority in PRIORITIES
+                },
+                "weights": self.weights,
+                "avgServiceMs": int(self._service_time * 1000),
+                **self.stats
+            }
+    
+    def metric_samples(self) -> List[Sample]:
+        """Queue depth, utilization and call counters for the metrics registry"""
+        status = self.status()
+        in_flight = status["inFlight"]
+        lanes = max(len(in_flight), 1)
+        samples: List[Sample] = [
+            ("workers", "gauge", "Analysis worker processes (0: threads in the API process)", {},
+             status["workers"]),
+            ("worker_in_flight", "gauge", "Calls admitted to the analysis workers", {}, sum(in_flight)),
+            ("worker_utilization", "gauge", "Share of workers running an analysis", {},
+             status["running"] / lanes),
+            ("worker_restarts_total", "counter", "Worker processes replaced after dying", {},
+             status["restarts"]),
+        ]
+        samples += [
+            ("worker_queue_depth", "gauge", "Admitted calls waiting for a worker by priority class",
+             {"priority": priority}, queued)
+            for priority, queued in status["queued"].items()
+        ]
+        samples += [
+            ("worker_calls_total", "counter", "Worker pool calls by result", {"result": result},
+             status[result])
+            for result in ("completed", "failed", "rejected", "timeouts")
+        ]
+        return samples
+
+if __name__ == "__main__":
+    # Test the worker pool under load
+    Config.create_directories()
+    
+    sample_resume = """
+    Senior Software Engineer with 6 years of Python, JavaScript and React.
+    Built microservices on AWS with Docker and Kubernetes. Led a team of 4.
+    """
+    
+    async def main():
+        pool = AnalysisWorkerPool(workers=2, max_queue=4)
+        pool.start()
+        
+        async def one(i: int):
+            try:
+                result = await pool.run("parse_resume_text", f"{sample_resume} Project {i}", phase=1)
+                return len(result.get("skills", []))
+            except PoolSaturatedError as e:
+                return f"503 (Retry-After {e.retry_after})"
+        
+        start_time = time.time()
+        print("=== WORKER POOL TEST ===")
+        print(await asyncio.gather(*(one(i) for i in range(12))))
+        print(f"{time.time() - start_time:.2f}s, {pool.status()}")
+        
+        # Interactive latency while a batch keeps every worker busy
+        async def timed(i: int, priority: str) -> float:
+            start = time.perf_counter()
+            await pool.run_queued("parse_resume_text", f"{sample_resume} Item {i}", phase=1, priority=priority)
+            return time.perf_counter() - start
+        
+        batch = [asyncio.create_task(timed(i, "batch")) for i in range(2 * pool.lane_capacity)]
+        await asyncio.sleep(0.5)
+        interactive = []
+        for i in range(5):
+            interactive.append(await timed(100 + i, "interactive"))
+        batch_times = await asyncio.gather(*batch)
+        print(f"Interactive under batch load: max {max(interactive) * 1000:.0f}ms; "
+              f"batch items: max {max(batch_times) * 1000:.0f}ms")
+        pool.shutdown()
+    
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from config import Config
+
+# Two roles with overlapping skills, shared requirement levels and every priority
+TEST_ROLES = {
+    "software_engineer": {
+        "title": "Software Engineer",
+        "level": "mid",
+        "required_skills": [
+            {"skill": "Python", "level": "Intermediate", "priority": 1},
+            {"skill": "JavaScript", "level": "Intermediate", "priority": 1},
+            {"skill": "Git", "level": "Intermediate", "priority": 2},
+            {"skill": "SQL", "level": "Beginner", "priority": 2}
+        ],
+        "preferred_skills": [
+            {"skill": "React", "level": "Beginner", "priority": 3},
+            {"skill": "Docker", "level": "Familiar", "priority": 4},
+            {"skill": "SQL", "level": "Advanced", "priority": 5}
+        ]
+    },
+    "data_scientist": {
+        "title": "Data Scientist",
+        "level": "mid",
+        "required_skills": [
+            {"skill": "Python", "level": "Advanced", "priority": 1},
+            {"skill": "Machine Learning", "level": "Intermediate", "priority": 1},
+            {"skill": "Statistics", "level": "Intermediate", "priority": 2}
+        ],
+        "preferred_skills": [
+            {"skill": "SQL", "level": "Intermediate", "priority": 3},
+            {"skill": "AWS", "level": "Beginner", "priority": 4}
+        ]
+    }
+}
+
+@pytest.fixture(autouse=True, scope="session")
+def data_dirs(tmp_path_factory):
+    """Point every data directory at a temporary tree with the test roles
+    
+    Nothing under the project's data/ directory is read or written.
+    """
+    data_dir = tmp_path_factory.mktemp("data")
+    patch = pytest.MonkeyPatch()
+    patch.setattr(Config, "DATA_DIR", data_dir)
+    patch.setattr(Config, "LOGS_DIR", data_dir / "logs")
+    for name in ("RESUMES_DIR", "COURSES_DIR", "SKILLS_DIR", "JOB_ROLES_DIR", "INDEX_DIR", "JOBS_DIR", "SESSIONS_DIR"):
+        patch.setattr(Config, name, data_dir / name[:-len("_DIR")].lower())
+    
+    roles_path = Config.get_job_roles_path()
+    roles_path.parent.mkdir(parents=True)
+    roles_path.write_text(json.dumps(TEST_ROLES), encoding='utf-8')
+    
+    yield data_dir
+    patch.undo()
@@ -0,0 +1,201 @@
+import json
+
+import pytest
+
+# The API imports the NLP and document parsing stack
+for module in ("spacy", "sklearn", "pdfplumber", "docx"):
+    pytest.importorskip(module)
+
+from fastapi.testclient import TestClient
+
+from config import Config
+
+@pytest.fixture(scope="module")
+def api_module():
+    """The API module with analyses running on a thread in this process"""
+    patch = pytest.MonkeyPatch()
+    patch.setattr(Config, "API_WORKERS", 0)
+    import api
+    yield api
+    api.analysis_pool.shutdown()
+    patch.undo()
+
+@pytest.fixture
+def client(api_module):
+    return TestClient(api_module.app)
+
+def test_what_if_session_scores_given_skills(client):
+    response = client.post("/api/v1/what-if", json={
+        "roleId": "software_engineer",
+        "skills": [{"name": "Python", "level": "Intermediate"}, {"name": "Git"}]
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["roleId"] == "software_engineer"
+    assert "Python" not in [gap["skillName"] for gap in body["gaps"]]
+    
+    update = client.post(f"/api/v1/what-if/{body['sessionId']}", json={
+        "changes": [{"skill": "JavaScript", "level": "Intermediate"}]
+    })
+    assert update.status_code == 200
+    assert update.json()["scoreDelta"] > 0
+
+def test_what_if_skill_without_name_is_rejected(client):
+    response = client.post("/api/v1/what-if", json={
+        "roleId": "software_engineer",
+        "skills": [{"name": "Python", "level": "Advanced"}, {"level": "Beginner"}]
+    })
+    assert response.status_code == 400
+    assert "name" in response.json()["detail"]
+
+def stream_records(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+def test_streamed_batch_requires_a_role_for_phase_2(client):
+    response = client.post("/api/v1/batch-analyze?stream=ndjson&phase=2",
+                           files=[("files", ("resume.txt", b"Python developer", "text/plain"))])
+    assert response.status_code == 400
+    assert "job_role_id" in response.json()["detail"]
+
+def test_streamed_batch_rejects_oversized_files(client, api_module, monkeypatch):
+    monkeypatch.setattr(api_module.config, "MAX_FILE_SIZE", 64)
+    response = client.post("/api/v1/batch-analyze?stream=ndjson", files=[
+        ("files", ("short.txt", b"Python and Git", "text/plain")),
+        ("files", ("long.txt", b"Python " * 20, "text/plain"))
+    ])
+    assert response.status_code == 200
+    records = stream_records(response)
+    by_name = {record["filename"]: record for record in records[:-1]}
+    
+    assert by_name["short.txt"]["status"] == "success"
+    assert by_name["long.txt"]["status"] == "error"
+    assert "too large" in by_name["long.txt"]["error"]
+    assert records[-1] == {"event": "summary", "totalFiles": 2, "successful": 1, "failed": 1}
+
+RESUME = "Senior engineer with 5 years of Python, JavaScript, React and Git experience."
+
+def test_successful_analysis_is_cacheable(client, api_module):
+    body = {"resumeText": RESUME, "phase": 2, "jobContext": {"roleId": "software_engineer"}}
+    response = client.post("/api/v1/analyze-resume", json=body)
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == api_module.config.ANALYSIS_CACHE_CONTROL
+    etag = response.headers["ETag"]
+    # Timings in meta differ between runs, so the body is only semantically equal
+    assert etag.startswith('W/"')
+    
+    revalidated = client.post("/api/v1/analyze-resume", json=body, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+
+def test_analysis_that_was_never_served_is_not_revalidated(client):
+    body = {"resumeText": RESUME + " Docker.", "phase": 1}
+    response = client.post("/api/v1/analyze-resume", json=body, headers={"If-None-Match": "*"})
+    assert response.status_code == 200
+    assert "skills" in response.json()["response"]
+
+def assert_not_cacheable(response):
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
+
+def test_failed_analysis_is_not_cacheable(client, api_module, monkeypatch):
+    parser = api_module.analysis_pool.parser
+    monkeypatch.setattr(parser, "parse_resume_text",
+                        lambda *args, **kwargs: parser._create_error_response("Extraction failed", 0.0))
+    response = client.post("/api/v1/analyze-resume", json={"resumeText": RESUME})
+    assert_not_cacheable(response)
+    assert response.json()["response"]["meta"]["error"] == "Extraction failed"
+
+def test_failed_analysis_is_not_revalidated(client, api_module, monkeypatch):
+    body = {"resumeText": RESUME + " AWS.", "phase": 1}
+    etag = client.post("/api/v1/analyze-resume", json=body).headers["ETag"]
+    
+    parser = api_module.analysis_pool.parser
+    monkeypatch.setattr(parser, "parse_resume_text",
+                        lambda *args, **kwargs: parser._create_error_response("Extraction failed", 0.0))
+    assert_not_cacheable(client.post("/api/v1/analyze-resume", json=body))
+    
+    retried = client.post("/api/v1/analyze-resume", json=body, headers={"If-None-Match": etag})
+    assert_not_cacheable(retried)
+
+def test_unknown_role_is_not_cacheable(client):
+    response = client.post("/api/v1/analyze-resume", json={
+        "resumeText": RESUME, "phase": 2, "jobContext": {"roleId": "astronaut"}
+    })
+    assert_not_cacheable(response)
+    assert "error" in response.json()["response"]["matchScore"]
+
+def test_multi_role_with_a_failed_role_is_not_cacheable(client):
+    response = client.post("/api/v1/analyze-resume/multi-role", json={
+        "resumeText": RESUME, "jobContexts": [{"roleId": "software_engineer"}, {"roleId": "astronaut"}]
+    })
+    assert_not_cacheable(response)
+    assert response.json()["response"]["roles"][-1]["roleId"] == "astronaut"
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_job_runner_only_starts_where_enabled(api_module, monkeypatch, enabled):
+    monkeypatch.setattr(api_module.config, "JOB_RUNNER_ENABLED", enabled)
+    monkeypatch.setattr(api_module.config, "API_WARMUP", False)
+    with TestClient(api_module.app):
+        assert (api_module.job_runner._task is not None) == enabled
+    assert api_module.job_runner._task is None
+
+def test_analyzed_resume_is_ranked_for_roles(client):
+    text = "Data scientist: Python, Machine Learning and Statistics with SQL on AWS."
+    analysis = client.post("/api/v1/analyze-resume", json={"resumeText": text})
+    assert analysis.status_code == 200
+    session_id = analysis.json()["response"]["meta"]["pipeline"]["sessionId"]
+    
+    response = client.get("/api/v1/job-roles/data_scientist/candidates")
+    assert response.status_code == 200
+    ranked = {candidate["resumeId"]: candidate for candidate in response.json()["candidates"]}
+    assert session_id in ranked
+    assert ranked[session_id]["matched_skills"] > 0
+
+def test_inline_batch_waits_out_saturation_and_isolates_timeouts(client, api_module, monkeypatch):
+    from worker_pool import AnalysisTimeoutError, PoolSaturatedError
+    
+    pool = api_module.analysis_pool
+    run = pool.run
+    calls = []
+    
+    async def flaky_run(method, path, **kwargs):
+        calls.append(path)
+        if len(calls) == 1:
+            raise PoolSaturatedError(0)
+        if len(calls) == 3:
+            raise AnalysisTimeoutError("Analysis did not finish within 30s")
+        return await run(method, path, **kwargs)
+    
+    monkeypatch.setattr(pool, "run", flaky_run)
+    response = client.post("/api/v1/batch-analyze", files=[
+        ("files", ("first.txt", RESUME.encode('utf-8'), "text/plain")),
+        ("files", ("second.txt", RESUME.encode('utf-8'), "text/plain"))
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert [result["status"] for result in body["results"]] == ["success", "error"]
+    assert "did not finish" in body["results"][1]["error"]
+    assert (body["successful"], body["failed"]) == (1, 1)
+
+def test_view_without_recommendation_sections_keeps_the_requested_phase(client):
+    response = client.post("/api/v1/analyze-resume?fields=skills,matchScore", json={
+        "resumeText": RESUME, "phase": 3, "jobContext": {"roleId": "software_engineer"}
+    })
+    assert response.status_code == 200
+    body = response.json()["response"]
+    assert set(body) == {"version", "skills", "matchScore", "meta"}
+    assert (body["meta"]["phase"], body["meta"]["model"]) == (3, "resume-analyzer-phase3")
+    assert "recommendations" not in body["meta"]["pipeline"]["stages"]
+
+def test_session_follow_up_is_served_by_another_worker(client):
+    from pipeline import AnalysisPipeline
+    
+    analysis = client.post("/api/v1/analyze-resume", json={"resumeText": RESUME + " SQL."})
+    session_id = analysis.json()["response"]["meta"]["pipeline"]["sessionId"]
+    
+    # A worker that never saw the resume, sharing only the session store
+    other_worker = AnalysisPipeline()
+    stages = other_worker.run(phase=2, role_id="software_engineer", session_id=session_id)
+    assert stages["phase1"]["skills"] == analysis.json()["response"]["skills"]
+    assert stages["stages"]["phase1"] == "hit"
+    assert "matchScore" in stages["gaps"]
@@ -0,0 +1,51 @@
+import pytest
+
+# The parser imports the NLP and document parsing stack
+for module in ("spacy", "sklearn", "pdfplumber", "docx"):
+    pytest.importorskip(module)
+
+from batch_output import read_jsonl
+from resume_parser import ResumeParser
+
+RESUME = "Software engineer with Python, JavaScript, React, Docker and Git experience."
+
+@pytest.fixture(scope="module")
+def parser():
+    return ResumeParser()
+
+@pytest.fixture
+def resume_folder(tmp_path):
+    folder = tmp_path / "resumes"
+    folder.mkdir()
+    (folder / "good.txt").write_text(RESUME, encoding='utf-8')
+    # No text to extract: the parser reports the failure in its error response
+    (folder / "empty.txt").write_text("", encoding='utf-8')
+    return folder
+
+@pytest.mark.parametrize("output_format", ["json", "jsonl"])
+def test_unparsable_input_is_a_failure_everywhere(parser, resume_folder, tmp_path, output_format):
+    output_folder = tmp_path / "out"
+    results = parser.batch_process_resumes(resume_folder, output_folder, workers=1,
+                                           output_format=output_format, checkpoint=True)
+    
+    assert (results["processed"], results["failed"]) == (1, 1)
+    assert (results["run"]["succeeded"], results["run"]["failed"]) == (1, 1)
+    if output_format == "jsonl":
+        records = [record for name in results["outputFiles"] for record in read_jsonl(output_folder / name)]
+        statuses = {record["filename"]: record["status"] for record in records}
+    else:
+        statuses = {item["filename"]: item["status"] for item in results["results"]}
+    assert statuses == {"good.txt": "success", "empty.txt": "failed"}
+
+def test_rerun_with_other_parameters_analyzes_again(parser, resume_folder, tmp_path):
+    output_folder = tmp_path / "out"
+    parser.batch_process_resumes(resume_folder, output_folder, workers=1, checkpoint=True)
+    same = parser.batch_process_resumes(resume_folder, output_folder, workers=1, checkpoint=True)
+    assert same["run"]["skipped"] == 1
+    
+    job_context = {"roleId": "software_engineer"}
+    rerun = parser.batch_process_resumes(resume_folder, output_folder, phase=2, job_context=job_context,
+                                         workers=1, checkpoint=True)
+    assert rerun["run"]["skipped"] == 0
+    assert rerun["processed"] == 1
+    assert [item["match_score"] for item in rerun["results"] if item["status"] == "success"] != [0]
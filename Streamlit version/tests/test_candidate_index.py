@@ -0,0 +1,30 @@
+import json
+
+from candidate_index import CandidateSkillIndex
+
+SKILLS = [{"name": "Python", "level": "Advanced", "score": 90},
+          {"name": "SQL", "level": "Beginner", "score": 60}]
+
+def test_reindexing_without_a_name_keeps_it(tmp_path):
+    index = CandidateSkillIndex(index_path=tmp_path / "candidates.db")
+    index.add_resume("abc", SKILLS, "alice.pdf")
+    index.add_resume("abc", SKILLS[:1])
+    
+    assert index.count_candidates() == 1
+    ranked = index.rank_candidates("data_scientist")
+    assert [candidate["resumeId"] for candidate in ranked] == ["abc"]
+    assert ranked[0]["matched_skills"] == 1
+    with index._lock:
+        assert index._conn.execute("SELECT name FROM candidates").fetchone()[0] == "alice.pdf"
+    index.close()
+
+def test_saved_outputs_are_indexed_by_session_id(tmp_path):
+    (tmp_path / "alice_analysis.json").write_text(json.dumps(
+        {"skills": SKILLS, "meta": {"pipeline": {"sessionId": "abc"}}}), encoding='utf-8')
+    (tmp_path / "bob_analysis.json").write_text(json.dumps({"skills": SKILLS}), encoding='utf-8')
+    index = CandidateSkillIndex(index_path=tmp_path / "candidates.db")
+    
+    assert index.index_analysis_folder(tmp_path)["indexed"] == 2
+    ranked = index.rank_candidates("software_engineer")
+    assert sorted(candidate["resumeId"] for candidate in ranked) == ["abc", "bob"]
+    index.close()
@@ -0,0 +1,55 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from config import Config
+from catalog import CatalogWatcher
+
+@pytest.fixture
+def catalog_config(tmp_path):
+    """Config whose catalogs are a private copy of the test roles"""
+    class CatalogConfig(Config):
+        JOB_ROLES_DIR = tmp_path / "job_roles"
+        COURSES_DIR = tmp_path / "courses"
+        INDEX_DIR = tmp_path / "index"
+    
+    CatalogConfig.JOB_ROLES_DIR.mkdir()
+    shutil.copy2(Config.get_job_roles_path(), CatalogConfig.get_job_roles_path())
+    return CatalogConfig()
+
+def edit_roles(config, edit):
+    roles_path = config.get_job_roles_path()
+    roles = json.loads(roles_path.read_text(encoding='utf-8'))
+    edit(roles)
+    roles_path.write_text(json.dumps(roles), encoding='utf-8')
+    # Make the change visible even on file systems with coarse timestamps
+    stat = roles_path.stat()
+    os.utime(roles_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+def test_unchanged_catalog_is_not_rebuilt(catalog_config):
+    watcher = CatalogWatcher(catalog_config)
+    snapshot = watcher.snapshot
+    
+    assert not watcher.check_for_changes()
+    assert watcher.snapshot is snapshot
+    assert watcher.reload(force=False) is snapshot
+
+def test_edited_roles_are_swapped_in(catalog_config):
+    watcher = CatalogWatcher(catalog_config)
+    old_snapshot = watcher.snapshot
+    assert old_snapshot.job_manager.get_role_requirements("qa_engineer") is None
+    
+    edit_roles(catalog_config, lambda roles: roles.update(qa_engineer={
+        "title": "QA Engineer",
+        "level": "mid",
+        "required_skills": [{"skill": "Testing", "level": "Intermediate", "priority": 1}],
+        "preferred_skills": []
+    }))
+    
+    assert watcher.check_for_changes()
+    assert watcher.version != old_snapshot.version
+    assert watcher.snapshot.job_manager.get_role_requirements("qa_engineer") is not None
+    # Readers holding the old snapshot keep a consistent view
+    assert old_snapshot.job_manager.get_role_requirements("qa_engineer") is None
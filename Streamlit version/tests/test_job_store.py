@@ -0,0 +1,125 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+# The runner imports the worker pool, which imports the NLP stack
+for module in ("spacy", "sklearn", "pdfplumber", "docx"):
+    pytest.importorskip(module)
+
+from config import Config
+from job_store import BatchJobStore, BatchJobRunner
+
+@pytest.fixture
+def job_config(tmp_path):
+    class JobConfig(Config):
+        JOBS_DIR = tmp_path / "jobs"
+        JOB_POLL_INTERVAL = 0.05
+    
+    return JobConfig()
+
+def open_store(config):
+    return BatchJobStore(config, db_path=config.JOBS_DIR / "jobs.db")
+
+def queue_jobs(store, count):
+    job_ids = [store.new_job_id() for _ in range(count)]
+    for job_id in job_ids:
+        store.create_job(job_id, 1, None, [("resume.txt", store.job_dir(job_id) / "00000.txt", None)])
+    return job_ids
+
+def set_claim(store, job_id, pid, lease_expires_at):
+    with store._conn:
+        store._conn.execute("UPDATE jobs SET owner_pid = ?, lease_expires_at = ? WHERE job_id = ?",
+                            (pid, lease_expires_at, job_id))
+
+def test_each_job_is_claimed_once_across_stores(job_config):
+    job_ids = queue_jobs(open_store(job_config), 200)
+    claimed = []
+    
+    def claim_all():
+        store = open_store(job_config)
+        while True:
+            job = store.next_queued_job()
+            if job is None:
+                break
+            claimed.append(job["jobId"])
+        store.close()
+    
+    threads = [threading.Thread(target=claim_all) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert sorted(claimed) == sorted(job_ids)
+
+def test_only_jobs_with_expired_leases_are_requeued(job_config):
+    store = open_store(job_config)
+    own_job, expired_job, leased_job = queue_jobs(store, 3)
+    for _ in range(3):
+        store.next_queued_job()
+    
+    # The pid of another process, which may be alive or reused; only the lease counts
+    other_pid = os.getpid() + 1
+    set_claim(store, expired_job, other_pid, time.time() - 1)
+    set_claim(store, leased_job, other_pid, time.time() + 60)
+    
+    assert store.requeue_interrupted(own_jobs=False) == 1
+    assert store.get_job(expired_job)["status"] == "queued"
+    assert store.get_job(own_job)["status"] == "running"
+    
+    assert store.requeue_interrupted() == 1
+    assert store.get_job(own_job)["status"] == "queued"
+    assert store.get_job(leased_job)["status"] == "running"
+
+def test_lease_is_renewed_by_its_owner_only(job_config):
+    store = open_store(job_config)
+    own_job, other_job = queue_jobs(store, 2)
+    store.next_queued_job()
+    store.next_queued_job()
+    set_claim(store, own_job, os.getpid(), time.time() - 1)
+    set_claim(store, other_job, os.getpid() + 1, time.time() - 1)
+    
+    assert store.renew_lease(own_job)
+    assert not store.renew_lease(other_job)
+    assert store.requeue_interrupted(own_jobs=False) == 1
+    assert store.get_job(own_job)["status"] == "running"
+    assert store.get_job(other_job)["status"] == "queued"
+
+class FlakyStore(BatchJobStore):
+    """Store whose first poll fails as if another process held the lock"""
+    
+    polls = 0
+    
+    def next_queued_job(self):
+        self.polls += 1
+        if self.polls == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return super().next_queued_job()
+
+class FakePool:
+    workers = 1
+    
+    async def run_queued(self, method, stored_path, **kwargs):
+        return {"skills": [{"name": "Python"}]}
+
+def test_runner_survives_a_failed_poll(job_config):
+    store = FlakyStore(job_config, db_path=job_config.JOBS_DIR / "jobs.db")
+    job_id, = queue_jobs(store, 1)
+    
+    async def run():
+        runner = BatchJobRunner(store, FakePool(), job_config)
+        runner.start()
+        for _ in range(200):
+            if store.get_job(job_id)["status"] == "completed":
+                break
+            await asyncio.sleep(0.02)
+        await runner.stop()
+    
+    asyncio.run(run())
+    assert store.polls > 1
+    assert store.get_job(job_id)["status"] == "completed"
+    assert store.get_results(job_id)[0]["skillsCount"] == 1
@@ -0,0 +1,192 @@
+import itertools
+import json
+import random
+
+import numpy as np
+import pytest
+
+from config import Config
+from recommendation_engine import CourseDatabase, RecommendationEngine
+
+SKILLS = ["Python", "SQL", "Docker", "React", "AWS", "Machine Learning"]
+DIFFICULTIES = ["Beginner", "Intermediate", "Advanced"]
+
+def make_courses(rng: random.Random, prefix: str, count: int):
+    return [{
+        "id": f"{prefix}_{i}",
+        "title": f"{prefix} course {i}" + (" project" if i % 7 == 0 else ""),
+        "provider": prefix.capitalize(),
+        "difficulty": rng.choice(DIFFICULTIES),
+        "duration_hours": rng.choice([2, 8, 15, 25, 40, 60]),
+        # Few distinct ratings and prices, so ties exercise the ordering
+        "rating": rng.choice([3.9, 4.2, 4.5, 4.7]),
+        "price": rng.choice([0, 0, 19.99, 49, 49, 89.99, 129]),
+        "skills": rng.sample(SKILLS, rng.randint(1, 3)),
+        "type": "course"
+    } for i in range(count)]
+
+@pytest.fixture(scope="module")
+def course_config(tmp_path_factory):
+    """Config with a synthetic 1,800-course catalog"""
+    tmp_path = tmp_path_factory.mktemp("courses")
+    
+    class CourseConfig(Config):
+        COURSES_DIR = tmp_path / "courses"
+        INDEX_DIR = tmp_path / "index"
+        COURSE_STORE_MIN_COURSES = 0
+    
+    CourseConfig.COURSES_DIR.mkdir()
+    rng = random.Random(31)
+    for name, count in zip(CourseDatabase.COURSE_FILES, (1000, 500, 300)):
+        courses = make_courses(rng, name.split("_")[0], count)
+        (CourseConfig.COURSES_DIR / name).write_text(json.dumps(courses), encoding='utf-8')
+    return CourseConfig()
+
+@pytest.fixture(scope="module", params=["in-memory", "columnar-store"])
+def course_db(request, course_config):
+    """The catalog loaded from JSON, then reopened from the store that load wrote"""
+    loaded = CourseDatabase(course_config)
+    if request.param == "in-memory":
+        assert loaded.store is None
+        return loaded
+    stored = CourseDatabase(course_config)
+    assert stored.store is not None
+    return stored
+
+@pytest.fixture(scope="module")
+def catalog_courses(course_config):
+    """All synthetic courses in catalog file order"""
+    courses = []
+    for name in CourseDatabase.COURSE_FILES:
+        courses.extend(json.loads((course_config.COURSES_DIR / name).read_text(encoding='utf-8')))
+    return courses
+
+def baseline_find_courses(courses, skill, difficulty=None, max_results=5, max_price=None):
+    """Filter-and-sort lookup as implemented before postings were pre-sorted"""
+    matches = [course for course in courses if skill.lower() in [s.lower() for s in course["skills"]]]
+    if difficulty:
+        matches = [course for course in matches if course.get("difficulty", "").lower() == difficulty.lower()]
+    if max_price is not None:
+        matches = [course for course in matches if course.get("price", 0) <= max_price]
+    matches.sort(key=lambda x: (-x.get("rating", 0), x.get("price", float("inf"))))
+    return [course["id"] for course in matches[:max_results]]
+
+@pytest.mark.parametrize("difficulty", [None, "Beginner", "advanced"])
+@pytest.mark.parametrize("max_price", [None, 0, 19.99, 50, 1000])
+@pytest.mark.parametrize("max_results", [1, 5, 200])
+def test_find_courses_matches_baseline(course_db, catalog_courses, difficulty, max_price, max_results):
+    for skill in SKILLS + ["python", "Rust"]:
+        found = course_db.find_courses_for_skill(skill, difficulty, max_results, max_price=max_price)
+        expected = baseline_find_courses(catalog_courses, skill, difficulty, max_results, max_price)
+        assert [course["id"] for course in found] == expected, (skill, difficulty, max_price)
+
+def test_skill_keys_are_not_stripped(course_db):
+    assert course_db.find_courses_for_skill("Python")
+    assert course_db.find_courses_for_skill(" Python ") == []
+
+def test_courses_within_budget_are_cheapest_first(course_db, catalog_courses):
+    courses = course_db.find_courses_within_budget("Docker", 49)
+    prices = [course["price"] for course in courses]
+    assert prices == sorted(prices)
+    assert all(price <= 49 for price in prices)
+    assert len(courses) == len(baseline_find_courses(catalog_courses, "Docker", max_results=10**6, max_price=49))
+
+@pytest.fixture(scope="module")
+def engine(course_db, course_config):
+    return RecommendationEngine(course_config, course_db)
+
+def random_gaps(rng: random.Random, count: int):
+    return [{
+        "skillName": skill,
+        "targetLevel": rng.choice(["Beginner", "Intermediate", "Advanced"]),
+        "currentLevel": rng.choice(["None", "Beginner", "Intermediate"]),
+        "priority": rng.randint(1, 5),
+        "gapType": rng.choice(["missing", "level"])
+    } for skill in rng.sample(SKILLS, count)]
+
+def brute_force_objective(engine, gaps, prefs):
+    """Best priority-weighted score over every at-most-one-course-per-gap plan"""
+    groups = engine._build_candidate_groups(engine._sort_gaps(gaps), prefs["learningStyle"],
+                                            prefs["budgetLimit"], prefs["timeLimit"])
+    best = 0.0
+    for plan in itertools.product(*[[None] + group for group in groups]):
+        chosen = [candidate for candidate in plan if candidate is not None]
+        if (sum(candidate[1] for candidate in chosen) <= prefs["budgetLimit"]
+                and sum(candidate[2] for candidate in chosen) <= prefs["timeLimit"]):
+            best = max(best, sum(candidate[0] for candidate in chosen))
+    return best
+
+def plan_value(engine, gaps, recommendations, learning_style):
+    """Objective value of a plan, whichever mode produced it"""
+    sorted_gaps = engine._sort_gaps(gaps)
+    rows = {engine.course_db.get_course(row)["id"]: row for row in range(len(engine.course_db.course_rows))}
+    value = 0.0
+    for recommendation in recommendations:
+        gap = next(gap for gap in sorted_gaps if gap["skillName"] == recommendation["skillName"])
+        score = engine.score_course_rows(np.array([rows[recommendation["id"]]]), learning_style)[0]
+        value += engine._priority_weight(gap) * float(score)
+    return value
+
+def plan_totals(engine, recommendations):
+    courses = {course["id"]: course for course in engine.course_db.course_rows}
+    return (sum(courses[rec["id"]].get("price", 0) for rec in recommendations),
+            sum(courses[rec["id"]].get("duration_hours", 0) for rec in recommendations))
+
+@pytest.mark.parametrize("seed", range(12))
+def test_optimal_selection_matches_brute_force(engine, seed):
+    rng = random.Random(seed)
+    gaps = random_gaps(rng, 5)
+    prefs = {"learningStyle": rng.choice(["video", "structured", "hands-on", "mixed"]),
+             "budgetLimit": rng.choice([0, 50, 120, 300]), "timeLimit": rng.choice([20, 45, 100])}
+    
+    recommendations, report = engine.select_recommendations(gaps, dict(prefs, selectionMode="optimal"))
+    assert report["mode"] == "optimal"
+    assert report["proven"]
+    assert report["objective"] == pytest.approx(brute_force_objective(engine, gaps, prefs), abs=0.01)
+    
+    cost, hours = plan_totals(engine, recommendations)
+    assert cost <= prefs["budgetLimit"] and hours <= prefs["timeLimit"]
+    assert plan_value(engine, gaps, recommendations, prefs["learningStyle"]) == pytest.approx(
+        report["objective"], abs=0.01
+    )
+    
+    greedy = engine.generate_recommendations(gaps, dict(prefs, selectionMode="greedy"))
+    if plan_totals(engine, greedy)[1] <= prefs["timeLimit"]:
+        assert report["objective"] >= plan_value(engine, gaps, greedy, prefs["learningStyle"]) - 0.01
+
+def test_greedy_fallback_is_never_worse_than_greedy(course_db, course_config):
+    class FallbackConfig(type(course_config)):
+        OPTIMIZER_MAX_CANDIDATES = 0
+    
+    engine = RecommendationEngine(FallbackConfig(), course_db)
+    rng = random.Random(7)
+    for _ in range(10):
+        gaps = random_gaps(rng, 4)
+        prefs = {"learningStyle": "video", "budgetLimit": 200, "timeLimit": 1000}
+        recommendations, report = engine.select_recommendations(gaps, dict(prefs, selectionMode="optimal"))
+        greedy = engine.generate_recommendations(gaps, prefs)
+        
+        assert report["mode"] == "greedy-fallback"
+        assert not report["proven"]
+        assert (plan_value(engine, gaps, recommendations, "video")
+                >= plan_value(engine, gaps, greedy, "video") - 0.01)
+
+def test_fractional_bound_is_valid_and_tighter_than_best_per_group():
+    rng = random.Random(32)
+    for _ in range(200):
+        groups = [sorted(((rng.uniform(0, 100), rng.choice([0, 10, 20, 35, 50, 80])) for _ in range(4)),
+                         key=lambda item: (item[1], -item[0]))
+                  for _ in range(4)]
+        capacity = rng.choice([0, 30, 60, 120])
+        
+        best = 0.0
+        for plan in itertools.product(*[[None] + group for group in groups]):
+            chosen = [item for item in plan if item is not None]
+            if sum(weight for _, weight in chosen) <= capacity:
+                best = max(best, sum(value for value, _ in chosen))
+        loose = sum(max((value for value, weight in group if weight <= capacity), default=0)
+                    for group in groups)
+        
+        fitting = [[item for item in group if item[1] <= capacity] for group in groups]
+        bound = RecommendationEngine._fractional_bound(fitting, capacity)
+        assert best - 1e-9 <= bound <= loose + 1e-9
@@ -0,0 +1,41 @@
+import sqlite3
+
+from run_manifest import RunManifest
+
+def finish(manifest, items):
+    manifest.start_run(len(items))
+    for item_id, content_hash in items.items():
+        if manifest.should_process(item_id, content_hash):
+            manifest.record_success(item_id, content_hash)
+    manifest.finish_run()
+
+def test_finished_items_are_skipped_only_with_the_same_parameters(tmp_path):
+    path = tmp_path / "manifest.db"
+    items = {"a.txt": "hash_a", "b.txt": "hash_b"}
+    finish(RunManifest(path, run_params={"phase": 1, "jobContext": None}), items)
+    
+    same = RunManifest(path, run_params={"jobContext": None, "phase": 1})
+    same.start_run(len(items))
+    assert not any(same.should_process(item_id, content_hash) for item_id, content_hash in items.items())
+    
+    other = RunManifest(path, run_params={"phase": 2, "jobContext": {"roleId": "software_engineer"}})
+    other.start_run(len(items))
+    assert all(other.should_process(item_id, content_hash) for item_id, content_hash in items.items())
+
+def test_items_of_a_manifest_without_parameters_are_processed_again(tmp_path):
+    path = tmp_path / "manifest.db"
+    conn = sqlite3.connect(str(path))
+    conn.executescript("""
+        CREATE TABLE items (item_id TEXT PRIMARY KEY, content_hash TEXT NOT NULL, status TEXT NOT NULL,
+                            attempts INTEGER NOT NULL, error TEXT, run_id INTEGER NOT NULL,
+                            updated_at REAL NOT NULL);
+        INSERT INTO items VALUES ('a.txt', 'hash_a', 'done', 1, NULL, 1, 0);
+    """)
+    conn.close()
+    
+    manifest = RunManifest(path, run_params={"phase": 1})
+    manifest.start_run(1)
+    assert manifest.should_process("a.txt", "hash_a")
+    manifest.record_success("a.txt", "hash_a")
+    manifest.finish_run()
+    assert not RunManifest(path, run_params={"phase": 1}).should_process("a.txt", "hash_a")
@@ -0,0 +1,31 @@
+import pytest
+
+from config import Config
+from server import PreforkServer
+
+@pytest.fixture
+def server():
+    class ServerConfig(Config):
+        SERVER_RESTART_DELAY = 1.0
+        SERVER_RESTART_MAX_DELAY = 8.0
+        SERVER_MAX_CRASHES = 5
+        SERVER_STABLE_SECONDS = 60
+    
+    return PreforkServer(ServerConfig(), workers=2)
+
+@pytest.mark.parametrize("workers", [0, -1])
+def test_worker_count_must_be_positive(workers):
+    with pytest.raises(ValueError):
+        PreforkServer(workers=workers)
+
+def test_crashing_worker_is_restarted_with_backoff_then_given_up(server):
+    delays = [server.schedule_restart(0, uptime=0.5) for _ in range(6)]
+    assert delays == [1.0, 2.0, 4.0, 8.0, 8.0, None]
+    # Other slots keep their own count
+    assert server.schedule_restart(1, uptime=0.5) == 1.0
+
+def test_stable_worker_starts_its_crash_count_over(server):
+    for _ in range(3):
+        server.schedule_restart(0, uptime=0.5)
+    assert server.schedule_restart(0, uptime=120) == 1.0
+    assert server.schedule_restart(0, uptime=0.5) == 2.0
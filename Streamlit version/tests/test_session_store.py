@@ -0,0 +1,41 @@
+import pytest
+
+from session_store import SharedSessionStore
+
+@pytest.fixture
+def stores(tmp_path):
+    """Two connections to one database, as two worker processes would hold"""
+    first = SharedSessionStore(db_path=tmp_path / "sessions.db")
+    second = SharedSessionStore(db_path=tmp_path / "sessions.db")
+    yield first, second
+    first.close()
+    second.close()
+
+def test_phase1_saved_by_one_worker_is_loaded_by_another(stores):
+    first, second = stores
+    phase1 = {"skills": [{"name": "Python", "level": "Advanced", "score": 90}]}
+    first.save_phase1("resume", phase1)
+    
+    assert second.load_phase1("resume") == phase1
+    assert second.load_phase1("unknown") is None
+
+def test_stale_what_if_update_is_rejected(stores):
+    first, second = stores
+    first.create_what_if("session", "software_engineer", [{"name": "Python"}])
+    version = first.what_if_version("session")
+    
+    assert second.update_what_if("session", [{"name": "Git"}], version)
+    assert not first.update_what_if("session", [{"name": "SQL"}], version)
+    assert first.load_what_if("session") == ("software_engineer", [{"name": "Git"}], version + 1)
+
+def test_least_recently_used_what_if_sessions_are_evicted(stores):
+    first, second = stores
+    first.create_what_if("a", "software_engineer", [], max_sessions=2)
+    second.create_what_if("b", "software_engineer", [], max_sessions=2)
+    assert first.what_if_version("a") == 1
+    second.create_what_if("c", "data_scientist", [], max_sessions=2)
+    
+    assert first.what_if_version("b") is None
+    assert second.what_if_version("a") == 1
+    assert first.delete_what_if("a")
+    assert not second.delete_what_if("a")
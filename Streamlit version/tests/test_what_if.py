@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+from gap_analyzer import SkillMatcher, LEVEL_HIERARCHY, format_gaps
+from what_if import WhatIfSession, WhatIfSessionStore, verify_against_full_recompute
+
+SAMPLE_SKILLS = [
+    {"id": "skill_0", "name": "Python", "level": "Intermediate", "score": 85},
+    {"id": "skill_1", "name": "JavaScript", "level": "Beginner", "score": 70},
+    {"id": "skill_2", "name": "Git", "level": "Intermediate", "score": 80}
+]
+
+@pytest.fixture(scope="module")
+def matcher():
+    return SkillMatcher()
+
+def full_phase2(matcher, skills, role_id):
+    analysis = matcher.analyze_role(skills, role_id)
+    return {"gaps": format_gaps(analysis["gaps"]), "matchScore": analysis["match_score"]}
+
+def test_initial_result_matches_phase2(matcher):
+    session = WhatIfSession(SAMPLE_SKILLS, "software_engineer", matcher)
+    assert session.result() == full_phase2(matcher, SAMPLE_SKILLS, "software_engineer")
+
+def test_adding_a_skill_matches_reanalysis(matcher):
+    session = WhatIfSession(SAMPLE_SKILLS, "software_engineer", matcher)
+    before = session.match_score()["overall_score"]
+    result = session.set_skill_level("React", "Intermediate")
+    
+    expected = full_phase2(matcher, SAMPLE_SKILLS + [{"name": "React", "level": "Intermediate"}],
+                           "software_engineer")
+    assert result == expected
+    assert result["matchScore"]["overall_score"] > before
+    assert "React" not in [gap["skillName"] for gap in result["gaps"]]
+
+def test_removing_a_skill_is_case_insensitive(matcher):
+    session = WhatIfSession(SAMPLE_SKILLS, "software_engineer", matcher)
+    result = session.remove_skill("PYTHON")
+    assert result == full_phase2(matcher, SAMPLE_SKILLS[1:], "software_engineer")
+
+@pytest.mark.parametrize("role_id", ["software_engineer", "data_scientist"])
+def test_random_changes_match_full_recompute(matcher, role_id):
+    rng = random.Random(role_id)
+    levels = list(LEVEL_HIERARCHY)
+    role = matcher.job_manager.get_role_requirements(role_id)
+    skill_names = [req["skill"] for group in ("required_skills", "preferred_skills")
+                   for req in role.get(group, [])] + ["Rust", "Go"]
+    
+    for _ in range(30):
+        initial = [{"name": name, "level": rng.choice(levels)}
+                   for name in rng.sample(skill_names, rng.randint(0, len(skill_names)))]
+        session = WhatIfSession(initial, role_id, matcher)
+        assert verify_against_full_recompute(session)
+        
+        for _ in range(15):
+            name = rng.choice(skill_names)
+            if rng.random() < 0.2:
+                session.remove_skill(name.upper())
+            else:
+                session.set_skill_level(name, rng.choice(levels))
+            assert verify_against_full_recompute(session), session.skills
+
+def test_unknown_role_is_rejected(matcher):
+    with pytest.raises(ValueError):
+        WhatIfSession(SAMPLE_SKILLS, "astronaut", matcher)
+
+def test_store_evicts_least_recently_used(matcher):
+    store = WhatIfSessionStore(matcher=matcher, max_sessions=2)
+    first = store.create(SAMPLE_SKILLS, "software_engineer")
+    second = store.create(SAMPLE_SKILLS, "software_engineer")
+    assert store.get(first) is not None
+    store.create(SAMPLE_SKILLS, "data_scientist")
+    
+    assert store.get(second) is None
+    assert store.get(first) is not None
+    assert store.delete(first)
+    assert not store.delete(first)
+
+def test_session_follows_up_in_another_worker(matcher, tmp_path):
+    from session_store import SharedSessionStore
+    
+    workers = [
+        WhatIfSessionStore(matcher=matcher, shared_store=SharedSessionStore(db_path=tmp_path / "sessions.db"))
+        for _ in range(2)
+    ]
+    session_id = workers[0].create(SAMPLE_SKILLS, "software_engineer")
+    
+    update = workers[1].apply_changes(session_id, [{"skill": "React", "level": "Intermediate"}])
+    assert update["scoreDelta"] > 0
+    # The first worker's cached session is stale and rebuilt from the shared one
+    update = workers[0].apply_changes(session_id, [{"skill": "Python", "remove": True}])
+    
+    expected = full_phase2(matcher, SAMPLE_SKILLS[1:] + [{"name": "React", "level": "Intermediate"}],
+                           "software_engineer")
+    assert (update["gaps"], update["matchScore"]) == (expected["gaps"], expected["matchScore"])
+    assert workers[1].get(session_id).skills.keys() == {"javascript", "git", "react"}
+    assert workers[1].delete(session_id)
+    assert workers[0].get(session_id) is None
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+# The pool imports the parser module and its NLP stack
+for module in ("spacy", "sklearn", "pdfplumber", "docx"):
+    pytest.importorskip(module)
+
+from worker_pool import AnalysisWorkerPool, PoolSaturatedError
+
+class EchoParser:
+    def echo(self, value):
+        return value
+
+def test_restarted_lane_shuts_down_the_old_executor():
+    pool = AnalysisWorkerPool(workers=0, max_queue=4, parser=EchoParser())
+    pool.start()
+    try:
+        lane = pool._lanes[0]
+        old_executor = lane.executor
+        pool._restart_lane(lane)
+        
+        assert lane.executor is not old_executor
+        assert pool.stats["restarts"] == 1
+        with pytest.raises(RuntimeError):
+            old_executor.submit(print)
+        assert asyncio.run(pool.run("echo", 42)) == 42
+    finally:
+        pool.shutdown()
+
+def test_lane_capacity_counts_every_priority_class():
+    pool = AnalysisWorkerPool(workers=0, max_queue=2, parser=EchoParser())
+    pool.start()
+    try:
+        assert pool.lane_capacity == 3
+        for priority in ("interactive", "batch", "background"):
+            pool._admit(None, priority)
+        for priority in ("interactive", "batch", "background"):
+            with pytest.raises(PoolSaturatedError):
+                pool._admit(None, priority)
+        assert pool.stats["rejected"] == 3
+    finally:
+        pool.shutdown()